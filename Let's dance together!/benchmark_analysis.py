@@ -0,0 +1,101 @@
+"""
+Benchmark: MusicAnalyzer feature extraction on a long track, with every
+spectral feature computed from its own STFT (the previous extract_features)
+or all of them from one STFT (spectral_features.py).
+The track is test_music.mp3 (or --audio) repeated to --minutes long.
+Wall time is the best of --repeats runs; memory is traced separately with
+tracemalloc, so "peak MB" is the most memory the extraction had alive at
+once on top of the decoded audio. The outputs are checked to be the same.
+Run: python benchmark_analysis.py [--minutes 5] [--audio test_music.mp3]
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+import tracemalloc
+
+import librosa
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from music_analyzer_main import MusicAnalyzer
+
+SR = 22050
+HOP_LENGTH = 512
+N_MFCC = 13
+
+
+def separate_stfts(y):
+    """The previous extract_features: each librosa call analyzes the audio itself"""
+    tempo, beats = librosa.beat.beat_track(y=y, sr=SR, hop_length=HOP_LENGTH)
+    onset_env = librosa.onset.onset_strength(y=y, sr=SR, hop_length=HOP_LENGTH)
+    return {
+        "tempo": np.atleast_1d(tempo)[0],
+        "beats": beats,
+        "onset_env": onset_env,
+        "onset_frames": librosa.onset.onset_detect(onset_envelope=onset_env, sr=SR, hop_length=HOP_LENGTH),
+        "rms": librosa.feature.rms(y=y, hop_length=HOP_LENGTH)[0],
+        "spectral_centroid": librosa.feature.spectral_centroid(y=y, sr=SR, hop_length=HOP_LENGTH)[0],
+        "spectral_rolloff": librosa.feature.spectral_rolloff(y=y, sr=SR, hop_length=HOP_LENGTH)[0],
+        "spectral_contrast": librosa.feature.spectral_contrast(y=y, sr=SR, hop_length=HOP_LENGTH),
+        "mfcc": librosa.feature.mfcc(y=y, sr=SR, n_mfcc=N_MFCC, hop_length=HOP_LENGTH),
+        "zero_crossings": librosa.feature.zero_crossing_rate(y=y, hop_length=HOP_LENGTH)[0],
+        "chroma": librosa.feature.chroma_stft(y=y, sr=SR, hop_length=HOP_LENGTH),
+    }
+
+
+def single_stft(y):
+    """The current extract_features, without the feature cache"""
+    analyzer = MusicAnalyzer(sr=SR, hop_length=HOP_LENGTH, n_mfcc=N_MFCC, cache_dir=None)
+    analyzer.audio_data = y
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.extract_features()
+    return {name: getattr(analyzer, name) for name in MusicAnalyzer.FEATURES}
+
+
+def measure(extract, y, repeats):
+    """Best wall time in seconds, tracemalloc peak in MB, and the features"""
+    features = extract(y)  # Warm-up: librosa builds and caches its filter banks on first use
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        extract(y)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    extract(y)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6, features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Separate vs single-STFT feature extraction")
+    parser.add_argument("--audio", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_music.mp3"))
+    parser.add_argument("--minutes", type=float, default=5.0, help="track length (the audio is repeated)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio, _ = librosa.load(args.audio, sr=SR)
+    y = np.resize(audio, int(args.minutes * 60 * SR))
+    frames = 1 + len(y) // HOP_LENGTH
+
+    print(f"🎵 Feature extraction, {len(y) / SR / 60:.1f} min track ({frames} frames, best of {args.repeats})")
+    print(f"{'method':>16} {'seconds':>8} {'peak MB':>8}")
+    results = {}
+    for name, extract in [("separate STFTs", separate_stfts), ("single STFT", single_stft)]:
+        seconds, peak, features = measure(extract, y, args.repeats)
+        results[name] = features
+        print(f"{name:>16} {seconds:>8.2f} {peak:>8.1f}")
+
+    old, new = results["separate STFTs"], results["single STFT"]
+    mismatched = [name for name in old if not np.allclose(old[name], new[name], rtol=1e-5, atol=1e-6)]
+    print("✅ Same features" if not mismatched else f"❌ Features differ: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
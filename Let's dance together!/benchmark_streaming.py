@@ -0,0 +1,89 @@
+"""
+Benchmark: whole-track analysis (MusicAnalyzer.load_audio + extract_features,
+no cache) against StreamingAnalyzer, which analyzes the file block by block
+as it decodes, on long tracks.
+Each track is test_music.mp3 (or --audio) repeated to the given length and
+written as a 44.1 kHz stereo WAV, like a long DJ mix. "first s" is how long
+until the first features are available, "total s" the whole analysis, and
+"peak MB" the most memory alive at once (tracemalloc). librosa's one-time
+import and JIT compilation is done on a short clip first and reported
+separately; either path pays it once per process.
+Run: python benchmark_streaming.py [--minutes 5 30]
+"""
+import os
+import io
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from music_analyzer import MusicAnalyzer
+from streaming_analysis import StreamingAnalyzer
+
+
+def whole_track(path):
+    """Seconds to first features (= all of them), total seconds"""
+    start = time.perf_counter()
+    analyzer = MusicAnalyzer(cache_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.load_audio(path)
+        analyzer.extract_features()
+    total = time.perf_counter() - start
+    return total, total
+
+
+def streaming(path):
+    """Seconds to the first block of features, total seconds; keeps every block like a visualizer would"""
+    start = time.perf_counter()
+    first = None
+    blocks = []
+    for block in StreamingAnalyzer().stream(path):
+        if first is None:
+            first = time.perf_counter() - start
+        blocks.append(block)
+    return first, time.perf_counter() - start
+
+
+def measure(analyze, path):
+    tracemalloc.start()
+    first, total = analyze(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whole-track vs streaming music analysis on long tracks")
+    parser.add_argument("--audio", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_music.mp3"))
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5.0, 30.0], help="track lengths to test")
+    args = parser.parse_args()
+
+    audio, rate = sf.read(args.audio, dtype="int16", always_2d=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        warmup_path = os.path.join(tmp, "warmup.wav")
+        sf.write(warmup_path, audio[:10 * rate], rate)
+        start = time.perf_counter()
+        for analyze in (whole_track, streaming):
+            analyze(warmup_path)
+        print(f"🎵 librosa import and JIT warm-up: {time.perf_counter() - start:.1f}s (once per process)")
+
+        print(f"{'minutes':>8} {'analysis':>12} {'first s':>8} {'total s':>8} {'peak MB':>8}")
+        for minutes in args.minutes:
+            path = os.path.join(tmp, "mix.wav")
+            sf.write(path, np.resize(audio, (int(minutes * 60 * rate), audio.shape[1])), rate)
+            for name, analyze in [("whole track", whole_track), ("streaming", streaming)]:
+                first, total, peak = measure(analyze, path)
+                print(f"{minutes:>8.0f} {name:>12} {first:>8.2f} {total:>8.2f} {peak:>8.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
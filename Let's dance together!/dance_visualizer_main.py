@@ -37,11 +37,14 @@ class DanceVisualizer:
             self.dancers.append(dancer)
         # For multiplayer/AI: self.dancers could be dynamically added
     
-    def load_music(self, file_path):
-        """Load music file"""
+    def load_music(self, file_path, stream=False):
+        """Load music file (with stream=True, analysis continues in the background while it plays)"""
         try:
-            self.music_analyzer.load_audio(file_path)
-            self.music_analyzer.extract_features()
+            if stream:
+                self.music_analyzer.stream_audio(file_path)
+            else:
+                self.music_analyzer.load_audio(file_path)
+                self.music_analyzer.extract_features()
             
             # Initialize PyGame music playback
             pygame.mixer.music.load(file_path)
@@ -153,7 +156,7 @@ class DanceVisualizer:
         running = True
         
         # Load test music (you need to prepare an MP3 file)
-        music_loaded = self.load_music("test_music.mp3")
+        music_loaded = self.load_music("test_music.mp3", stream="--stream" in sys.argv)
         if not music_loaded:
             print("Please prepare an MP3 file and name it 'test_music.mp3'")
             return
@@ -196,6 +199,7 @@ class DanceVisualizer:
             pygame.display.flip()
             self.clock.tick(60)
         
+        self.music_analyzer.stop_stream()
         pygame.quit()
         sys.exit()
 
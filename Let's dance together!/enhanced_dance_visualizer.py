@@ -4,6 +4,11 @@ import math
 import sys
 import os
 
+# Shared modules (frame_profiler.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from frame_profiler import FrameProfiler
+from feature_timeline import FeatureTimeline
+
 class EnhancedDancer:
     def __init__(self, x, y, size=50, style="human"):
         self.x = x
@@ -211,12 +216,18 @@ class EnhancedDanceVisualizer:
         self.width = width
         self.height = height
         
+        # Frame profiler: F3 toggles the frame-time graph, F4 saves a Chrome trace
+        self.profiler = FrameProfiler()
+        
         self.current_time = 0
         self.is_playing = False
         self.start_time = 0
         self.tempo = 120
         self.energy = 0.5
         self.mood = "neutral"
+        self.mood_locked = False  # Set once the arrow keys pick a mood
+        self.tempo_locked = False  # Set once a mouse click picks a tempo
+        self.timeline = None  # Real music features, when the track could be analyzed
         
         # Create dancers with different styles
         self.create_dancers()
@@ -242,6 +253,7 @@ class EnhancedDanceVisualizer:
             if os.path.exists(file_path):
                 pygame.mixer.music.load(file_path)
                 print(f"Music loaded successfully: {file_path}")
+                self.timeline = self.analyze_music(file_path)
                 return True
             else:
                 print(f"Music file not found: {file_path}")
@@ -250,6 +262,21 @@ class EnhancedDanceVisualizer:
             print(f"Music loading failed: {e}")
             return False
     
+    def analyze_music(self, file_path):
+        """Feature timeline of the track (cached after the first run); None falls back to simulated features"""
+        try:
+            # Imported here so the visualizer still runs, with simulated features, without librosa
+            from music_analyzer import MusicAnalyzer
+            analyzer = MusicAnalyzer()
+            analyzer.load_audio(file_path)
+            analyzer.extract_features()
+            timeline = FeatureTimeline.from_analyzer(analyzer)
+            print(f"Feature timeline: {len(timeline.beat_times)} beats, {len(timeline.segment_moods)} mood segments")
+            return timeline
+        except Exception as e:
+            print(f"Music analysis failed, using simulated features: {e}")
+            return None
+    
     def play_music(self):
         """Start playing music"""
         try:
@@ -261,6 +288,14 @@ class EnhancedDanceVisualizer:
             print(f"Music playback failed: {e}")
     
     def get_current_music_features(self):
+        """Music features at the current playback position, or simulated ones without a timeline"""
+        if self.timeline is not None:
+            position_ms = pygame.mixer.music.get_pos()  # -1 once the track has ended
+            if position_ms >= 0:
+                return self.timeline.at(position_ms / 1000.0)
+        return self.get_simulated_music_features()
+    
+    def get_simulated_music_features(self):
         """Get simulated music features with more variation"""
         current_time_ms = pygame.time.get_ticks() - self.start_time
         current_time = current_time_ms / 1000.0
@@ -410,6 +445,7 @@ class EnhancedDanceVisualizer:
         print("  ESC: Exit")
         print("  Mouse click: Change tempo")
         print("  Arrow keys: Change mood")
+        print("  F3: Frame profiler, F4: Save trace")
         
         # Try to load music
         music_loaded = self.load_music("test_music.mp3")
@@ -419,9 +455,11 @@ class EnhancedDanceVisualizer:
             print("Running without music - visual effects only")
         
         running = True
+        profiler = self.profiler
         
         try:
             while running:
+                profiler.start_frame()
                 self.current_time = pygame.time.get_ticks() / 1000.0
                 
                 # Handle events
@@ -431,6 +469,8 @@ class EnhancedDanceVisualizer:
                     elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE:
                             running = False
+                        elif profiler.handle_key(event.key):
+                            pass
                         elif event.key == pygame.K_SPACE:
                             if music_loaded:
                                 if self.is_playing:
@@ -443,65 +483,82 @@ class EnhancedDanceVisualizer:
                                     print("Music resumed")
                         elif event.key == pygame.K_UP:
                             self.mood = "energetic"
+                            self.mood_locked = True
                             print("Mood: Energetic")
                         elif event.key == pygame.K_DOWN:
                             self.mood = "calm"
+                            self.mood_locked = True
                             print("Mood: Calm")
                         elif event.key == pygame.K_LEFT:
                             self.mood = "neutral"
+                            self.mood_locked = True
                             print("Mood: Neutral")
                         elif event.key == pygame.K_RIGHT:
                             self.mood = "happy"
+                            self.mood_locked = True
                             print("Mood: Happy")
                     elif event.type == pygame.MOUSEBUTTONDOWN:
                         # Change tempo on mouse click
                         self.tempo = 80 + (pygame.mouse.get_pos()[0] / self.width) * 160
+                        self.tempo_locked = True
                         print(f"Tempo changed to: {self.tempo:.1f} BPM")
                 
-                # Get current music features
-                music_features = self.get_current_music_features()
-                music_features['mood'] = self.mood  # Override with manual mood
-                
-                # Update systems
-                self.update_particles(music_features)
-                
-                # Update dancers
-                for dancer in self.dancers:
-                    dancer.update_dance_move(music_features, self.current_time)
+                with profiler.section("update"):
+                    # Get current music features
+                    music_features = self.get_current_music_features()
+                    if self.timeline is None or self.mood_locked:
+                        music_features['mood'] = self.mood  # Override with manual mood
+                    if self.tempo_locked:
+                        music_features['tempo'] = self.tempo  # Override the analyzed tempo
+                    
+                    # Update systems
+                    self.update_particles(music_features)
+                    
+                    # Update dancers
+                    for dancer in self.dancers:
+                        dancer.update_dance_move(music_features, self.current_time)
                 
                 # Draw everything
-                self.draw_background(music_features)
-                self.draw_audio_visualization(music_features)
-                self.draw_particles()
+                with profiler.section("background"):
+                    self.draw_background(music_features)
+                with profiler.section("visualization"):
+                    self.draw_audio_visualization(music_features)
+                with profiler.section("particles"):
+                    self.draw_particles()
                 
                 # Draw dancers
-                for dancer in self.dancers:
-                    dancer.draw(self.screen)
+                with profiler.section("dancers"):
+                    for dancer in self.dancers:
+                        dancer.draw(self.screen)
+                
+                with profiler.section("ui"):
+                    # Draw UI
+                    font = pygame.font.Font(None, 36)
+                    info_text = f"Tempo: {music_features.get('tempo', 0):.1f} BPM | Energy: {music_features.get('energy', 0):.2f} | Mood: {music_features.get('mood', 'unknown')}"
+                    text_surface = font.render(info_text, True, (255, 255, 255))
+                    self.screen.blit(text_surface, (20, 20))
                 
-                # Draw UI
-                font = pygame.font.Font(None, 36)
-                info_text = f"Tempo: {music_features.get('tempo', 0):.1f} BPM | Energy: {music_features.get('energy', 0):.2f} | Mood: {music_features.get('mood', 'unknown')}"
-                text_surface = font.render(info_text, True, (255, 255, 255))
-                self.screen.blit(text_surface, (20, 20))
+                    # Draw style labels
+                    font_small = pygame.font.Font(None, 24)
+                    styles = ["Human", "Abstract", "Robot", "Hip-Hop", "Ballet", "Cartoon", "Animal"]
+                    for i, style in enumerate(styles):
+                        if i < len(self.dancers):
+                            text_surface = font_small.render(style, True, (200, 200, 200))
+                            x = self.dancers[i].x - 25
+                            y = self.dancers[i].y + 80
+                            self.screen.blit(text_surface, (x, y))
                 
-                # Draw style labels
-                font_small = pygame.font.Font(None, 24)
-                styles = ["Human", "Abstract", "Robot", "Hip-Hop", "Ballet", "Cartoon", "Animal"]
-                for i, style in enumerate(styles):
-                    if i < len(self.dancers):
-                        text_surface = font_small.render(style, True, (200, 200, 200))
-                        x = self.dancers[i].x - 25
-                        y = self.dancers[i].y + 80
-                        self.screen.blit(text_surface, (x, y))
+                    # Draw controls
+                    font_small = pygame.font.Font(None, 24)
+                    controls = ["SPACE: Play/Pause", "ESC: Exit", "Click: Tempo", "Arrows: Mood", "F3: Profiler"]
+                    for i, control in enumerate(controls):
+                        text_surface = font_small.render(control, True, (180, 180, 180))
+                        self.screen.blit(text_surface, (20, self.height - 120 + i * 25))
                 
-                # Draw controls
-                font_small = pygame.font.Font(None, 24)
-                controls = ["SPACE: Play/Pause", "ESC: Exit", "Click: Tempo", "Arrows: Mood"]
-                for i, control in enumerate(controls):
-                    text_surface = font_small.render(control, True, (180, 180, 180))
-                    self.screen.blit(text_surface, (20, self.height - 120 + i * 25))
+                profiler.draw(self.screen)
                 
-                pygame.display.flip()
+                with profiler.section("flip"):
+                    pygame.display.flip()
                 self.clock.tick(60)
                 
         except Exception as e:
@@ -510,12 +567,18 @@ class EnhancedDanceVisualizer:
             traceback.print_exc()
         finally:
             print("Shutting down...")
+            if profiler.trace_path:
+                profiler.save_trace()
             pygame.quit()
             sys.exit()
 
 if __name__ == "__main__":
     try:
+        # python enhanced_dance_visualizer.py [--profile] [--trace frame_trace.json]
         visualizer = EnhancedDanceVisualizer()
+        visualizer.profiler.enabled = "--profile" in sys.argv or "--trace" in sys.argv
+        if "--trace" in sys.argv:
+            visualizer.profiler.trace_path = sys.argv[sys.argv.index("--trace") + 1]
         visualizer.run()
     except Exception as e:
         print(f"Failed to start visualizer: {e}")
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+
+ANALYSIS_VERSION = 2  # Bump when feature extraction changes so stale cache entries are ignored
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Per-frame music features on disk, one .npz file per audio content + feature set + analysis parameters
+
+    Entries are named <audio hash>_<name>_<parameter hash>.npz, where name
+    identifies the feature set (one per analyzer, so several analyzers can
+    share a directory): renaming or moving a track still hits its entry,
+    while changing any analysis parameter (or ANALYSIS_VERSION) gives a new
+    name. Saving an entry removes the track's entries for other parameters
+    under the same name only, so stale features never pile up and other
+    feature sets are left alone. Names must not contain "_".
+    """
+
+    def __init__(self, cache_dir, name):
+        self.cache_dir = cache_dir
+        self.name = name
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def params_key(self, params):
+        text = json.dumps({"params": params, "version": ANALYSIS_VERSION}, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    def path(self, audio_hash, params):
+        return os.path.join(self.cache_dir, f"{audio_hash[:32]}_{self.name}_{self.params_key(params)}.npz")
+
+    def load(self, audio_hash, params):
+        """Cached features as a dict of arrays, or None if there is no valid entry"""
+        path = self.path(audio_hash, params)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                features = {name: data[name] for name in data.files}
+        except Exception as e:
+            print(f"Feature cache read error ({os.path.basename(path)}): {e}")
+            return None
+        # The file name holds only hash prefixes; the full keys are stored inside
+        if str(features.pop("_audio_hash", "")) != audio_hash or \
+                str(features.pop("_params", "")) != json.dumps(params, sort_keys=True):
+            return None
+        return features
+
+    def save(self, audio_hash, params, features):
+        """Store a dict of arrays for this audio and parameters, replacing this feature set's stale entries"""
+        path = self.path(audio_hash, params)
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"  # Batch workers may save the same track at once
+        try:
+            np.savez_compressed(temp_path, _audio_hash=np.array(audio_hash),
+                                _params=np.array(json.dumps(params, sort_keys=True)),
+                                **{name: np.asarray(value) for name, value in features.items()})
+            os.replace(temp_path, path)  # Readers never see a half-written entry
+        except Exception as e:
+            print(f"Feature cache write error: {e}")
+            return None
+
+        prefix = audio_hash[:32] + "_"
+        for name in os.listdir(self.cache_dir):
+            if not name.startswith(prefix) or name == os.path.basename(path) or not name.endswith(".npz") \
+                    or ".tmp." in name:
+                continue
+            rest = name[len(prefix):]
+            # Same feature set, or an entry from before names were part of the key
+            if rest.startswith(self.name + "_") or "_" not in rest:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return path
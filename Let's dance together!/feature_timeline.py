@@ -0,0 +1,65 @@
+import numpy as np
+
+BEAT_FLASH = 0.1  # Seconds after a beat that count as "on the beat"
+NORMALIZE_PERCENTILE = 95  # Per-frame features are scaled so this percentile maps to 1.0
+
+
+class FeatureTimeline:
+    """Precomputed music features as sorted arrays, looked up by playback position
+
+    Built once from a MusicAnalyzer after extract_features; at() then costs
+    a few binary searches (np.searchsorted) and array reads, so it can run
+    every frame without touching librosa. Per-frame features (onset
+    strength, RMS, spectral centroid) share one array of frame times;
+    beats and mood segments have their own sorted start times.
+    """
+
+    def __init__(self, frame_times, onset_env, rms, centroid, beat_times, segment_starts, segment_moods,
+                 tempo):
+        self.frame_times = np.asarray(frame_times, dtype=np.float64)
+        self.onset = self.normalize(onset_env)
+        self.energy = self.normalize(rms)
+        self.centroid = np.asarray(centroid, dtype=np.float32)
+        self.beat_times = np.sort(np.asarray(beat_times, dtype=np.float64))
+        self.segment_starts = np.asarray(segment_starts, dtype=np.float64)
+        self.segment_moods = list(segment_moods)
+        self.tempo = float(tempo)
+
+    @classmethod
+    def from_analyzer(cls, analyzer, segment_seconds=8.0):
+        """Timeline of an analyzer whose features have been extracted"""
+        frame_times = np.arange(len(analyzer.rms)) * analyzer.hop_length / analyzer.sr
+        segment_starts, segment_moods = analyzer.mood_segments(segment_seconds)
+        return cls(frame_times, analyzer.onset_env, analyzer.rms, analyzer.spectral_centroid,
+                   analyzer.beat_frames, segment_starts, segment_moods, analyzer.tempo)
+
+    @staticmethod
+    def normalize(values):
+        """Scale to 0..1 against a high percentile, so a few peaks don't flatten the rest"""
+        values = np.asarray(values, dtype=np.float32)
+        scale = np.percentile(values, NORMALIZE_PERCENTILE) if len(values) else 0.0
+        return np.clip(values / scale, 0.0, 1.0) if scale > 0 else np.zeros_like(values)
+
+    @property
+    def duration(self):
+        return float(self.frame_times[-1]) if len(self.frame_times) else 0.0
+
+    def at(self, position):
+        """Music features at a playback position in seconds"""
+        frame = max(0, min(int(np.searchsorted(self.frame_times, position, side="right")) - 1,
+                           len(self.frame_times) - 1))
+
+        beat = int(np.searchsorted(self.beat_times, position, side="right")) - 1
+        since_beat = position - self.beat_times[beat] if beat >= 0 else np.inf
+
+        segment = max(0, int(np.searchsorted(self.segment_starts, position, side="right")) - 1)
+
+        return {
+            'tempo': self.tempo,
+            'energy': float(self.energy[frame]),
+            'onset_strength': float(self.onset[frame]),
+            'centroid': float(self.centroid[frame]),
+            'beat_strength': 1.0 if 0 <= since_beat < BEAT_FLASH else 0.0,
+            'mood': self.segment_moods[segment],
+            'current_time': float(position)
+        }
@@ -1,37 +1,169 @@
+import os
 import librosa
 import numpy as np
 import pygame
 import time
+import threading
+
+from feature_cache import FeatureCache, file_hash
+from spectral_features import extract_spectral_features
+from streaming_analysis import StreamingAnalyzer
+
+# Analyzed features are cached here, keyed by audio content and analysis parameters
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_cache")
 
 class MusicAnalyzer:
-    def __init__(self):
+    # Feature set name in the cache, so the analyzers sharing CACHE_DIR keep separate entries
+    CACHE_NAME = "player"  # Features the visualizers play from
+    STREAM_CACHE_NAME = "stream"  # Streamed approximations, kept apart so whole-track runs never restore them
+    # Attributes saved to and restored from the feature cache
+    FEATURES = ("tempo", "beats", "beat_frames", "onset_env", "rms", "spectral_centroid", "spectral_rolloff",
+                "chroma")
+
+    def __init__(self, sr=22050, hop_length=512, cache_dir=CACHE_DIR):
         self.beats = []
         self.tempo = 0
         self.energy = 0
         self.mood = "neutral"
+        self.sr = sr
+        self.hop_length = hop_length
+        self.cache = FeatureCache(cache_dir, self.CACHE_NAME) if cache_dir else None
+        self.stream_cache = FeatureCache(cache_dir, self.STREAM_CACHE_NAME) if cache_dir else None
+        self.audio_hash = None
+        self.cached_features = None
+        self.beat_frames = np.zeros(0)
+        self.stream_thread = None
+        self.stream_stop = threading.Event()
+        
+    def analysis_params(self):
+        """Everything that changes the extracted features; part of the cache key"""
+        return {"sr": self.sr, "hop_length": self.hop_length}
+        
+    def load_cached(self, audio_path):
+        """Look the file up in the feature cache; True if extract_features can restore it"""
+        self.cached_features = None
+        if self.cache:
+            self.audio_hash = file_hash(audio_path)
+            self.cached_features = self.cache.load(self.audio_hash, self.analysis_params())
+            if self.cached_features is not None:
+                print(f"Features loaded from cache: {os.path.basename(audio_path)}")
+        return self.cached_features is not None
         
     def load_audio(self, audio_path):
-        """Load audio file and analyze"""
-        self.audio_data, self.sr = librosa.load(audio_path)
+        """Load audio file and analyze (skipped when its features are already cached)"""
+        if self.load_cached(audio_path):
+            return
+        self.audio_data, self.sr = librosa.load(audio_path, sr=self.sr)
         print(f"Audio loaded successfully: {len(self.audio_data)} samples, sample rate: {self.sr}Hz")
         
+    def stream_audio(self, audio_path):
+        """Analyze while the file decodes, in a background thread
+
+        Returns at once; beat_frames, tempo, energy and mood fill in block
+        by block (about 1.5 s of audio each), using memory bounded by one
+        block however long the track is. The per-frame arrays (rms,
+        spectral_centroid, spectral_rolloff, chroma) are set, and all the
+        features cached as a separate "stream" entry, when the whole file is
+        done. A cached track (whole-track features preferred) is restored
+        immediately instead.
+        """
+        if self.load_cached(audio_path):
+            self.extract_features()
+            return
+        if self.stream_cache:
+            self.cached_features = self.stream_cache.load(self.audio_hash, self.analysis_params())
+            if self.cached_features is not None:
+                print(f"Streamed features loaded from cache: {os.path.basename(audio_path)}")
+                self.extract_features()
+                return
+        self.beat_frames = np.zeros(0)
+        self.energy = 0.0
+        self.centroid_mean = 0.0
+        self.stream_stop.clear()
+        self.stream_thread = threading.Thread(target=self.stream_worker, args=(audio_path,), daemon=True)
+        self.stream_thread.start()
+
+    def stream_worker(self, audio_path):
+        """Consume the streaming analyzer's blocks, publishing features as they arrive"""
+        streamer = StreamingAnalyzer(sr=self.sr, hop_length=self.hop_length)
+        blocks = {name: [] for name in ("onset_env", "rms", "spectral_centroid", "spectral_rolloff", "chroma")}
+        try:
+            for block in streamer.stream(audio_path):
+                if self.stream_stop.is_set():
+                    return
+                for name, values in blocks.items():
+                    values.append(block[name])
+                if len(block["beats"]):
+                    self.beat_frames = np.concatenate([self.beat_frames, block["beats"]])
+                self.tempo = block["tempo"]
+
+                # Running means over the frames analyzed so far
+                frames = block["start"] + len(block["rms"])
+                weight = len(block["rms"]) / frames
+                self.energy += (np.mean(block["rms"]) - self.energy) * weight
+                self.centroid_mean += (np.mean(block["spectral_centroid"]) - self.centroid_mean) * weight
+                self.analyze_mood(self.energy, self.centroid_mean)
+
+            if not blocks["rms"]:
+                print(f"Streaming analysis found no audio frames in {os.path.basename(audio_path)}")
+                return
+            for name, values in blocks.items():
+                setattr(self, name, np.concatenate(values, axis=-1))
+            self.beats = librosa.time_to_frames(self.beat_frames, sr=self.sr, hop_length=self.hop_length)
+        except Exception as e:
+            print(f"Streaming analysis failed: {e}")
+            return
+
+        if self.stream_cache:
+            # load_cached set audio_hash; the next --stream run of this track restores at once
+            self.stream_cache.save(self.audio_hash, self.analysis_params(),
+                                   {name: getattr(self, name) for name in self.FEATURES})
+        print(f"Streaming analysis done: {len(self.rms)} frames")
+        print(f"Tempo: {self.tempo:.1f} BPM")
+        print(f"Energy: {self.energy:.3f}")
+        print(f"Mood: {self.mood}")
+
+    def stop_stream(self):
+        """Stop a background analysis started by stream_audio"""
+        if self.stream_thread:
+            self.stream_stop.set()
+            self.stream_thread.join()
+            self.stream_thread = None
+
     def extract_features(self):
-        """Extract music features"""
-        # Beat analysis
-        self.tempo, self.beats = librosa.beat.beat_track(y=self.audio_data, sr=self.sr)
-        self.beat_frames = librosa.frames_to_time(self.beats, sr=self.sr)
+        """Extract music features (or restore them from the cache)"""
+        if self.cached_features is not None:
+            for name in self.FEATURES:
+                setattr(self, name, self.cached_features[name])
+        else:
+            # One STFT of the whole track feeds the spectral features and the beat tracker's onset envelope
+            spectral = extract_spectral_features(self.audio_data, sr=self.sr, hop_length=self.hop_length,
+                                                 n_mfcc=0, contrast=False)
+
+            # Beat analysis
+            tempo, self.beats = librosa.beat.beat_track(onset_envelope=spectral["beat_env"], sr=self.sr,
+                                                        hop_length=self.hop_length)
+            self.tempo = np.atleast_1d(tempo)[0]
+            self.beat_frames = librosa.frames_to_time(self.beats, sr=self.sr, hop_length=self.hop_length)
+            self.onset_env = spectral["onset_env"]
+            
+            # Energy/Volume
+            self.rms = librosa.feature.rms(y=self.audio_data, hop_length=self.hop_length)[0]
+            
+            # Spectral features
+            self.spectral_centroid = spectral["spectral_centroid"]
+            self.spectral_rolloff = spectral["spectral_rolloff"]
+            
+            # Harmonic features
+            self.chroma = spectral["chroma"]
+            
+            if self.cache:
+                self.cache.save(self.audio_hash, self.analysis_params(),
+                                {name: getattr(self, name) for name in self.FEATURES})
         
-        # Energy/Volume
-        self.rms = librosa.feature.rms(y=self.audio_data)[0]
+        self.tempo = float(self.tempo)
         self.energy = np.mean(self.rms)
         
-        # Spectral features
-        self.spectral_centroid = librosa.feature.spectral_centroid(y=self.audio_data, sr=self.sr)[0]
-        self.spectral_rolloff = librosa.feature.spectral_rolloff(y=self.audio_data, sr=self.sr)[0]
-        
-        # Harmonic features
-        self.chroma = librosa.feature.chroma_stft(y=self.audio_data, sr=self.sr)
-        
         # Mood analysis
         self.analyze_mood()
         
@@ -39,19 +171,34 @@ class MusicAnalyzer:
         print(f"Energy: {self.energy:.3f}")
         print(f"Mood: {self.mood}")
         
-    def analyze_mood(self):
-        """Simple mood analysis"""
-        centroid_mean = np.mean(self.spectral_centroid)
-        energy_mean = np.mean(self.rms)
+    def analyze_mood(self, energy_mean=None, centroid_mean=None):
+        """Simple mood analysis (over the whole track unless the means are given)"""
+        centroid_mean = np.mean(self.spectral_centroid) if centroid_mean is None else centroid_mean
+        energy_mean = np.mean(self.rms) if energy_mean is None else energy_mean
+        self.mood = self.classify_mood(energy_mean, centroid_mean)
         
+    def classify_mood(self, energy_mean, centroid_mean):
+        """Mood label for a mean RMS energy and spectral centroid (Hz)"""
         if energy_mean > 0.1 and centroid_mean > 3000:
-            self.mood = "energetic"
+            return "energetic"
         elif energy_mean < 0.05 and centroid_mean < 2000:
-            self.mood = "calm"
+            return "calm"
         elif self.tempo > 120:
-            self.mood = "happy"
+            return "happy"
         else:
-            self.mood = "neutral"
+            return "neutral"
+            
+    def mood_segments(self, segment_seconds=8.0):
+        """Mood of each stretch of the track: (start times in seconds, moods), merging repeats"""
+        frames = max(1, int(segment_seconds * self.sr / self.hop_length))
+        starts, moods = [], []
+        for start in range(0, max(len(self.rms), 1), frames):
+            mood = self.classify_mood(np.mean(self.rms[start:start + frames]),
+                                      np.mean(self.spectral_centroid[start:start + frames]))
+            if not moods or mood != moods[-1]:
+                starts.append(start * self.hop_length / self.sr)
+                moods.append(mood)
+        return np.array(starts), moods
 
 # Test music analysis
 if __name__ == "__main__":
@@ -1,47 +1,101 @@
+import os
+import io
+import json
 import librosa
+import argparse
+import contextlib
 import numpy as np
 import pygame
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import music_analyzer
+from feature_cache import FeatureCache, file_hash
+from spectral_features import extract_spectral_features
+
+# Analyzed features are cached here, keyed by audio content and analysis parameters
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_cache")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg", ".flac", ".m4a")
 
 class MusicAnalyzer:
-    def __init__(self):
+    # Feature set name in the cache, so the analyzers sharing CACHE_DIR keep separate entries
+    CACHE_NAME = "full"  # Full feature set, with onsets, contrast, MFCCs and zero crossings
+    # Attributes saved to and restored from the feature cache
+    FEATURES = ("tempo", "beats", "beat_frames", "onset_env", "onset_frames", "onset_times", "rms",
+                "spectral_centroid", "spectral_rolloff", "spectral_contrast", "mfcc", "zero_crossings", "chroma")
+
+    def __init__(self, sr=22050, hop_length=512, n_mfcc=13, cache_dir=CACHE_DIR):
         self.beats = []
         self.tempo = 0
         self.energy = 0
         self.mood = "neutral"
+        self.sr = sr
+        self.hop_length = hop_length
+        self.n_mfcc = n_mfcc
+        self.cache = FeatureCache(cache_dir, self.CACHE_NAME) if cache_dir else None
+        self.audio_hash = None
+        self.cached_features = None
+        
+    def analysis_params(self):
+        """Everything that changes the extracted features; part of the cache key"""
+        return {"sr": self.sr, "hop_length": self.hop_length, "n_mfcc": self.n_mfcc}
         
     def load_audio(self, audio_path):
-        """Load audio file and analyze"""
-        self.audio_data, self.sr = librosa.load(audio_path)
+        """Load audio file and analyze (skipped when its features are already cached)"""
+        self.cached_features = None
+        if self.cache:
+            self.audio_hash = file_hash(audio_path)
+            self.cached_features = self.cache.load(self.audio_hash, self.analysis_params())
+            if self.cached_features is not None:
+                print(f"Features loaded from cache: {os.path.basename(audio_path)}")
+                return
+        self.audio_data, self.sr = librosa.load(audio_path, sr=self.sr)
         print(f"Audio loaded successfully: {len(self.audio_data)} samples, sample rate: {self.sr}Hz")
         
     def extract_features(self):
-        """Extract music features with improved accuracy"""
-        # Beat and onset analysis
-        self.tempo, self.beats = librosa.beat.beat_track(y=self.audio_data, sr=self.sr)
-        self.beat_frames = librosa.frames_to_time(self.beats, sr=self.sr)
-        self.onset_env = librosa.onset.onset_strength(y=self.audio_data, sr=self.sr)
-        self.onset_frames = librosa.onset.onset_detect(onset_envelope=self.onset_env, sr=self.sr)
-        self.onset_times = librosa.frames_to_time(self.onset_frames, sr=self.sr)
-
-        # Dynamic energy (frame-wise)
-        self.rms = librosa.feature.rms(y=self.audio_data)[0]
-        self.energy = np.mean(self.rms)
-        self.energy_dynamic = self.rms
+        """Extract music features with improved accuracy (or restore them from the cache)"""
+        if self.cached_features is not None:
+            for name in self.FEATURES:
+                setattr(self, name, self.cached_features[name])
+        else:
+            # One STFT of the whole track feeds every spectral feature and the onset envelopes
+            spectral = extract_spectral_features(self.audio_data, sr=self.sr, hop_length=self.hop_length,
+                                                 n_mfcc=self.n_mfcc)
 
-        # Spectral features
-        self.spectral_centroid = librosa.feature.spectral_centroid(y=self.audio_data, sr=self.sr)[0]
-        self.spectral_rolloff = librosa.feature.spectral_rolloff(y=self.audio_data, sr=self.sr)[0]
-        self.spectral_contrast = librosa.feature.spectral_contrast(y=self.audio_data, sr=self.sr)
+            # Beat and onset analysis
+            tempo, self.beats = librosa.beat.beat_track(onset_envelope=spectral["beat_env"], sr=self.sr,
+                                                        hop_length=self.hop_length)
+            self.tempo = np.atleast_1d(tempo)[0]
+            self.beat_frames = librosa.frames_to_time(self.beats, sr=self.sr, hop_length=self.hop_length)
+            self.onset_env = spectral["onset_env"]
+            self.onset_frames = librosa.onset.onset_detect(onset_envelope=self.onset_env, sr=self.sr,
+                                                           hop_length=self.hop_length)
+            self.onset_times = librosa.frames_to_time(self.onset_frames, sr=self.sr, hop_length=self.hop_length)
 
-        # MFCCs (Mel-frequency cepstral coefficients)
-        self.mfcc = librosa.feature.mfcc(y=self.audio_data, sr=self.sr, n_mfcc=13)
+            # Dynamic energy (frame-wise)
+            self.rms = librosa.feature.rms(y=self.audio_data, hop_length=self.hop_length)[0]
 
-        # Zero-crossing rate
-        self.zero_crossings = librosa.feature.zero_crossing_rate(y=self.audio_data)[0]
+            # Spectral features
+            self.spectral_centroid = spectral["spectral_centroid"]
+            self.spectral_rolloff = spectral["spectral_rolloff"]
+            self.spectral_contrast = spectral["spectral_contrast"]
 
-        # Harmonic features
-        self.chroma = librosa.feature.chroma_stft(y=self.audio_data, sr=self.sr)
+            # MFCCs (Mel-frequency cepstral coefficients)
+            self.mfcc = spectral["mfcc"]
+
+            # Zero-crossing rate
+            self.zero_crossings = librosa.feature.zero_crossing_rate(y=self.audio_data, hop_length=self.hop_length)[0]
+
+            # Harmonic features
+            self.chroma = spectral["chroma"]
+
+            if self.cache:
+                self.cache.save(self.audio_hash, self.analysis_params(),
+                                {name: getattr(self, name) for name in self.FEATURES})
+
+        self.tempo = float(self.tempo)
+        self.energy = np.mean(self.rms)
+        self.energy_dynamic = self.rms
 
         # Mood analysis
         self.analyze_mood()
@@ -66,9 +120,143 @@ class MusicAnalyzer:
         else:
             self.mood = "neutral"
 
+def find_tracks(directory, extensions=AUDIO_EXTENSIONS):
+    """Audio files anywhere under directory, sorted"""
+    tracks = []
+    for root, _, files in os.walk(directory):
+        tracks.extend(os.path.join(root, name) for name in files if name.lower().endswith(extensions))
+    return sorted(os.path.abspath(path) for path in tracks)
+
+def track_stamp(path):
+    """Size and modification time: an index entry only counts while the file is unchanged"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+def analyze_track(path, cache_dir):
+    """Analyze one track in a worker process; its per-frame features go to the feature cache
+
+    Besides this analyzer's full entry, the track gets the entry the
+    visualizers' analyzer (music_analyzer.py) loads. Its features are the
+    same librosa calls on the same STFT, so they are copied from this
+    analysis rather than computed again.
+    """
+    start = time.perf_counter()
+    analyzer = MusicAnalyzer(cache_dir=cache_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.load_audio(path)
+        analyzer.extract_features()
+    player = music_analyzer.MusicAnalyzer(sr=analyzer.sr, hop_length=analyzer.hop_length, cache_dir=cache_dir)
+    player_params = player.analysis_params()
+    if player.cache.load(analyzer.audio_hash, player_params) is None:
+        player.cache.save(analyzer.audio_hash, player_params,
+                          {name: getattr(analyzer, name) for name in player.FEATURES})
+    return {
+        "path": path,
+        **track_stamp(path),
+        "hash": analyzer.audio_hash,
+        "cache": os.path.basename(analyzer.cache.path(analyzer.audio_hash, analyzer.analysis_params())),
+        "player_cache": os.path.basename(player.cache.path(analyzer.audio_hash, player_params)),
+        "tempo": round(analyzer.tempo, 2),
+        "energy": round(float(analyzer.energy), 4),
+        "mood": analyzer.mood,
+        "frames": int(len(analyzer.rms)),
+        "beats": int(len(analyzer.beat_frames)),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+def warm_up(sr=22050):
+    """Run the analysis on a short noise clip, so librosa's imports and JIT compilation
+    happen once before the pool forks instead of again in every worker"""
+    analyzer = MusicAnalyzer(sr=sr, cache_dir=None)
+    analyzer.audio_data = np.random.default_rng(0).normal(0, 0.1, 5 * sr).astype(np.float32)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.extract_features()
+
+def is_indexed(entry, path, cache_dir):
+    """True while the track is unchanged and both of its cache entries are still on disk"""
+    if entry is None or {k: entry.get(k) for k in ("size", "mtime")} != track_stamp(path):
+        return False
+    return all(entry.get(key) and os.path.exists(os.path.join(cache_dir, entry[key]))
+               for key in ("cache", "player_cache"))
+
+def load_index(index_path):
+    """Index entries by path, skipping any line a killed run left half-written"""
+    entries = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[entry["path"]] = entry
+                except (ValueError, KeyError):
+                    pass
+    return entries
+
+def batch_analyze(directory, workers=None, cache_dir=CACHE_DIR, index_path=None):
+    """Analyze every track under directory with a process pool
+
+    Each finished track is appended to a JSON-lines index (tempo, energy,
+    mood, frame and beat counts, and the names of its feature cache entries),
+    written only by this process. Tracks already in the index with the same
+    size and modification time, and whose cache entries still exist, are
+    skipped, so an interrupted run picks up where it stopped. Returns the number of tracks analyzed and failed.
+    """
+    index_path = index_path or os.path.join(cache_dir, "index.jsonl")
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    index = load_index(index_path)
+    tracks = find_tracks(directory)
+    pending = [path for path in tracks if not is_indexed(index.get(path), path, cache_dir)]
+    print(f"🎵 {len(tracks)} tracks in {directory}: {len(tracks) - len(pending)} already indexed, "
+          f"{len(pending)} to analyze with {workers or os.cpu_count()} workers")
+    if not pending:
+        return 0, 0
+
+    done = failed = 0
+    start = time.perf_counter()
+    warm_up()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with open(index_path, "a") as index_file:
+            futures = {executor.submit(analyze_track, path, cache_dir): path for path in pending}
+            for future in as_completed(futures):
+                name = os.path.basename(futures[future])
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"\n❌ {name}: {type(e).__name__} {e}")
+                    continue
+                index_file.write(json.dumps(entry) + "\n")
+                index_file.flush()
+                done += 1
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed
+                eta = (len(pending) - done - failed) / rate
+                print(f"\r🎵 {done + failed}/{len(pending)} | {rate:.2f} tracks/s | ETA {eta:.0f}s | "
+                      f"{name[:30]:<30} {entry['tempo']:.0f} BPM {entry['mood']}", end="", flush=True)
+    except KeyboardInterrupt:
+        print("\nInterrupted: run the same command again to resume")
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {done} analyzed, {failed} failed in {elapsed:.1f}s ({done / elapsed:.2f} tracks/s) -> {index_path}")
+    return done, failed
+
 # Test music analysis
 if __name__ == "__main__":
-    analyzer = MusicAnalyzer()
-    # Can use any MP3 file for testing
-    analyzer.load_audio("test_music.mp3")  # Need to prepare test file
-    analyzer.extract_features()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyze a track, or every track in a directory in parallel")
+    parser.add_argument("audio", nargs="?", default="test_music.mp3", help="track to analyze")
+    parser.add_argument("--batch", metavar="DIR", help="analyze every audio file under DIR with a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU core)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="feature cache for the per-frame features")
+    parser.add_argument("--index", default=None, help="JSON-lines track index (default: <cache dir>/index.jsonl)")
+    args = parser.parse_args()
+
+    if args.batch:
+        batch_analyze(args.batch, workers=args.workers, cache_dir=args.cache_dir, index_path=args.index)
+    else:
+        analyzer = MusicAnalyzer(cache_dir=args.cache_dir)
+        # Can use any MP3 file for testing
+        analyzer.load_audio(args.audio)  # Need to prepare test file
+        analyzer.extract_features()
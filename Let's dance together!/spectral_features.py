@@ -0,0 +1,86 @@
+import librosa
+import numpy as np
+
+N_FFT = 2048  # librosa's default, so features match the separate librosa.feature calls
+BLOCK_FRAMES = 2048  # STFT columns per block when deriving features; bounds the temporaries
+
+
+def estimate_tuning(S, sr=22050, n_fft=N_FFT, bins_per_octave=12, block_frames=BLOCK_FRAMES):
+    """librosa.estimate_tuning(S=S**2, ...) for a magnitude spectrogram, run over blocks of frames
+
+    piptrack only compares bins within a frame, so the (pitch, magnitude)
+    pairs it finds are collected block by block; the median threshold is
+    then taken over all of them, exactly as librosa does on the whole
+    spectrogram, without its many full-size temporaries.
+    """
+    pitches, mags = [], []
+    for start in range(0, S.shape[1], block_frames):
+        pitch, mag = librosa.piptrack(S=np.square(S[:, start:start + block_frames]), sr=sr, n_fft=n_fft)
+        found = pitch > 0
+        pitches.append(pitch[found])
+        mags.append(mag[found])
+    pitches, mags = np.concatenate(pitches), np.concatenate(mags)
+    threshold = np.median(mags) if len(mags) else 0.0
+    return librosa.pitch_tuning(pitches[mags >= threshold], bins_per_octave=bins_per_octave)
+
+
+def extract_spectral_features(y, sr=22050, hop_length=512, n_fft=N_FFT, n_mfcc=13, contrast=True,
+                              block_frames=BLOCK_FRAMES):
+    """Spectral features from one STFT of the whole signal
+
+    librosa.feature.spectral_centroid, spectral_rolloff, spectral_contrast,
+    chroma_stft, mfcc and onset_strength each compute their own STFT (or mel
+    spectrogram) when given audio. Here the magnitude STFT is computed once
+    and every feature is derived from it. Centroid, rolloff, chroma and the
+    mel spectrogram only look at one frame at a time, so they are computed
+    over blocks of columns of that array, which keeps librosa's temporaries
+    block-sized instead of track-sized. The mel spectrogram (in dB) then
+    feeds the onset envelopes and the MFCCs. Pass n_mfcc=0 or contrast=False
+    to skip those features.
+
+    Returns a dict of arrays: spectral_centroid, spectral_rolloff, chroma,
+    onset_env, beat_env (for librosa.beat.beat_track(onset_envelope=...)),
+    and spectral_contrast / mfcc when requested.
+    """
+    stft = librosa.stft(y, n_fft=n_fft, hop_length=hop_length)
+    S = np.abs(stft)
+    del stft  # The complex STFT is twice the size of its magnitude
+    frames = S.shape[1]
+    args = dict(sr=sr, n_fft=n_fft, hop_length=hop_length)
+
+    # chroma_stft estimates tuning over the whole power spectrogram before applying its filter bank
+    tuning = estimate_tuning(S, sr=sr, n_fft=n_fft, block_frames=block_frames)
+
+    features = {
+        "spectral_centroid": np.empty(frames, dtype=S.dtype),
+        "spectral_rolloff": np.empty(frames, dtype=S.dtype),
+        "chroma": np.empty((12, frames), dtype=S.dtype),
+    }
+    if contrast:
+        # Its dB conversion clips relative to the loudest peak of the track, so it takes all frames at once
+        features["spectral_contrast"] = librosa.feature.spectral_contrast(S=S, **args)
+    power = np.empty((S.shape[0], min(block_frames, frames)), dtype=S.dtype)
+    mel = None
+    for start in range(0, frames, block_frames):
+        end = min(start + block_frames, frames)
+        magnitude = S[:, start:end]
+        features["spectral_centroid"][start:end] = librosa.feature.spectral_centroid(S=magnitude, **args)[0]
+        features["spectral_rolloff"][start:end] = librosa.feature.spectral_rolloff(S=magnitude, **args)[0]
+
+        block = np.square(magnitude, out=power[:, :end - start])
+        features["chroma"][:, start:end] = librosa.feature.chroma_stft(S=block, tuning=tuning, **args)
+        mel_block = librosa.feature.melspectrogram(S=block, **args)
+        if mel is None:
+            mel = np.empty((mel_block.shape[0], frames), dtype=mel_block.dtype)
+        mel[:, start:end] = mel_block
+    del S, power
+
+    # power_to_db clips to 80 dB below the loudest bin, so it needs the whole mel spectrogram
+    mel_db = librosa.power_to_db(mel)
+    features["onset_env"] = librosa.onset.onset_strength(S=mel_db, sr=sr, hop_length=hop_length)
+    # beat_track's own envelope takes the median over mel bands instead of the mean
+    features["beat_env"] = librosa.onset.onset_strength(S=mel_db, sr=sr, hop_length=hop_length,
+                                                        aggregate=np.median)
+    if n_mfcc:
+        features["mfcc"] = librosa.feature.mfcc(S=mel_db, sr=sr, n_mfcc=n_mfcc)
+    return features
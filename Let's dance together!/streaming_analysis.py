@@ -0,0 +1,167 @@
+import librosa
+import numpy as np
+import soundfile as sf
+import soxr
+
+N_FFT = 2048
+BLOCK_FRAMES = 64  # Analysis frames per block: ~1.5 s of audio at 22.05 kHz / hop 512
+READ_SECONDS = 0.5  # Audio decoded per read
+BEAT_WINDOW = 12.0  # Seconds of onset envelope the beat tracker looks at
+BEAT_SETTLE = 3.0  # Beats this close to the newest audio wait for the next block
+TOP_DB = 80.0
+
+
+class StreamingAnalyzer:
+    """Music features computed block by block while the file decodes
+
+    The file is read a little at a time and resampled with a streaming
+    resampler (the same soxr HQ filter librosa.load uses), so memory is
+    bounded by one block of audio no matter how long the track is. Frames
+    are centered like librosa's (n_fft // 2 samples of leading silence),
+    and each block keeps the last n_fft - hop samples of the previous one so
+    frames spanning the boundary see all their audio. RMS, spectral
+    centroid, rolloff and the mel onset envelopes come out the same as the
+    whole-track librosa calls; the differences are that dB values are
+    clipped TOP_DB below the loudest frame so far rather than the loudest
+    of the track, and chroma uses the tuning estimated from the first
+    block. Beats come from librosa's tracker run over the last BEAT_WINDOW
+    seconds after each block.
+    """
+
+    def __init__(self, sr=22050, hop_length=512, n_fft=N_FFT, block_frames=BLOCK_FRAMES,
+                 beat_window=BEAT_WINDOW):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.block_frames = block_frames
+        self.beat_window_frames = int(beat_window * sr / hop_length)
+        self.settle_frames = int(BEAT_SETTLE * sr / hop_length)
+        # onset_strength compares each frame with the one before, then delays by n_fft / 2 for centering
+        self.onset_delay = 1 + n_fft // (2 * hop_length)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, fmax=0.5 * sr)
+
+    def read_blocks(self, audio_path):
+        """Mono float32 audio at self.sr, in pieces of about READ_SECONDS"""
+        with sf.SoundFile(audio_path) as f:
+            resampler = None
+            if f.samplerate != self.sr:
+                resampler = soxr.ResampleStream(f.samplerate, self.sr, 1, dtype="float32", quality="HQ")
+            for block in f.blocks(blocksize=int(READ_SECONDS * f.samplerate), dtype="float32", always_2d=True):
+                mono = block.mean(axis=1)
+                yield resampler.resample_chunk(mono) if resampler else mono
+            if resampler:
+                yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+    def stream(self, audio_path):
+        """Yield a dict per block of frames as the file decodes
+
+        Each dict has "start" (index of its first frame), "times" (frame
+        times in seconds), per-frame "rms", "onset_env", "beat_env",
+        "spectral_centroid", "spectral_rolloff" and "chroma", the beats
+        found so far that were not reported before ("beats", in seconds)
+        and the current "tempo" estimate.
+        """
+        self.frames = 0
+        self.tuning = None
+        self.db_max = -np.inf
+        self.last_db = None
+        self.beat_env = np.zeros(0, dtype=np.float32)
+        self.last_beat = -np.inf
+        self.beat_history = []
+        self.tempo = 0.0
+
+        frame_span = self.n_fft + (self.block_frames - 1) * self.hop_length
+        buffer = np.zeros(self.n_fft // 2, dtype=np.float32)  # Centering pad
+        for audio in self.read_blocks(audio_path):
+            buffer = np.concatenate([buffer, audio])
+            while len(buffer) >= frame_span:
+                yield self.analyze_block(buffer[:frame_span])
+                buffer = buffer[self.block_frames * self.hop_length:]
+
+        # Final frames, against the trailing centering pad
+        buffer = np.concatenate([buffer, np.zeros(self.n_fft // 2, dtype=np.float32)])
+        if len(buffer) >= self.n_fft:
+            yield self.analyze_block(buffer, final=True)
+
+    def analyze_block(self, samples, final=False):
+        """Features of the whole frames in samples, which start at frame self.frames"""
+        frames = librosa.util.frame(samples, frame_length=self.n_fft, hop_length=self.hop_length)
+        rms = np.sqrt(np.mean(frames ** 2, axis=0))
+
+        S = np.abs(librosa.stft(samples, n_fft=self.n_fft, hop_length=self.hop_length, center=False))
+        args = dict(sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length)
+        centroid = librosa.feature.spectral_centroid(S=S, **args)[0]
+        rolloff = librosa.feature.spectral_rolloff(S=S, **args)[0]
+        power = np.square(S, out=S)
+        if self.tuning is None:
+            self.tuning = librosa.estimate_tuning(S=power, sr=self.sr, n_fft=self.n_fft)
+        chroma = librosa.feature.chroma_stft(S=power, tuning=self.tuning, **args)
+
+        # Mel dB clipped against the loudest frame so far, as power_to_db's top_db does over a whole track
+        db = librosa.power_to_db(self.mel_basis @ power, top_db=None)
+        self.db_max = max(self.db_max, float(db.max()))
+        np.maximum(db, self.db_max - TOP_DB, out=db)
+        onset_env, beat_env = self.onset_envelopes(db)
+
+        start = self.frames
+        self.frames += db.shape[1]
+        beats = self.track_beats(beat_env, final)
+        return {
+            "start": start,
+            "times": librosa.frames_to_time(np.arange(start, self.frames), sr=self.sr, hop_length=self.hop_length),
+            "rms": rms,
+            "onset_env": onset_env,
+            "beat_env": beat_env,
+            "spectral_centroid": centroid,
+            "spectral_rolloff": rolloff,
+            "chroma": chroma,
+            "beats": beats,
+            "tempo": self.tempo,
+        }
+
+    def onset_envelopes(self, db):
+        """Mean and median mel onset strength for the block's frames, carrying frames across blocks"""
+        if self.last_db is None:
+            # Nothing before the first frame: the envelope starts with onset_delay zeros, as in librosa
+            history = db
+            pad = np.zeros(self.onset_delay, dtype=db.dtype)
+        else:
+            history = np.concatenate([self.last_db, db], axis=1)
+            pad = np.zeros(0, dtype=db.dtype)
+        rise = np.maximum(0.0, history[:, 1:] - history[:, :-1])
+        n = db.shape[1]
+        onset_env = np.concatenate([pad, rise.mean(axis=0)])[:n]
+        beat_env = np.concatenate([pad, np.median(rise, axis=0)])[:n]
+        # The envelope trails the frames by onset_delay: the next block starts from these
+        self.last_db = history[:, -self.onset_delay:]
+        return onset_env, beat_env
+
+    def track_beats(self, beat_env, final):
+        """Run the beat tracker over the sliding window; return newly settled beat times
+
+        Beats already reported inside the window are marked as strong onsets
+        before tracking, so the tracker keeps their phase instead of
+        flipping to the off-beat when the window alone is ambiguous.
+        """
+        self.beat_env = np.concatenate([self.beat_env, beat_env])[-self.beat_window_frames:]
+        window_start = self.frames - len(self.beat_env)
+        if len(self.beat_env) < self.beat_window_frames // 2 and not final:
+            return np.zeros(0)
+
+        anchored = self.beat_env.copy()
+        committed = np.array([beat for beat in self.beat_history if beat >= window_start], dtype=int) - window_start
+        anchored[committed] = anchored.max()
+        tempo, beats = librosa.beat.beat_track(onset_envelope=anchored, sr=self.sr, hop_length=self.hop_length)
+        self.tempo = float(np.atleast_1d(tempo)[0])
+        if self.tempo <= 0:
+            return np.zeros(0)
+
+        min_gap = 0.5 * 60.0 / self.tempo * self.sr / self.hop_length
+        settled = self.frames if final else self.frames - self.settle_frames
+        new_beats = []
+        for beat in beats + window_start:
+            if beat > self.last_beat + min_gap and beat < settled:
+                new_beats.append(beat)
+                self.last_beat = beat
+        self.beat_history = (self.beat_history + new_beats)[-self.beat_window_frames:]
+        return librosa.frames_to_time(np.array(new_beats, dtype=int), sr=self.sr, hop_length=self.hop_length)
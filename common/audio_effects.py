@@ -0,0 +1,303 @@
+"""
+Real-time audio effects processed in place on float32 blocks.
+
+Every effect owns the buffers it needs, sized once for the block size, so
+processing a block allocates nothing: a chain can run inside an audio
+callback without feeding the garbage collector. EffectsChain passes
+full=True for a whole block in its own buffer; that path only touches
+arrays, views and 0-d scalar arrays made up front, because in Python
+even small things allocate per call: slicing makes a view object, a
+Python float operand becomes a temporary array, len() of a block is a
+new int and a for loop makes an iterator. Other blocks are sliced as
+needed.
+
+    chain = EffectsChain([Echo(0.25, feedback=0.4), Gain(1.5), Limiter()])
+    out = chain.process_pcm16(in_data)  # int16 bytes in, int16 array out (reused)
+"""
+import numpy as np
+
+RATE = 44100
+BLOCK_SIZE = 1024
+
+
+def scalar(value):
+    """0-d float32 array: NumPy uses it as is, where a Python float operand is converted on every call"""
+    return np.array(value, dtype=np.float32)
+
+
+class DelayLine:
+    """Circular buffer remembering at least the last `capacity` samples written
+
+    The capacity is rounded up to whole blocks and the first block is
+    mirrored after the end, so a full block written at a block boundary
+    never wraps and a read of up to a block is one contiguous view. Those
+    views are made once per row and offset, and reused.
+    """
+
+    def __init__(self, capacity, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.capacity = max(1, -(-capacity // block_size)) * block_size
+        self.buffer = np.zeros(self.capacity + block_size, dtype=np.float32)
+        self.rows = list(self.buffer[:self.capacity].reshape(-1, block_size))
+        self.mirror = self.buffer[self.capacity:]  # Copy of rows[0]
+        # Write position after each row, computed once (ints above 256 are new objects)
+        self.next_pos = [(row + 1) * block_size % self.capacity for row in range(len(self.rows))]
+        self.views = {}  # offset -> per row, the samples read from there
+        self.pos = 0  # Where the next sample is written
+
+    @property
+    def aligned(self):
+        return self.pos % self.block_size == 0
+
+    def write(self, samples, full=False):
+        """Append samples; full=True for exactly one block"""
+        if full and self.aligned:
+            row = self.pos // self.block_size
+            np.copyto(self.rows[row], samples)
+            if row == 0:
+                np.copyto(self.mirror, samples)
+            self.pos = self.next_pos[row]
+            return
+        n = len(samples)
+        first = min(n, self.capacity - self.pos)
+        self.buffer[self.pos:self.pos + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.mirror[:] = self.buffer[:self.block_size]
+        self.pos = (self.pos + n) % self.capacity
+
+    def view(self, offset):
+        """The min(offset, block size) samples starting `offset` samples before the aligned write position"""
+        views = self.views.get(offset)
+        if views is None:
+            views = self.views[offset] = self.make_views(offset)
+        return views[self.pos // self.block_size]
+
+    def make_views(self, offset):
+        # Not inlined in view(): variables a comprehension uses become cells, allocated on every call
+        n = min(offset, self.block_size)
+        starts = [(row * self.block_size - offset) % self.capacity for row in range(len(self.rows))]
+        return [self.buffer[start:start + n] for start in starts]
+
+    def read(self, offset, out):
+        """Fill `out` with the samples starting `offset` samples before the write position"""
+        n = len(out)
+        start = (self.pos - offset) % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:n - first]
+        return out
+
+    def clear(self):
+        self.buffer.fill(0.0)
+        self.pos = 0
+
+
+class Delay:
+    """Delays the signal by a whole number of samples"""
+
+    def __init__(self, seconds, sample_rate=RATE, block_size=BLOCK_SIZE):
+        self.samples = max(0, int(round(seconds * sample_rate)))
+        self.offset = self.samples + block_size  # Where a full block is read from, behind the write position
+        self.line = DelayLine(self.offset, block_size)
+        self.scratch = np.zeros(block_size, dtype=np.float32)
+
+    def process(self, block, full=False):
+        if full and self.line.aligned:
+            self.line.write(block, full)
+            np.copyto(block, self.line.view(self.offset))
+            return
+        n = len(block)
+        self.line.write(block)
+        block[:] = self.line.read(n + self.samples, self.scratch[:n])
+
+    def reset(self):
+        self.line.clear()
+
+
+class Echo:
+    """Feedback echo: y[n] = x[n] + feedback * y[n - delay]
+
+    Delays shorter than a block are handled by processing the block in
+    pieces no longer than the delay, so the echo is sample-accurate.
+    """
+
+    def __init__(self, seconds=0.1, feedback=0.5, sample_rate=RATE, block_size=BLOCK_SIZE):
+        self.samples = max(1, int(round(seconds * sample_rate)))
+        self.feedback = feedback
+        self.scale = scalar(feedback)
+        self.line = DelayLine(self.samples, block_size)
+        self.scratch = np.zeros(min(block_size, self.samples), dtype=np.float32)
+        self.block = None  # The full block the views below belong to
+        self.first = None  # Its first piece, echoing the delay line
+        self.pieces = []  # The other pieces, each with what it echoes and its scratch
+        self.piece_count = 0
+
+    def process(self, block, full=False):
+        if full and self.line.aligned:
+            self.process_full(block)
+            return
+        for start in range(0, len(block), self.samples):
+            piece = block[start:start + self.samples]
+            delayed = self.line.read(self.samples, self.scratch[:len(piece)])
+            delayed *= self.feedback
+            piece += delayed
+            self.line.write(piece)
+
+    def process_full(self, block):
+        if block is not self.block:
+            self.split(block)
+        np.multiply(self.line.view(self.samples), self.scale, out=self.scratch)
+        self.first += self.scratch
+        i = 0
+        while i < self.piece_count:  # Not a for loop, which makes an iterator
+            piece, delayed, scratch = self.pieces[i]
+            np.multiply(delayed, self.scale, out=scratch)
+            piece += scratch
+            i += 1
+        self.line.write(block, True)
+
+    def split(self, block):
+        """Views of a full block's delay-sized pieces, kept while the caller passes the same array"""
+        d = self.samples
+        n = len(block)
+        self.block = block
+        self.first = block[:d]
+        self.pieces = [(block[start:start + d], block[start - d:min(start, n - d)], self.scratch[:min(d, n - start)])
+                       for start in range(d, n, d)]
+        self.piece_count = len(self.pieces)
+
+    def reset(self):
+        self.line.clear()
+
+
+class Gain:
+    """Scales the signal by a fixed factor"""
+
+    def __init__(self, factor=1.0):
+        self.factor = factor
+        self.scale = scalar(factor)
+
+    @classmethod
+    def from_db(cls, db):
+        return cls(10 ** (db / 20))
+
+    def process(self, block, full=False):
+        block *= self.scale
+
+    def reset(self):
+        pass
+
+
+class Limiter:
+    """Peak limiter keeping the signal within +-threshold
+
+    Gain drops at once when a block's peak would exceed the threshold and
+    recovers linearly over `release` seconds, ramped sample by sample so
+    the recovery does not click. A final clip catches what the block-level
+    gain misses.
+    """
+
+    def __init__(self, threshold=0.9, release=0.05, sample_rate=RATE, block_size=BLOCK_SIZE):
+        self.threshold = threshold
+        self.ceiling = scalar(threshold)
+        self.floor = scalar(-threshold)
+        self.release_per_sample = 1.0 / max(1, release * sample_rate)
+        self.gain = 1.0
+        self.block_size = block_size
+        self.ramp = np.arange(1, block_size + 1, dtype=np.float32)
+        # Envelope scratch padded to rows of 256 samples, so the peak is found by a row and
+        # column below 256: Python caches those ints, a larger index is a new object per block
+        self.scratch = np.zeros(-(-block_size // 256) * 256, dtype=np.float32)
+        self.envelope = self.scratch[:block_size]
+        self.grid = self.scratch.reshape(-1, 256)
+        self.peak_index = np.zeros((), dtype=np.intp)
+        self.peak_row = np.zeros((), dtype=np.intp)
+        self.peak_column = np.zeros((), dtype=np.intp)
+        self.row_length = np.array(256, dtype=np.intp)
+        self.step = scalar(0.0)
+        self.start = scalar(0.0)
+
+    def process(self, block, full=False):
+        if full:
+            n, envelope, ramp = self.block_size, self.envelope, self.ramp
+        else:
+            n = len(block)
+            if n == 0:
+                return
+            envelope, ramp = self.scratch[:n], self.ramp[:n]
+        np.abs(block, out=envelope)
+        # argmax into a preallocated index: max() would allocate for its reduction
+        envelope.argmax(out=self.peak_index)
+        np.floor_divide(self.peak_index, self.row_length, out=self.peak_row)
+        np.remainder(self.peak_index, self.row_length, out=self.peak_column)
+        peak = self.grid.item(self.peak_row, self.peak_column)
+        target = self.threshold / peak if peak > self.threshold else 1.0
+        if target < self.gain:
+            self.gain = target
+            self.step.fill(target)
+            block *= self.step
+        elif self.gain < 1.0:
+            end = self.gain + self.release_per_sample * n
+            if end > target:  # Not min(), whose argument tuple is allocated
+                end = target
+            self.step.fill((end - self.gain) / n)
+            self.start.fill(self.gain)
+            np.multiply(ramp, self.step, out=envelope)
+            envelope += self.start
+            block *= envelope
+            self.gain = end
+        np.minimum(block, self.ceiling, out=block)
+        np.maximum(block, self.floor, out=block)
+
+    def reset(self):
+        self.gain = 1.0
+
+
+class EffectsChain:
+    """Effects applied in order to each block, in place"""
+
+    def __init__(self, effects, block_size=BLOCK_SIZE):
+        self.effects = list(effects)
+        self.block = np.zeros(block_size, dtype=np.float32)
+        self.pcm = np.zeros(block_size, dtype=np.int16)
+        self.pcm_in = np.zeros(block_size, dtype=np.int16)
+        self.pcm_in_bytes = memoryview(self.pcm_in).cast("B")
+        self.to_float = scalar(1 / 32768)
+        self.to_pcm = scalar(32768)
+        self.ceiling = scalar(32767 / 32768)
+        self.floor = scalar(-1.0)
+
+    def process(self, block, full=False):
+        i = 0
+        while i < len(self.effects):  # Not a for loop, which makes an iterator
+            self.effects[i].process(block, full)
+            i += 1
+        return block
+
+    def process_pcm16(self, data):
+        """Run int16 PCM (bytes or array) through the chain; returns the chain's reused int16 buffer"""
+        try:
+            # One block of int16 bytes, copied straight into the chain's buffer
+            self.pcm_in_bytes[:] = data
+            full = True
+        except (TypeError, ValueError):  # Another length, or an array
+            full = False
+        if full:
+            block, pcm = self.block, self.pcm
+            np.copyto(block, self.pcm_in)
+        else:
+            samples = np.frombuffer(data, dtype=np.int16)
+            n = len(samples)
+            block, pcm = self.block[:n], self.pcm[:n]
+            block[:] = samples
+        block *= self.to_float
+        self.process(block, full)
+        np.minimum(block, self.ceiling, out=block)
+        np.maximum(block, self.floor, out=block)
+        block *= self.to_pcm
+        np.copyto(pcm, block, casting="unsafe")
+        return pcm
+
+    def reset(self):
+        for effect in self.effects:
+            effect.reset()
@@ -0,0 +1,405 @@
+"""
+Microphone -> effects -> speakers without an event loop in between.
+
+The audio callbacks move the data themselves: in "duplex" mode one
+full-duplex stream hands each input block to the callback, which returns
+the processed block as the output. In "ring" mode (input and output on
+different devices) the input callback writes into a lock-free
+single-producer single-consumer ring and the output callback reads from
+it. Underruns, overruns and latency are counted as they happen.
+
+WavLoopbackAudio stands in for pyaudio.PyAudio: its input plays a WAV
+file and its output is recorded to another, so the whole path can be
+measured without a sound card. Shared by the fireworks and week06
+loopbacks, which add this common/ directory to sys.path.
+
+    loopback = DuplexLoopback(pyaudio.PyAudio(), effects=EffectsChain([Echo()]))
+    loopback.start()
+    ...
+    print(loopback.report())
+"""
+import time
+import wave
+import threading
+
+import pyaudio
+import numpy as np
+
+RATE = 44100
+CHUNK = 1024
+
+
+class SpscRing:
+    """Lock-free ring of int16 samples between one producer and one consumer thread
+
+    Only the producer advances `written` and only the consumer advances
+    `consumed`, each after its copy is complete, so neither side ever
+    sees a half-written block and no lock is needed.
+    """
+
+    def __init__(self, capacity):
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.written = 0  # Total samples written (producer only)
+        self.consumed = 0  # Total samples read or skipped (consumer only)
+        self.overruns = 0  # Blocks the producer dropped because the ring was full
+        self.underruns = 0  # Reads the consumer had to pad with silence
+
+    def available(self):
+        return self.written - self.consumed
+
+    def write(self, samples):
+        """Append a block; drops it (an overrun) if it does not fit. Producer thread only."""
+        n = len(samples)
+        if n > self.capacity - self.available():
+            self.overruns += 1
+            return False
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.written += n
+        return True
+
+    def read_into(self, out):
+        """Fill `out`, padding with silence (an underrun) if too few samples are buffered. Consumer only."""
+        n = min(len(out), self.available())
+        start = self.consumed % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:n] = self.buffer[:n - first]
+        if n < len(out):
+            out[n:] = 0
+            self.underruns += 1
+        self.consumed += n
+        return n
+
+    def skip(self, count):
+        """Discard the oldest `count` samples. Consumer thread only."""
+        self.consumed += min(count, self.available())
+
+
+class DuplexLoopback:
+    """Runs input blocks through an effects chain straight to the output
+
+    mode="duplex" opens one stream with input and output, so every output
+    block is the processed input block of the same callback: no buffering
+    beyond the device's own. mode="ring" opens separate streams joined by
+    an SpscRing; the output starts once `prefill` blocks are buffered,
+    re-primes after an underrun and skips a block when more than
+    `prefill + 2` are waiting, so clock drift between two devices cannot
+    make the latency grow without bound.
+    """
+
+    def __init__(self, audio, effects=None, rate=RATE, chunk=CHUNK, mode="duplex", prefill=2, ring_blocks=8,
+                 input_device_index=None, output_device_index=None):
+        self.audio = audio
+        self.effects = effects
+        self.rate = rate
+        self.chunk = chunk
+        self.mode = mode
+        self.prefill = prefill * chunk
+        self.max_buffered = (prefill + 2) * chunk
+        self.silence = bytes(chunk * 2)
+        self.out = np.zeros(chunk, dtype=np.int16)
+
+        self.blocks_in = 0
+        self.blocks_out = 0
+        self.device_overflows = 0  # Reported by the input device (paInputOverflow)
+        self.device_underflows = 0  # Reported by the output device (paOutputUnderflow)
+        self.skipped = 0  # Blocks the output dropped to keep latency down (counted as overruns)
+        self.buffered_total = 0  # Samples waiting in the ring, summed over output callbacks
+        self.primed = False
+
+        stream_args = dict(format=pyaudio.paInt16, channels=1, rate=rate, frames_per_buffer=chunk)
+        if mode == "duplex":
+            self.ring = None
+            self.stream = audio.open(input=True, output=True, input_device_index=input_device_index,
+                                     output_device_index=output_device_index,
+                                     stream_callback=self._duplex_callback, **stream_args)
+            self.streams = [self.stream]
+        elif mode == "ring":
+            self.ring = SpscRing(ring_blocks * chunk)
+            self.input_stream = audio.open(input=True, input_device_index=input_device_index,
+                                           stream_callback=self._input_callback, **stream_args)
+            self.output_stream = audio.open(output=True, output_device_index=output_device_index,
+                                            stream_callback=self._output_callback, **stream_args)
+            self.streams = [self.input_stream, self.output_stream]
+        else:
+            raise ValueError(f"unknown loopback mode {mode!r} (choose duplex or ring)")
+
+    def process(self, in_data):
+        """Processed int16 block (an array owned by the effects chain) or the input unchanged"""
+        if self.effects is None:
+            return np.frombuffer(in_data, dtype=np.int16)
+        return self.effects.process_pcm16(in_data)
+
+    def _count_status(self, status):
+        if status & pyaudio.paInputOverflow:
+            self.device_overflows += 1
+        if status & pyaudio.paOutputUnderflow:
+            self.device_underflows += 1
+
+    def _duplex_callback(self, in_data, frame_count, time_info, status):
+        self._count_status(status)
+        self.blocks_in += 1
+        self.blocks_out += 1
+        if in_data is None:
+            return (self.silence, pyaudio.paContinue)
+        return (self.process(in_data).tobytes(), pyaudio.paContinue)
+
+    def _input_callback(self, in_data, frame_count, time_info, status):
+        """Producer: process the block and hand it to the output side"""
+        self._count_status(status)
+        self.blocks_in += 1
+        self.ring.write(self.process(in_data))
+        return (None, pyaudio.paContinue)
+
+    def _output_callback(self, in_data, frame_count, time_info, status):
+        """Consumer: play buffered audio, silence until primed"""
+        self._count_status(status)
+        ring = self.ring
+        if not self.primed:
+            if ring.available() < self.prefill:
+                return (self.silence, pyaudio.paContinue)
+            self.primed = True
+        if ring.available() > self.max_buffered:
+            # Input clock running fast: drop a block rather than let latency build up
+            ring.skip(self.chunk)
+            self.skipped += 1
+        self.blocks_out += 1
+        self.buffered_total += max(0, ring.available() - frame_count)  # Still waiting behind this block
+        if ring.read_into(self.out[:frame_count]) < frame_count:
+            self.primed = False  # Build the cushion up again before playing on
+        return (self.out[:frame_count].tobytes(), pyaudio.paContinue)
+
+    @property
+    def underruns(self):
+        return self.ring.underruns if self.ring is not None else 0
+
+    @property
+    def overruns(self):
+        return self.ring.overruns + self.skipped if self.ring is not None else 0
+
+    def device_latency(self):
+        """Input plus output latency the streams report, in seconds"""
+        if self.mode == "duplex":
+            return self.stream.get_input_latency() + self.stream.get_output_latency()
+        return self.input_stream.get_input_latency() + self.output_stream.get_output_latency()
+
+    def buffered_latency(self):
+        """Average time a block waited in the ring before playing, in seconds (0 in duplex mode)"""
+        if self.ring is None or self.blocks_out == 0:
+            return 0.0
+        return self.buffered_total / self.blocks_out / self.rate
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "blocks_in": self.blocks_in,
+            "blocks_out": self.blocks_out,
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+            "device_overflows": self.device_overflows,
+            "device_underflows": self.device_underflows,
+            "device_latency_ms": self.device_latency() * 1000,
+            "buffered_latency_ms": self.buffered_latency() * 1000,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"Loopback ({s['mode']}): {s['device_latency_ms'] + s['buffered_latency_ms']:.1f} ms round trip "
+                f"(device {s['device_latency_ms']:.1f} + buffered {s['buffered_latency_ms']:.1f}), "
+                f"{s['underruns']} underruns, {s['overruns']} overruns, "
+                f"device {s['device_overflows']} overflows / {s['device_underflows']} underflows")
+
+    def start(self):
+        for stream in self.streams:
+            stream.start_stream()
+
+    def is_active(self):
+        return all(stream.is_active() for stream in self.streams)
+
+    def stop(self):
+        for stream in self.streams:
+            stream.stop_stream()
+
+    def close(self):
+        for stream in self.streams:
+            stream.close()
+
+
+class SimulatedStream:
+    """One stream of a WavLoopbackAudio device"""
+
+    def __init__(self, device, input, output, frames_per_buffer, stream_callback):
+        self.device = device
+        self.input = input
+        self.output = output
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = stream_callback
+        self.active = False
+        self.started = False
+
+    def start_stream(self):
+        self.active = True
+        self.started = True
+        self.device.stream_started()
+
+    def stop_stream(self):
+        self.active = False
+        self.device.stop()
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.stop_stream()
+
+    def get_input_latency(self):
+        return self.frames_per_buffer / self.device.rate if self.input else 0.0
+
+    def get_output_latency(self):
+        return self.frames_per_buffer / self.device.rate if self.output else 0.0
+
+
+class WavLoopbackAudio:
+    """Stand-in for pyaudio.PyAudio: input streams play a WAV file, output streams are recorded
+
+    Every stream opened on it runs off one device clock thread, started
+    once all of them have been started. Each tick delivers an input block,
+    then asks each output for one (a duplex stream gets both in one call).
+    `input_drift` runs a separate input stream's clock that fraction
+    faster (or slower, if negative) than the output, like two devices,
+    which is what makes a ring over- or underrun. realtime=False ticks as
+    fast as the callbacks allow. After the file ends the input delivers
+    silence for `tail_seconds`, then the recording is written to
+    `output_path` (if given).
+    """
+
+    def __init__(self, input_path, output_path=None, realtime=True, input_drift=0.0, tail_seconds=0.5):
+        self.input_samples, self.rate = load_wav_int16(input_path)
+        self.output_path = output_path
+        self.realtime = realtime
+        self.input_drift = input_drift
+        self.tail_seconds = tail_seconds
+        self.streams = []
+        self.recorded = []  # Output blocks, int16
+        self.thread = None
+        self.running = False
+        self.finished = threading.Event()
+
+    def open(self, format=pyaudio.paInt16, channels=1, rate=None, input=False, output=False,
+             frames_per_buffer=CHUNK, stream_callback=None, **kwargs):
+        if rate is not None and rate != self.rate:
+            raise ValueError(f"simulated device runs at the WAV file's {self.rate} Hz, not {rate}")
+        stream = SimulatedStream(self, input, output, frames_per_buffer, stream_callback)
+        self.streams.append(stream)
+        return stream
+
+    def stream_started(self):
+        if self.thread is None and all(stream.started for stream in self.streams):
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        block = self.streams[0].frames_per_buffer
+        block_seconds = block / self.rate
+        position = 0
+        phase = 0.0
+        tail_blocks = int(self.tail_seconds / block_seconds)
+        start = next_time = time.perf_counter()
+        tick = 0
+
+        silence = bytes(block * 2)
+        duplex = any(stream.input and stream.output for stream in self.streams)
+        drift = 0.0 if duplex else self.input_drift  # One stream, one clock
+
+        while self.running:
+            if position >= len(self.input_samples):
+                if tail_blocks <= 0:
+                    break
+                tail_blocks -= 1
+            now = start + tick * block_seconds
+            time_info = {"input_buffer_adc_time": now, "current_time": now,
+                         "output_buffer_dac_time": now + block_seconds}
+            in_data = silence
+            phase += 1.0 + drift
+            while phase >= 1.0:
+                phase -= 1.0
+                if position + block <= len(self.input_samples):
+                    in_data = self.input_samples[position:position + block].tobytes()
+                else:
+                    in_data = silence
+                position += block
+                for stream in self.streams:
+                    if stream.active and stream.input and not stream.output:
+                        stream.callback(in_data, block, time_info, 0)
+
+            for stream in self.streams:
+                if stream.active and stream.output:
+                    out_data, flag = stream.callback(in_data if stream.input else None, block, time_info, 0)
+                    self.recorded.append(np.frombuffer(out_data, dtype=np.int16).copy())
+                    if flag != pyaudio.paContinue:
+                        stream.active = False
+
+            tick += 1
+            if self.realtime:
+                next_time += block_seconds
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+        self.running = False
+        for stream in self.streams:
+            stream.active = False
+        if self.output_path:
+            save_wav_int16(self.output_path, self.output_samples(), self.rate)
+        self.finished.set()
+
+    def output_samples(self):
+        """Everything the output streams played, as one int16 array"""
+        return np.concatenate(self.recorded) if self.recorded else np.zeros(0, dtype=np.int16)
+
+    def wait(self, timeout=None):
+        """Block until the input file (and tail) has been played through"""
+        return self.finished.wait(timeout)
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def terminate(self):
+        self.stop()
+
+
+def measure_lag(reference, recorded, max_lag):
+    """Samples by which `recorded` trails `reference`, from their cross-correlation"""
+    n = len(reference) + max_lag
+    size = 1 << (n - 1).bit_length() + 1
+    a = np.fft.rfft(reference.astype(np.float64), size)
+    b = np.fft.rfft(recorded[:n].astype(np.float64), size)
+    correlation = np.fft.irfft(np.conj(a) * b, size)[:max_lag + 1]
+    return int(np.argmax(correlation))
+
+
+def load_wav_int16(path):
+    """Read a 16-bit PCM WAV file as mono int16 samples; returns (samples, rate)"""
+    with wave.open(path, "rb") as wav_file:
+        rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        frames = wav_file.readframes(wav_file.getnframes())
+    samples = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+def save_wav_int16(path, samples, rate):
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(samples.astype(np.int16).tobytes())
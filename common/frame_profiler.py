@@ -0,0 +1,222 @@
+"""
+Frame profiler for the pygame apps: scoped section timers, an on-screen
+frame-time graph and Chrome-trace export (open in chrome://tracing or
+https://ui.perfetto.dev). Shared by the fireworks, dance and spectrogram
+apps, which add this common/ directory to sys.path.
+
+    profiler = FrameProfiler()
+    while running:
+        profiler.start_frame()
+        with profiler.section("update"):
+            ...
+        with profiler.section("draw"):
+            ...
+        profiler.draw(screen)
+        pygame.display.flip()
+
+F3 toggles profiling and the graph, F4 writes the recorded trace.
+"""
+import json
+import time
+import threading
+from collections import deque
+
+import pygame
+
+GRAPH_WIDTH = 240  # One pixel column per frame
+GRAPH_HEIGHT = 100
+GRAPH_MS = 50.0  # Frame time at the top of the graph
+OTHER_COLOR = (90, 90, 90)  # Frame time outside any section
+SECTION_COLORS = [(80, 200, 255), (255, 170, 60), (120, 230, 120), (240, 90, 160),
+                  (200, 160, 255), (255, 230, 90), (90, 220, 200), (255, 120, 100)]
+
+
+class _NullSection:
+    """What section() returns while profiling is off: entering and leaving cost nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    """Times named sections of each frame while enabled
+
+    Sections timed on the thread that created the profiler add up into the
+    current frame's bar in the graph; sections on other threads (audio
+    callbacks) only go to the trace, on their own track. Trace events are
+    kept in a bounded buffer, so a long session keeps its last
+    `max_events` sections.
+    """
+
+    def __init__(self, enabled=False, trace_path=None, budget_ms=1000 / 60,
+                 max_events=200000):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.budget_ms = budget_ms  # Drawn as a line across the graph
+        self.events = deque(maxlen=max_events)  # (name, thread id, start, end) in perf_counter seconds
+        self.main_thread = threading.get_ident()
+        self.thread_names = {self.main_thread: threading.current_thread().name}
+        self.frame_start = None
+        self.frame_sections = {}  # Section name -> seconds in the current frame
+        self.frame_times = deque(maxlen=GRAPH_WIDTH)  # Milliseconds, for the legend averages
+        self.section_totals = {}
+        self.colors = {}
+
+        self.graph = None  # Scrolling graph surface, created on first draw
+        self.legend = None
+        self.legend_frame = 0
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        self.frame_sections.clear()
+        print(f"⏱️ Frame profiler {'on (F4 saves trace)' if self.enabled else 'off'}")
+
+    def handle_key(self, key):
+        """F3 toggles profiling, F4 saves the trace; returns True if the key was used"""
+        if key == pygame.K_F3:
+            self.toggle()
+            return True
+        if key == pygame.K_F4:
+            self.save_trace()
+            return True
+        return False
+
+    def section(self, name):
+        """Context manager timing the enclosed block as `name`"""
+        if not self.enabled:
+            return NULL_SECTION
+        return _Section(self, name)
+
+    def record(self, name, start, end):
+        thread = threading.get_ident()
+        if thread not in self.thread_names:
+            self.thread_names[thread] = threading.current_thread().name
+        self.events.append((name, thread, start, end))
+        if thread == self.main_thread:
+            self.frame_sections[name] = self.frame_sections.get(name, 0.0) + (end - start)
+
+    def start_frame(self):
+        """Close the previous frame (if profiling) and start timing the next"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.events.append(("frame", self.main_thread, self.frame_start, now))
+            self.add_column((now - self.frame_start) * 1000, self.frame_sections)
+        self.frame_start = now
+        self.frame_sections = {}
+
+    def add_column(self, frame_ms, sections):
+        """Scroll the graph one column and draw the finished frame as a stacked bar"""
+        self.frame_times.append(frame_ms)
+        for name, seconds in sections.items():
+            totals = self.section_totals.setdefault(name, deque(maxlen=GRAPH_WIDTH))
+            totals.append(seconds * 1000)
+        if self.graph is None:
+            return
+
+        self.graph.scroll(-1, 0)
+        x = GRAPH_WIDTH - 1
+        pygame.draw.line(self.graph, (15, 15, 25), (x, 0), (x, GRAPH_HEIGHT - 1))
+        scale = GRAPH_HEIGHT / GRAPH_MS
+        bottom = GRAPH_HEIGHT
+        for name, seconds in sections.items():
+            height = seconds * 1000 * scale
+            top = max(0, bottom - height)
+            if bottom - top >= 0.5:
+                pygame.draw.line(self.graph, self.color(name), (x, int(top)), (x, int(bottom) - 1))
+            bottom = top
+        frame_top = max(0, GRAPH_HEIGHT - frame_ms * scale)
+        if bottom - frame_top >= 0.5:
+            pygame.draw.line(self.graph, OTHER_COLOR, (x, int(frame_top)), (x, int(bottom) - 1))
+        budget_y = int(GRAPH_HEIGHT - self.budget_ms * scale)
+        self.graph.set_at((x, budget_y), (255, 60, 60))
+
+    def color(self, name):
+        if name not in self.colors:
+            self.colors[name] = SECTION_COLORS[len(self.colors) % len(SECTION_COLORS)]
+        return self.colors[name]
+
+    def draw(self, screen, position=None):
+        """Blit the graph and legend (bottom-right by default); returns the covered rect or None"""
+        if not self.enabled:
+            return None
+        if self.graph is None:
+            self.graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT))
+            self.graph.fill((15, 15, 25))
+            self.font = pygame.font.Font(None, 18)
+        # The legend text is re-rendered every 30 frames, not every frame
+        if self.legend is None or self.legend_frame >= 30:
+            self.legend = self.render_legend()
+            self.legend_frame = 0
+        self.legend_frame += 1
+
+        width = GRAPH_WIDTH
+        height = GRAPH_HEIGHT + self.legend.get_height()
+        if position is None:
+            position = (screen.get_width() - width - 10, screen.get_height() - height - 10)
+        rect = pygame.Rect(position, (width, height))
+        screen.blit(self.graph, position)
+        screen.blit(self.legend, (position[0], position[1] + GRAPH_HEIGHT))
+        return rect
+
+    def render_legend(self):
+        lines = []
+        if self.frame_times:
+            times = sorted(self.frame_times)
+            average = sum(times) / len(times)
+            lines.append((f"frame {average:.1f} ms avg, {times[-1]:.1f} max", (230, 230, 230)))
+        for name, totals in self.section_totals.items():
+            lines.append((f"{name} {sum(totals) / max(1, len(self.frame_times)):.2f} ms", self.color(name)))
+
+        legend = pygame.Surface((GRAPH_WIDTH, 4 + 16 * len(lines)))
+        legend.fill((15, 15, 25))
+        for i, (text, color) in enumerate(lines):
+            legend.blit(self.font.render(text, True, color), (4, 2 + i * 16))
+        return legend
+
+    def save_trace(self, path=None):
+        """Write the recorded sections as Chrome-trace JSON (complete events, microseconds)"""
+        path = path or self.trace_path or "frame_trace.json"
+        events = list(self.events)
+        if not events:
+            print("⏱️ No profiler events recorded (press F3 to start profiling)")
+            return None
+        origin = min(start for _, _, start, _ in events)
+        trace = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": thread, "args": {"name": name}}
+                 for thread, name in self.thread_names.items()]
+        trace.extend({"name": name, "ph": "X", "pid": 1, "tid": thread,
+                      "ts": round((start - origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+                     for name, thread, start, end in events)
+        try:
+            with open(path, "w") as f:
+                json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+            print(f"⏱️ Frame trace saved: {path} ({len(events)} events)")
+        except Exception as e:
+            print(f"❌ Could not save frame trace: {e}")
+            return None
+        return path
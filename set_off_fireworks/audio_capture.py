@@ -0,0 +1,230 @@
+import threading
+import time
+import wave
+import contextlib
+from collections import deque
+
+import pyaudio
+import numpy as np
+
+
+class AudioCapture:
+    """Callback-driven microphone capture into a preallocated ring buffer
+
+    The PyAudio callback thread is the only writer. It copies each chunk
+    into the ring and then publishes a single (rms, peak, timestamp, chunk)
+    tuple, so the game loop can read the latest levels without locks and
+    without ever blocking on the audio device. With an onset_detector, each
+    chunk is also run through it and the LaunchEvents it emits are queued
+    for pop_onsets(). A FrameProfiler, if given, times each callback on
+    its own trace track.
+    """
+
+    def __init__(self, audio, sample_rate=44100, chunk_size=1024, ring_seconds=2.0, onset_detector=None,
+                 profiler=None):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.ring = np.zeros(int(sample_rate * ring_seconds), dtype=np.float32)
+        self.samples_written = 0
+
+        # (rms, peak, perf_counter time of the callback, chunk index)
+        self.latest = (0.0, 0.0, 0.0, 0)
+        self.onset_detector = onset_detector
+        self.onsets = deque(maxlen=64)  # append/popleft are thread-safe
+        self.profiler = profiler
+
+        self.stream = audio.open(
+            format=pyaudio.paFloat32,
+            channels=1,
+            rate=sample_rate,
+            input=True,
+            frames_per_buffer=chunk_size,
+            stream_callback=self._callback
+        )
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """Runs on the audio thread: store samples, then publish levels"""
+        with self.profiler.section("audio capture") if self.profiler else contextlib.nullcontext():
+            self.capture_chunk(np.frombuffer(in_data, dtype=np.float32))
+        return (None, pyaudio.paContinue)
+
+    def capture_chunk(self, samples):
+        """Copy one chunk into the ring, publish its levels and run onset detection"""
+        count = len(samples)
+
+        # Copy into the ring, wrapping at the end
+        start = self.samples_written % len(self.ring)
+        first = min(count, len(self.ring) - start)
+        self.ring[start:start + first] = samples[:first]
+        self.ring[:count - first] = samples[first:]
+        self.samples_written += count
+
+        now = time.perf_counter()
+        rms = float(np.sqrt(np.mean(samples * samples))) if count else 0.0
+        peak = float(np.max(np.abs(samples))) if count else 0.0
+        self.latest = (rms, peak, now, self.latest[3] + 1)
+        if self.onset_detector is not None:
+            self.onsets.extend(self.onset_detector.process(samples, now))
+
+    def pop_onsets(self):
+        """LaunchEvents detected since the last call, oldest first"""
+        events = []
+        while self.onsets:
+            events.append(self.onsets.popleft())
+        return events
+
+    def recent(self, count):
+        """Copy of the most recent `count` samples (oldest first)"""
+        count = min(count, len(self.ring), self.samples_written)
+        end = self.samples_written % len(self.ring)
+        return np.roll(self.ring, -end)[len(self.ring) - count:]
+
+    def start(self):
+        self.stream.start_stream()
+
+    def stop(self):
+        self.stream.stop_stream()
+
+    def close(self):
+        self.stream.close()
+
+
+class WavInputStream:
+    """Stand-in for a PyAudio input stream that plays a WAV file into the callback"""
+
+    def __init__(self, samples, rate, frames_per_buffer, stream_callback, realtime=True, loop=False):
+        self.samples = samples
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = stream_callback
+        self.realtime = realtime
+        self.loop = loop
+        self.start_time = None  # perf_counter time of the first sample
+        self.active = False
+        self.thread = None
+        self.start_stream()
+
+    def _run(self):
+        chunk_duration = self.frames_per_buffer / self.rate
+        position = 0
+        self.start_time = time.perf_counter()
+        next_time = self.start_time
+
+        while self.active:
+            chunk = self.samples[position:position + self.frames_per_buffer]
+            if len(chunk) < self.frames_per_buffer:
+                if not self.loop:
+                    break
+                position = 0
+                continue
+            position += self.frames_per_buffer
+
+            # Like a real device, a chunk is delivered once all its samples have "arrived"
+            next_time += chunk_duration
+            if self.realtime:
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            result = self.callback(chunk.tobytes(), len(chunk), {}, 0)
+            if result[1] != pyaudio.paContinue:
+                break
+        self.active = False
+
+    def start_stream(self):
+        if self.active:
+            return
+        self.active = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.stop_stream()
+
+
+class WavFileAudio:
+    """Stand-in for pyaudio.PyAudio whose input device reads from a WAV file"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.samples, self.file_rate = load_wav_mono(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.streams = []
+
+    def open(self, rate, frames_per_buffer, stream_callback, input=True, **kwargs):
+        samples = self.samples
+        if rate != self.file_rate:
+            # Linear resample to the requested stream rate
+            duration = len(samples) / self.file_rate
+            target = np.linspace(0, duration, int(duration * rate), endpoint=False)
+            source = np.arange(len(samples)) / self.file_rate
+            samples = np.interp(target, source, samples).astype(np.float32)
+
+        stream = WavInputStream(samples, rate, frames_per_buffer, stream_callback,
+                                realtime=self.realtime, loop=self.loop)
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        for stream in self.streams:
+            stream.close()
+
+
+class NullInputStream:
+    """Stand-in for a PyAudio input stream that never delivers audio"""
+
+    def __init__(self):
+        self.active = True
+
+    def start_stream(self):
+        self.active = True
+
+    def stop_stream(self):
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.active = False
+
+
+class NullAudio:
+    """Stand-in for pyaudio.PyAudio for headless runs that feed volumes directly"""
+
+    def open(self, **kwargs):
+        return NullInputStream()
+
+    def terminate(self):
+        pass
+
+
+def load_wav_mono(path):
+    """Read a 16-bit PCM WAV file as mono float32 in [-1, 1]"""
+    with wave.open(path, "rb") as wav_file:
+        rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        frames = wav_file.readframes(wav_file.getnframes())
+
+    samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def save_wav_mono(path, samples, rate):
+    """Write float samples in [-1, 1] as a 16-bit mono WAV file"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(pcm.tobytes())
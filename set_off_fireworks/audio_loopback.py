@@ -1,107 +1,56 @@
-import asyncio
+import os
+import sys
+import time
+import argparse
+
 import pyaudio
-import numpy as np
+
+# Shared modules (audio_effects.py, duplex_loopback.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from audio_effects import EffectsChain, Echo, Gain, Limiter
+from duplex_loopback import DuplexLoopback, WavLoopbackAudio
 
 # Audio parameters
 CHUNK = 1024
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
 RATE = 44100
 
-# Create async queues
-input_queue = asyncio.Queue()
-output_queue = asyncio.Queue()
 
-# Add echo effect
-echo_buffer = []
-def add_echo(audio_data, delay=0.1, decay=0.5):
-    global echo_buffer
-    echo_buffer.append(audio_data)
-    if len(echo_buffer) > int(RATE * delay / CHUNK):
-        old_data = echo_buffer.pop(0)
-        # Mix original data and delayed data
-        mixed_data = np.frombuffer(audio_data, dtype=np.int16) + \
-                    np.frombuffer(old_data, dtype=np.int16) * decay
-        # Prevent clipping
-        mixed_data = np.clip(mixed_data, -32768, 32767)
-        return mixed_data.astype(np.int16).tobytes()
-    return audio_data
+def make_effects():
+    """Sample-accurate feedback echo, gain and a limiter, processed in place"""
+    return EffectsChain([Echo(0.1, feedback=0.5), Gain(1.2), Limiter(threshold=0.9)], block_size=CHUNK)
 
-# Input callback function
-def input_callback(in_data, frame_count, time_info, status):
-    input_queue.put_nowait(in_data)
-    return (None, pyaudio.paContinue)
 
-# Output callback function  
-def output_callback(in_data, frame_count, time_info, status):
-    try:
-        data = output_queue.get_nowait()
-    except asyncio.QueueEmpty:
-        # Generate silence
-        data = b'\x00' * CHUNK * CHANNELS * 2  # 16-bit = 2 bytes
-    return (data, pyaudio.paContinue)
+def main():
+    parser = argparse.ArgumentParser(description="Microphone -> echo -> speakers loopback")
+    parser.add_argument("--mode", choices=["duplex", "ring"], default="duplex",
+                        help="one full-duplex stream, or separate input/output streams joined by a ring buffer")
+    parser.add_argument("--wav", default=None, help="play this WAV file instead of the microphone")
+    parser.add_argument("--out", default=None, help="with --wav, record the output here instead of the speakers")
+    parser.add_argument("--dry", action="store_true", help="no effects")
+    args = parser.parse_args()
+
+    audio = WavLoopbackAudio(args.wav, args.out) if args.wav else pyaudio.PyAudio()
+    loopback = DuplexLoopback(audio, effects=None if args.dry else make_effects(), rate=RATE, chunk=CHUNK,
+                              mode=args.mode)
 
-async def audio_processor():
     print("Starting audio loopback processing...")
     print("Please speak into the microphone, you will hear echo from speakers")
     print("Press Ctrl+C to stop")
-    
+
+    # The audio callbacks do all the work; this thread only reports
+    loopback.start()
     try:
-        while True:
-            # Get data from input queue
-            if not input_queue.empty():
-                input_data = await input_queue.get()
-                
-                # Audio processing code can be added here
-                # For example: add echo, change pitch, etc.
-                # Use echo effect in processor:
-                processed_data = add_echo(input_data)
-                
-                # Put processed data into output queue
-                await output_queue.put(processed_data)
-            else:
-                # If queue is empty, wait briefly
-                await asyncio.sleep(0.01)
-                
+        while loopback.is_active():
+            time.sleep(1.0)
+            print(f"\r🔁 {loopback.report()}", end="", flush=True)
     except KeyboardInterrupt:
-        print("Stopping audio processing")
+        print("\nStopping audio processing")
+    finally:
+        loopback.stop()
+        loopback.close()
+        audio.terminate()
+        print(f"\n🔁 {loopback.report()}")
 
-async def main():
-    p = pyaudio.PyAudio()
-    
-    # Open input stream (microphone)
-    input_stream = p.open(
-        format=FORMAT,
-        channels=CHANNELS,
-        rate=RATE,
-        input=True,
-        frames_per_buffer=CHUNK,
-        stream_callback=input_callback
-    )
-    
-    # Open output stream (speakers)
-    output_stream = p.open(
-        format=FORMAT,
-        channels=CHANNELS,
-        rate=RATE,
-        output=True,
-        frames_per_buffer=CHUNK,
-        stream_callback=output_callback
-    )
-    
-    # Start audio streams
-    input_stream.start_stream()
-    output_stream.start_stream()
-    
-    # Run audio processor
-    await audio_processor()
-    
-    # Stop and close streams
-    input_stream.stop_stream()
-    output_stream.stop_stream()
-    input_stream.close()
-    output_stream.close()
-    p.terminate()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
@@ -0,0 +1,138 @@
+"""
+Headless benchmark: cost of capturing one recorded frame with its text overlays.
+Compares the original path (array3d, transpose, PIL overlays, np.array),
+the previous one (tobytes, PIL overlays) and the current one (one copy from
+the surface's pixel buffer into a pooled frame, cached text sprites blended
+in NumPy). "capture" runs on the game thread, "overlay" on the encoder thread.
+Run: python benchmark_capture.py [--frames 120]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from create_comprehensive_demo import ComprehensiveFireworksDemo
+from frame_writer import copy_surface_rgb, blend_overlays
+from audio_capture import NullAudio
+
+
+class PilOverlay:
+    """The previous recorder overlay: PIL text boxes drawn onto every frame"""
+
+    def __init__(self):
+        try:
+            self.font_large = ImageFont.truetype("arial.ttf", 28)
+            self.font_small = ImageFont.truetype("arial.ttf", 20)
+        except Exception:
+            self.font_large = ImageFont.load_default()
+            self.font_small = ImageFont.load_default()
+
+    def text_box(self, draw, text, position, font, text_color, bg_color):
+        bbox = draw.textbbox((0, 0), text, font=font)
+        draw.rectangle([position[0] - 5, position[1] - 2, position[0] + bbox[2] - bbox[0] + 10,
+                        position[1] + bbox[3] - bbox[1] + 4], fill=bg_color)
+        draw.text(position, text, fill=text_color, font=font)
+
+    def draw(self, frame_image, state_info, action_info, frame_number):
+        draw = ImageDraw.Draw(frame_image)
+        self.text_box(draw, state_info, (15, 15), self.font_large, (255, 255, 255), (0, 0, 0, 180))
+        bbox = draw.textbbox((0, 0), action_info, font=self.font_small)
+        self.text_box(draw, action_info, (frame_image.width - bbox[2] + bbox[0] - 20, 15), self.font_small,
+                      (255, 255, 0), (0, 0, 0, 180))
+        frame_text = f"Frame: {frame_number}"
+        bbox = draw.textbbox((0, 0), frame_text, font=self.font_small)
+        self.text_box(draw, frame_text, (frame_image.width - bbox[2] + bbox[0] - 15, frame_image.height - 35),
+                      self.font_small, (255, 255, 255), (0, 0, 0, 120))
+
+
+def capture_array3d(game, overlay, frame_number, state):
+    start = time.perf_counter()
+    frame = np.transpose(pygame.surfarray.array3d(game.screen), (1, 0, 2))
+    captured = time.perf_counter()
+    image = Image.fromarray(frame)
+    overlay.draw(image, *state, frame_number)
+    frame = np.array(image)
+    return captured - start, time.perf_counter() - captured, frame
+
+
+def capture_tobytes(game, overlay, frame_number, state):
+    start = time.perf_counter()
+    screen = game.screen
+    frame = np.frombuffer(pygame.image.tobytes(screen, "RGB"), dtype=np.uint8).reshape(
+        screen.get_height(), screen.get_width(), 3)
+    captured = time.perf_counter()
+    image = Image.fromarray(frame)
+    overlay.draw(image, *state, frame_number)
+    frame = np.asarray(image)
+    return captured - start, time.perf_counter() - captured, frame
+
+
+def capture_sprites(game, buffer, frame_number, state):
+    start = time.perf_counter()
+    copy_surface_rgb(game.screen, buffer)
+    overlays = game.recorder.overlays(game.screen, *state, frame_number)
+    captured = time.perf_counter()
+    frame = blend_overlays(buffer, overlays)
+    return captured - start, time.perf_counter() - captured, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame capture and overlay cost of the recorders")
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = ComprehensiveFireworksDemo(audio_device=NullAudio(), seed=7)
+        game.current_action = "Phase: Monster Combat"
+        for tick in range(240):
+            if tick % 8 == 0:
+                game.apply_input("firework", 0.2)
+            game.step_simulation(voice_input=False)
+
+    pil_overlay = PilOverlay()
+    buffer = np.empty((game.height, game.width, 3), dtype=np.uint8)
+    paths = [("array3d + PIL", lambda n, state: capture_array3d(game, pil_overlay, n, state)),
+             ("tobytes + PIL", lambda n, state: capture_tobytes(game, pil_overlay, n, state)),
+             ("view + sprites", lambda n, state: capture_sprites(game, buffer, n, state))]
+    timings = {name: [] for name, _ in paths}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for frame_number in range(args.frames):
+            game.step_simulation(voice_input=False)
+            game.render()
+            state = (game.get_detailed_state_info(), game.current_action)
+            reference = np.frombuffer(pygame.image.tobytes(game.screen, "RGB"), dtype=np.uint8)
+            for name, capture in paths:
+                capture_s, overlay_s, frame = capture(frame_number, state)
+                timings[name].append((capture_s * 1000, overlay_s * 1000))
+            # Outside the overlay boxes the new path must match the screen exactly
+            copy_surface_rgb(game.screen, buffer)
+            assert np.array_equal(buffer.reshape(-1), reference), "captured pixels differ from the screen"
+
+    print(f"📸 Frame capture benchmark ({game.width}x{game.height}, {args.frames} frames, ms per frame)")
+    print(f"{'path':>15} {'capture':>8} {'overlay':>8} {'total':>8} {'p95':>7}")
+    for name, _ in paths:
+        per_frame = np.array(timings[name])
+        total = per_frame.sum(axis=1)
+        print(f"{name:>15} {per_frame[:, 0].mean():>8.2f} {per_frame[:, 1].mean():>8.2f} "
+              f"{total.mean():>8.2f} {np.percentile(total, 95):>7.2f}")
+
+    game.audio.terminate()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: cost per 1024-sample block of the loopback effects, and a
+check that they allocate nothing once running.
+Compares the old chunk-list echo (bytes chunks, pop(0), float mix per
+chunk) with each in-place effect and the full chain used by
+audio_loopback.py; effect rows include the int16 <-> float32 conversion.
+Memory is traced with tracemalloc over the measured blocks: "peak" is the
+most extra memory alive at any moment and "net" is what is still held
+afterwards, in bytes. The no-op row is tracemalloc's own overhead, and
+each effect passes when its peak and net stay within it; the exit status
+is 1 if any in-place effect allocates per block.
+Run: python benchmark_effects.py [--blocks 2000]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared modules (audio_effects.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+from audio_effects import EffectsChain, Delay, Echo, Gain, Limiter, RATE, BLOCK_SIZE
+
+WARMUP_BLOCKS = 200
+OLD_ECHO = "list echo (old)"  # Shown for comparison; expected to allocate
+
+
+class ListEcho:
+    """The previous add_echo: a list of raw chunks, delayed by whole chunks"""
+
+    def __init__(self, delay=0.1, decay=0.5):
+        self.chunks = int(RATE * delay / BLOCK_SIZE)
+        self.decay = decay
+        self.echo_buffer = []
+
+    def __call__(self, audio_data):
+        self.echo_buffer.append(audio_data)
+        if len(self.echo_buffer) > self.chunks:
+            old_data = self.echo_buffer.pop(0)
+            mixed_data = np.frombuffer(audio_data, dtype=np.int16) + \
+                np.frombuffer(old_data, dtype=np.int16) * self.decay
+            mixed_data = np.clip(mixed_data, -32768, 32767)
+            return mixed_data.astype(np.int16).tobytes()
+        return audio_data
+
+
+def alone(effect):
+    """One effect between the chain's int16 conversions, as audio_loopback.py runs it"""
+    return EffectsChain([effect]).process_pcm16
+
+
+def measure(process, blocks):
+    """Microseconds per block, then tracemalloc peak and net bytes over the same blocks"""
+    for data in blocks[:WARMUP_BLOCKS]:
+        process(data)
+    times = np.zeros(len(blocks))
+    for i, data in enumerate(blocks):
+        start = time.perf_counter()
+        process(data)
+        times[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for data in blocks:
+        process(data)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times * 1e6, peak - baseline, current - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-block cost and allocations of the loopback effects")
+    parser.add_argument("--blocks", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Speech-like input: noise bursts at a few thousand counts, some loud enough to need limiting
+    rng = np.random.default_rng(1)
+    loudness = np.where(rng.random(args.blocks) < 0.2, 30000, 6000)
+    blocks = [(rng.standard_normal(BLOCK_SIZE) * level / 3).clip(-32768, 32767).astype(np.int16).tobytes()
+              for level in loudness]
+
+    chain = EffectsChain([Echo(0.1, feedback=0.5), Gain(1.5), Limiter()])
+    cases = [("no-op", lambda data: data),
+             (OLD_ECHO, ListEcho()),
+             ("delay 100 ms", alone(Delay(0.1))),
+             ("echo 100 ms", alone(Echo(0.1, feedback=0.5))),
+             ("echo 1 ms", alone(Echo(0.001, feedback=0.5))),
+             ("gain", alone(Gain(1.5))),
+             ("limiter", alone(Limiter())),
+             ("chain (pcm16)", chain.process_pcm16)]
+
+    block_ms = BLOCK_SIZE / RATE * 1000
+    print(f"🎛️ Effects benchmark ({BLOCK_SIZE}-sample blocks = {block_ms:.1f} ms of audio, {args.blocks} blocks)")
+    print(f"{'effect':>16} {'us/block':>9} {'p99 us':>8} {'peak B':>8} {'net B':>6}  vs no-op")
+    baseline = None
+    failed = []
+    for name, process in cases:
+        micros, peak, net = measure(process, blocks)
+        if baseline is None:
+            baseline = (peak, net)
+            verdict = "baseline"
+        elif peak <= baseline[0] and net <= baseline[1]:
+            verdict = "✅ pass"
+        else:
+            verdict = "❌ allocates"
+            if name != OLD_ECHO:
+                failed.append(name)
+        print(f"{name:>16} {micros.mean():>9.1f} {np.percentile(micros, 99):>8.1f} {peak:>8} {net:>6}  {verdict}")
+    if failed:
+        print(f"❌ Allocating per block beyond the no-op baseline: {', '.join(failed)}")
+    else:
+        print("✅ Every in-place effect stays within the no-op baseline: nothing is allocated per block")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Headless benchmark: per-object Fireball lists vs the vectorized FireballSwarm.
+Each tick tops the swarm up to N fireballs, moves them, culls off-screen
+ones, checks player hits and draws every trail and body.
+Run: python benchmark_fireballs.py
+"""
+import os
+import sys
+import math
+import time
+
+# Run without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fireball_swarm import FireballSwarm
+from spatial_hash import SpatialHash
+
+FIREBALL_COUNTS = [50, 200, 1000]
+FRAMES = 120
+WIDTH, HEIGHT = 1200, 800
+PLAYER_X, PLAYER_Y = WIDTH // 2, HEIGHT - 50
+
+
+class LegacyFireball:
+    """The previous Fireball: one object per projectile, trail as a list with pop(0)"""
+
+    def __init__(self, x, y, target_x, target_y):
+        self.x = x
+        self.y = y
+        self.prev_x = x
+        self.prev_y = y
+        self.speed = 3.0
+        self.size = 8
+        self.color = (255, 100, 0)
+        self.trail = []
+        self.alive = True
+        dx = target_x - x
+        dy = target_y - y
+        distance = math.sqrt(dx*dx + dy*dy)
+        if distance > 0:
+            self.vel_x = (dx / distance) * self.speed
+            self.vel_y = (dy / distance) * self.speed
+        else:
+            self.vel_x = 0
+            self.vel_y = 0
+
+    def update(self, screen_width, screen_height):
+        self.trail.append((self.x, self.y))
+        if len(self.trail) > 10:
+            self.trail.pop(0)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += self.vel_x
+        self.y += self.vel_y
+        if (self.x < -50 or self.x > screen_width + 50 or
+                self.y < -50 or self.y > screen_height + 50):
+            self.alive = False
+
+    def draw(self, screen, alpha=1.0):
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        for i, (trail_x, trail_y) in enumerate(self.trail):
+            fade = (i + 1) / len(self.trail)
+            trail_size = int(self.size * fade * 0.7)
+            trail_color = (int(255 * fade), int(100 * fade), 0)
+            if trail_size > 0:
+                pygame.draw.circle(screen, trail_color, (int(trail_x), int(trail_y)), trail_size)
+        pygame.draw.circle(screen, self.color, (x, y), self.size)
+        pygame.draw.circle(screen, (255, 255, 100), (x, y), self.size // 2)
+
+
+def spawn_points(rng, count):
+    """Launch positions across the upper screen, consumed in order by both versions"""
+    return list(zip(rng.uniform(0, WIDTH, count).tolist(), rng.uniform(0, HEIGHT // 2, count).tolist()))
+
+
+def run_legacy(screen, target, points):
+    fireballs = []
+    grid = SpatialHash()
+    hits = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        while len(fireballs) < target:
+            fireballs.append(LegacyFireball(*points.pop(), PLAYER_X, PLAYER_Y))
+        for fireball in fireballs:
+            fireball.update(WIDTH, HEIGHT)
+        fireballs = [fireball for fireball in fireballs if fireball.alive]
+        grid.rebuild(fireballs)
+        for fireball in grid.query(PLAYER_X, PLAYER_Y, 30):
+            fireball.alive = False
+            hits += 1
+        fireballs = [fireball for fireball in fireballs if fireball.alive]
+        screen.fill((0, 0, 0))
+        for fireball in fireballs:
+            fireball.draw(screen, 0.5)
+    return (time.perf_counter() - start) / FRAMES * 1000, hits
+
+
+def run_swarm(screen, target, points):
+    swarm = FireballSwarm()
+    hits = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        while len(swarm) < target:
+            swarm.spawn(*points.pop(), PLAYER_X, PLAYER_Y)
+        hits += swarm.update(WIDTH, HEIGHT, PLAYER_X, PLAYER_Y)
+        screen.fill((0, 0, 0))
+        swarm.draw(screen, 0.5)
+    return (time.perf_counter() - start) / FRAMES * 1000, hits
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    print(f"🔥 Fireball benchmark ({FRAMES} frames, ms per frame incl. drawing)")
+    print(f"{'fireballs':>10} {'objects':>9} {'swarm':>8} {'speedup':>8}")
+    for count in FIREBALL_COUNTS:
+        points = spawn_points(np.random.default_rng(count), count * 20)
+        legacy_ms, legacy_hits = run_legacy(screen, count, list(points))
+        legacy_pixels = pygame.image.tobytes(screen, "RGB")
+        swarm_ms, swarm_hits = run_swarm(screen, count, list(points))
+        assert swarm_hits == legacy_hits, (swarm_hits, legacy_hits)
+        assert pygame.image.tobytes(screen, "RGB") == legacy_pixels, "swarm output differs"
+        print(f"{count:>10} {legacy_ms:>9.2f} {swarm_ms:>8.2f} {legacy_ms / swarm_ms:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Headless benchmark of the fireworks game loop: no microphone, no window.
+Runs scripted scenarios tick by tick (one rendered frame per tick) and
+reports per-phase timings as percentiles, written to JSON for tracking.
+Run: python benchmark_game.py [--ticks 600] [--scenarios idle barrage] [--output benchmark_results.json]
+"""
+import os
+import sys
+import io
+import json
+import time
+import platform
+import argparse
+import contextlib
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks
+from audio_capture import NullAudio
+
+PHASES = ["update", "collisions", "background", "draw", "ui_text"]
+PERCENTILES = [50, 90, 99]
+
+
+class BenchmarkFireworks(VoiceControlledFireworks):
+    """The game with each per-tick phase timed; the game loop itself is unchanged"""
+
+    def __init__(self, **kwargs):
+        super().__init__(audio_device=NullAudio(), **kwargs)
+        self.tick_phases = dict.fromkeys(PHASES, 0.0)
+        self.samples = {phase: [] for phase in PHASES + ["tick"]}
+
+    def timed(self, phase, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        self.tick_phases[phase] += time.perf_counter() - start
+        return result
+
+    # Simulation
+    def update_fireworks(self):
+        return self.timed("update", super().update_fireworks)
+
+    def spawn_monster(self):
+        return self.timed("update", super().spawn_monster)
+
+    def update_monsters(self):
+        return self.timed("update", super().update_monsters)
+
+    def update_fireballs(self, player_radius=30):
+        # One vectorized FireballSwarm pass: moves, culls off-screen fireballs and checks hits on the player
+        return self.timed("collisions", super().update_fireballs, player_radius)
+
+    def check_monster_collisions(self):
+        return self.timed("collisions", super().check_monster_collisions)
+
+    def check_firework_interceptions(self):
+        return self.timed("collisions", super().check_firework_interceptions)
+
+    # Rendering
+    def update_background(self):
+        return self.timed("background", super().update_background)
+
+    def draw_monsters(self, alpha=1.0):
+        return self.timed("draw", super().draw_monsters, alpha)
+
+    def draw_fireballs(self, alpha=1.0):
+        return self.timed("draw", super().draw_fireballs, alpha)
+
+    def draw_fireworks(self, alpha=1.0):
+        return self.timed("draw", super().draw_fireworks, alpha)
+
+    def draw_volume_indicator(self):
+        return self.timed("ui_text", super().draw_volume_indicator)
+
+    def draw_instructions(self):
+        return self.timed("ui_text", super().draw_instructions)
+
+    def draw_statistics(self):
+        return self.timed("ui_text", super().draw_statistics)
+
+    def draw_health_bar(self):
+        return self.timed("ui_text", super().draw_health_bar)
+
+    def draw_game_over(self):
+        return self.timed("ui_text", super().draw_game_over)
+
+    def benchmark_tick(self, volume):
+        """One simulation tick plus one rendered frame, recording phase times"""
+        self.tick_phases = dict.fromkeys(PHASES, 0.0)
+        start = time.perf_counter()
+        self.step_simulation(volume=volume)
+        self.render()
+        self.present()
+        self.samples["tick"].append(time.perf_counter() - start)
+        for phase in PHASES:
+            self.samples[phase].append(self.tick_phases[phase])
+
+
+# Each scenario sets the game up, then gives the synthetic volume for every tick
+def setup_idle(game):
+    game.apply_input("mode", "normal")
+
+
+def setup_barrage(game):
+    game.apply_input("mode", "normal")
+
+
+def setup_monster_swarm(game):
+    game.max_monsters = 60
+    game.monster_spawn_interval = 0.05
+    game.max_health = game.current_health = 10**9  # Survive the whole run
+
+
+def setup_game_over(game):
+    game.apply_input("damage", game.max_health)
+
+
+SCENARIOS = {
+    "idle": (setup_idle, lambda tick, game: 0.0),
+    "barrage": (setup_barrage, lambda tick, game: game.max_volume),  # Launch whenever the cooldown allows
+    "monster_swarm": (setup_monster_swarm, lambda tick, game: game.max_volume * 0.6 if tick % 20 == 0 else 0.0),
+    "game_over": (setup_game_over, lambda tick, game: 0.0),
+}
+
+
+def summarize(seconds):
+    ms = np.array(seconds) * 1000
+    summary = {f"p{p}": round(float(np.percentile(ms, p)), 4) for p in PERCENTILES}
+    summary["mean"] = round(float(ms.mean()), 4)
+    summary["max"] = round(float(ms.max()), 4)
+    return summary
+
+
+def run_scenario(name, ticks, warmup, seed):
+    setup, volume_at = SCENARIOS[name]
+    game = BenchmarkFireworks(seed=seed)
+    peak_fireworks = peak_particles = peak_monsters = peak_fireballs = 0
+    try:
+        # Damage/spawn messages would otherwise flood the console (and the timings)
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup(game)
+            for tick in range(warmup + ticks):
+                if tick == warmup:
+                    game.samples = {phase: [] for phase in PHASES + ["tick"]}
+                game.benchmark_tick(volume_at(tick, game))
+                peak_fireworks = max(peak_fireworks, len(game.fireworks))
+                peak_particles = max(peak_particles, game.particle_pool.live_count())
+                peak_monsters = max(peak_monsters, len(game.monsters))
+                peak_fireballs = max(peak_fireballs, len(game.fireballs))
+    finally:
+        game.audio.terminate()
+        pygame.quit()
+
+    return {
+        "ticks": ticks,
+        "phases_ms": {phase: summarize(samples) for phase, samples in game.samples.items()},
+        "peak": {
+            "fireworks": peak_fireworks,
+            "particles": peak_particles,
+            "monsters": peak_monsters,
+            "fireballs": peak_fireballs,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless fireworks game loop benchmark")
+    parser.add_argument("--ticks", type=int, default=600, help="measured ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="unmeasured ticks first (sprite caches etc.)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "ticks": args.ticks,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+
+    print(f"⏱️ Game loop benchmark: {args.ticks} ticks per scenario (ms, p50 / p99)")
+    print(f"{'scenario':>14} " + " ".join(f"{phase:>16}" for phase in PHASES + ["tick"]))
+    for name in args.scenarios:
+        result = run_scenario(name, args.ticks, args.warmup, args.seed)
+        results["scenarios"][name] = result
+        phases = result["phases_ms"]
+        print(f"{name:>14} " + " ".join(
+            f"{phases[phase]['p50']:>7.2f} / {phases[phase]['p99']:>6.2f}" for phase in PHASES + ["tick"]))
+
+    with open(args.output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
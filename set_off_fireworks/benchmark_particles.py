@@ -0,0 +1,90 @@
+"""
+Headless benchmark: per-particle glow surfaces vs the cached glow sprite atlas
+Run: python benchmark_particles.py
+"""
+import os
+import sys
+import time
+
+# Run without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from particle_pool import ParticlePool
+from glow_sprites import GlowSpriteCache
+
+PARTICLE_COUNTS = [500, 2000, 10000]
+FRAMES = 30
+WIDTH, HEIGHT = 1200, 800
+COLORS = [(255, 100, 100), (255, 200, 100), (255, 255, 100),
+          (100, 100, 255), (200, 100, 255), (255, 100, 255)]
+
+
+def fill_pool(count):
+    """Create a pool with `count` live particles spread over the screen"""
+    pool = ParticlePool(capacity=count, seed=42)
+    rng = pool.rng
+    pool.spawn(
+        x=rng.uniform(0, WIDTH, count),
+        y=rng.uniform(0, HEIGHT, count),
+        vx=np.zeros(count),
+        vy=np.zeros(count),
+        color=np.array(COLORS)[rng.integers(0, len(COLORS), count)],
+        life=rng.integers(30, 81, count),
+        size=rng.uniform(1, 8, count) * rng.uniform(0.3, 2.3, count)
+    )
+    return pool
+
+
+def draw_legacy(screen, pool):
+    """Previous drawing path: a fresh alpha surface per particle glow"""
+    live = np.flatnonzero(pool.alive[:pool.top])
+    for i in live:
+        x, y = int(pool.x[i]), int(pool.y[i])
+        size = float(pool.size[i])
+        color = tuple(int(c) for c in pool.color[i])
+        glow_size = int(size * 2)
+        glow_alpha = max(10, int(pool.life[i]) * 2)
+
+        glow_surf = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surf, (*color, glow_alpha // 3), (glow_size, glow_size), glow_size)
+        screen.blit(glow_surf, (x - glow_size, y - glow_size))
+        pygame.draw.circle(screen, color, (x, y), int(size))
+
+
+def time_frames(draw):
+    """Median milliseconds per frame for a draw callable"""
+    samples = []
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        draw()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    print(f"🎆 Particle draw benchmark ({FRAMES} frames, {WIDTH}x{HEIGHT}, SDL {os.environ['SDL_VIDEODRIVER']})")
+    print(f"{'particles':>10} {'legacy ms':>10} {'atlas ms':>10} {'speedup':>8}")
+
+    for count in PARTICLE_COUNTS:
+        pool = fill_pool(count)
+        sprites = GlowSpriteCache()
+        pool.draw(screen, sprites)  # Warm the sprite cache
+
+        legacy_ms = time_frames(lambda: draw_legacy(screen, pool))
+        atlas_ms = time_frames(lambda: pool.draw(screen, sprites))
+        print(f"{count:>10} {legacy_ms:>10.2f} {atlas_ms:>10.2f} {legacy_ms / atlas_ms:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
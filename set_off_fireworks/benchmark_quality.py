@@ -0,0 +1,117 @@
+"""
+Headless benchmark: render cost of each quality tier, and the automatic
+quality manager following a show that builds up and dies down.
+Part 1 renders the same frames at every tier for a few particle counts.
+Part 2 runs the real-time loop while a scripted show ramps the particle
+target up and back down, and prints the tier changes the manager made.
+Run: python benchmark_quality.py [--frames 60] [--seconds 30]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks, SIM_DT, MAX_FRAME_TIME
+from benchmark_split import ShowDriver
+from quality import QUALITY_TIERS
+from audio_capture import NullAudio
+
+PARTICLE_TARGETS = [2000, 8000, 16000]
+RAMP = [2000, 6000, 12000, 20000, 12000, 6000, 2000]  # Particle targets, equal parts of the auto run
+
+
+def tier_costs(frames):
+    """Milliseconds per render() at each tier, on identical frames"""
+    costs = {}
+    for target in PARTICLE_TARGETS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = VoiceControlledFireworks(audio_device=NullAudio(), seed=1)
+            driver = ShowDriver(target)
+            for _ in range(240):
+                driver(game)
+                game.step_simulation(voice_input=False)
+        timings = np.zeros((len(QUALITY_TIERS), frames))
+        particles = []
+        for frame in range(frames):
+            driver(game)
+            game.step_simulation(voice_input=False)
+            particles.append(game.particle_pool.live_count())
+            for index in range(len(QUALITY_TIERS)):
+                game.quality.index = index
+                start = time.perf_counter()
+                game.render(0.5)
+                timings[index, frame] = (time.perf_counter() - start) * 1000
+        costs[target] = (np.mean(particles), timings.mean(axis=1))
+        game.audio.terminate()
+        pygame.quit()
+    return costs
+
+
+def auto_run(seconds):
+    """The real-time loop with automatic quality while the show ramps up and down"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = VoiceControlledFireworks(audio_device=NullAudio(), seed=1)
+    driver = ShowDriver(RAMP[0])
+    phase_seconds = seconds / len(RAMP)
+    frames = 0
+    try:
+        accumulator = 0.0
+        start = last = time.perf_counter()
+        while last - start < seconds:
+            frame_start = time.perf_counter()
+            driver.target = RAMP[min(len(RAMP) - 1, int((frame_start - start) / phase_seconds))]
+            pygame.event.pump()
+            accumulator += min(frame_start - last, MAX_FRAME_TIME)
+            last = frame_start
+            while accumulator >= SIM_DT:
+                driver(game)
+                game.step_simulation(voice_input=False)
+                accumulator -= SIM_DT
+            game.render(accumulator / SIM_DT)
+            game.present()
+            with contextlib.redirect_stdout(io.StringIO()):
+                game.quality.record_frame((time.perf_counter() - frame_start) * 1000,
+                                          game.particle_pool.live_count())
+            frames += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        game.audio.terminate()
+        pygame.quit()
+    return game.quality, frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render cost per quality tier and automatic tier changes")
+    parser.add_argument("--frames", type=int, default=60, help="frames rendered per tier and particle count")
+    parser.add_argument("--seconds", type=float, default=30.0, help="length of the automatic run")
+    args = parser.parse_args()
+
+    print(f"🎚️ Render cost per quality tier (ms per frame, {args.frames} frames each)")
+    costs = tier_costs(args.frames)
+    print(f"{'tier':>17} " + " ".join(f"{f'{particles:.0f} p':>9}" for particles, _ in costs.values()))
+    for index, tier in enumerate(QUALITY_TIERS):
+        print(f"{tier.name:>17} " + " ".join(f"{timings[index]:>9.2f}" for _, timings in costs.values()))
+
+    print(f"\n🎚️ Automatic quality, particle target {' → '.join(str(t) for t in RAMP)} over {args.seconds:.0f}s")
+    quality, fps = auto_run(args.seconds)
+    print(f"{'time':>7} {'from':>17} {'to':>17} {'avg ms':>7} {'p95 ms':>7} {'particles':>10}")
+    for change in quality.changes:
+        print(f"{change['time']:>6.1f}s {change['from']:>17} {change['to']:>17} "
+              f"{change['avg_ms']:>7.1f} {change['p95_ms']:>7.1f} {change['particles']:>10}")
+    print(f"{fps:.1f} fps overall; {quality.report()}")
+
+
+if __name__ == "__main__":
+    main()
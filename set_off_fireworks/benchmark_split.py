@@ -0,0 +1,133 @@
+"""
+Headless benchmark: one process vs split mode (simulation in a worker process).
+A scripted show keeps launching fireworks until about N particles are alive;
+both modes run the real-time fixed-step loop with rendering uncapped.
+Reports rendered frames per second, simulated ticks per second (60 = real
+time) and the average number of live particles on screen.
+Run: python benchmark_split.py [--seconds 5]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks, SIM_DT, MAX_FRAME_TIME
+from split_fireworks import SplitFireworks
+from audio_capture import NullAudio
+
+PARTICLE_TARGETS = [2000, 8000, 16000]
+PARTICLES_PER_ROCKET = 130  # Explosion and rocket trail of a full-size firework, roughly
+MAX_LAUNCHES_PER_TICK = 4
+WARMUP_SECONDS = 3.0  # Let the show build up to its target before measuring
+
+
+class ShowDriver:
+    """Launches full-size fireworks while fewer than `target` particles are alive or on their way
+
+    Called before every simulation tick; picklable so the split-mode
+    worker can run it too.
+    """
+
+    def __init__(self, target):
+        self.target = target
+
+    def __call__(self, game):
+        in_flight = sum(1 for firework in game.fireworks if not firework.exploded)
+        live = game.particle_pool.live_count()
+        for _ in range(MAX_LAUNCHES_PER_TICK):
+            if live + in_flight * PARTICLES_PER_ROCKET >= self.target:
+                break
+            game.create_firework(game.max_volume)
+            in_flight += 1
+
+
+def run_single(target, seconds):
+    """The normal game loop: ticks and rendering take turns in one process"""
+    game = VoiceControlledFireworks(audio_device=NullAudio(), seed=1)
+    driver = ShowDriver(target)
+    frames, particles = 0, []
+    try:
+        accumulator = 0.0
+        last = time.perf_counter()
+        start = last + WARMUP_SECONDS
+        measuring = False
+        while time.perf_counter() - start < seconds:
+            if not measuring and time.perf_counter() >= start:
+                measuring = True
+                start, first_tick = time.perf_counter(), game.tick_count
+            pygame.event.pump()
+            now = time.perf_counter()
+            accumulator += min(now - last, MAX_FRAME_TIME)
+            last = now
+            while accumulator >= SIM_DT:
+                driver(game)
+                game.step_simulation(voice_input=False)
+                accumulator -= SIM_DT
+            game.render(accumulator / SIM_DT)
+            game.present()
+            if measuring:
+                frames += 1
+                particles.append(game.particle_pool.live_count())
+        elapsed = time.perf_counter() - start
+        ticks = game.tick_count - first_tick
+    finally:
+        game.audio.terminate()
+        pygame.quit()
+    return frames / elapsed, ticks / elapsed, np.mean(particles)
+
+
+def run_split(target, seconds):
+    """Split mode: the worker simulates in real time, this process draws the newest frame"""
+    game = SplitFireworks(seed=1, driver=ShowDriver(target), null_audio=True)
+    frames, particles = 0, []
+    try:
+        warmup_end = time.perf_counter() + WARMUP_SECONDS
+        while time.perf_counter() < warmup_end:
+            pygame.event.pump()
+            game.render(game.sync())
+            game.present()
+        first_tick = game.tick_count
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            pygame.event.pump()
+            game.render(game.sync())
+            game.present()
+            frames += 1
+            particles.append(game.particle_pool.live_count())
+        elapsed = time.perf_counter() - start
+        ticks = game.tick_count - first_tick
+    finally:
+        game.shutdown()
+    return frames / elapsed, ticks / elapsed, np.mean(particles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render FPS and simulation speed, one process vs split mode")
+    parser.add_argument("--seconds", type=float, default=5.0, help="measured seconds per run")
+    args = parser.parse_args()
+
+    print(f"🖥️ Split-mode benchmark ({args.seconds:.0f}s per run, {os.cpu_count()} CPU cores)")
+    print(f"{'target':>7} {'mode':>7} {'render fps':>11} {'sim ticks/s':>12} {'particles':>10}")
+    for target in PARTICLE_TARGETS:
+        for name, run in (("single", run_single), ("split", run_split)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                fps, tick_rate, particles = run(target, args.seconds)
+            print(f"{target:>7} {name:>7} {fps:>11.1f} {tick_rate:>12.1f} {particles:>10.0f}")
+    if os.cpu_count() == 1:
+        print("⚠️ Only one CPU core: both processes share it, so split mode cannot run them in parallel here")
+
+
+if __name__ == "__main__":
+    main()
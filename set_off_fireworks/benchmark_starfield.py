@@ -0,0 +1,86 @@
+"""
+Headless benchmark: per-star pygame.draw.circle background vs the baked Starfield
+Run: python benchmark_starfield.py
+"""
+import os
+import sys
+import math
+import time
+
+# Run without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starfield import Starfield
+from voice_fireworks import SIM_DT
+
+STAR_COUNTS = [100, 1000, 10000]
+FRAMES = 120
+WIDTH, HEIGHT = 1200, 800
+SKY_COLOR = (10, 10, 30)
+
+
+def make_stars(count, rng):
+    return [{
+        'x': int(rng.integers(0, WIDTH + 1)),
+        'y': int(rng.integers(0, HEIGHT // 2 + 1)),
+        'brightness': float(rng.uniform(50, 200)),
+        'twinkle_speed': float(rng.uniform(0.02, 0.05))
+    } for _ in range(count)]
+
+
+def legacy_background(screen, stars, current_time):
+    """The previous update_background: fill, then one draw.circle per star"""
+    screen.fill(SKY_COLOR)
+    for star in stars:
+        brightness = star['brightness'] + 50 * math.sin(current_time * star['twinkle_speed'])
+        brightness = max(50, min(255, brightness))
+        color = (int(brightness), int(brightness), int(brightness * 0.9))
+        pygame.draw.circle(screen, color, (star['x'], star['y']), 1)
+
+
+def time_frames(draw):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        draw(frame * SIM_DT)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = np.random.default_rng(42)
+
+    print(f"🌌 Background benchmark ({FRAMES} frames, ms per frame)")
+    print(f"{'stars':>7} {'per-star':>9} {'starfield':>10} {'speedup':>8}")
+    for count in STAR_COUNTS:
+        stars = make_stars(count, rng)
+        starfield = Starfield((WIDTH, HEIGHT), SKY_COLOR)
+        starfield.add_layer([s['x'] for s in stars], [s['y'] for s in stars],
+                            [s['brightness'] for s in stars], [s['twinkle_speed'] for s in stars])
+
+        legacy_ms = time_frames(lambda t: legacy_background(screen, stars, t))
+        legacy_pixels = pygame.image.tobytes(screen, "RGB")
+        baked_ms = time_frames(lambda t: starfield.draw(screen, t))
+        assert pygame.image.tobytes(screen, "RGB") == legacy_pixels, "starfield output differs"
+
+        print(f"{count:>7} {legacy_ms:>9.2f} {baked_ms:>10.2f} {legacy_ms / baked_ms:>7.1f}x")
+
+    # Parallax: a static base plus two drifting layers
+    starfield = Starfield((WIDTH, HEIGHT), SKY_COLOR)
+    starfield.add_random_layer(2000, rng)
+    starfield.add_random_layer(2000, rng, brightness=(40, 120), drift=6.0)
+    starfield.add_random_layer(1000, rng, brightness=(120, 220), drift=15.0)
+    parallax_ms = time_frames(lambda t: starfield.draw(screen, t))
+    print(f"🌠 3 layers / 5000 stars with parallax: {parallax_ms:.2f} ms per frame")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,106 +8,86 @@ import random
 import time
 from collections import deque
 import os
-from PIL import Image, ImageDraw, ImageFont
+import sys
 import imageio
 
 # Import the main game class
-from voice_fireworks import VoiceControlledFireworks
+from voice_fireworks import VoiceControlledFireworks, SIM_DT
+from audio_capture import NullAudio
+from session_log import SessionLog
+from frame_writer import StreamingFrameWriter, TextSpriteCache, blend_overlays
 
 class EnhancedGameplayRecorder:
-    def __init__(self):
+    def __init__(self, capture_fps=60):
         self.recording = False
-        self.frames = []
+        self.writer = None
+        self.capture_fps = capture_fps  # Rate add_frame_with_overlay() is called at
+        self.frame_step = 1
+        self.frames_seen = 0
         self.frame_count = 0
-        self.max_frames = 1200  # 20 seconds at 60 FPS
+        self.max_frames = None  # Optional cap; otherwise only disk space limits a recording
+        
+        # Overlay text is rendered once per distinct string and blended into captured frames
+        self.sprites = TextSpriteCache()
         
     def add_frame_with_overlay(self, surface, state_info, action_info=""):
-        """Add frame with enhanced overlay information"""
-        if self.recording and self.frame_count < self.max_frames:
-            # Convert pygame surface to numpy array
-            frame_array = pygame.surfarray.array3d(surface)
-            frame_array = np.transpose(frame_array, (1, 0, 2))
-            
-            # Convert to PIL Image
-            frame_image = Image.fromarray(frame_array)
-            draw = ImageDraw.Draw(frame_image)
-            
-            try:
-                font_large = ImageFont.truetype("arial.ttf", 28)
-                font_small = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font_large = ImageFont.load_default()
-                font_small = ImageFont.load_default()
-            
-            # Main state info (top-left)
-            if state_info:
-                self.draw_text_with_background(draw, state_info, (15, 15), font_large, (255, 255, 255), (0, 0, 0, 180))
-            
-            # Action info (top-right)
-            if action_info:
-                text_bbox = draw.textbbox((0, 0), action_info, font=font_small)
-                text_width = text_bbox[2] - text_bbox[0]
-                x_pos = frame_image.width - text_width - 20
-                self.draw_text_with_background(draw, action_info, (x_pos, 15), font_small, (255, 255, 0), (0, 0, 0, 180))
-            
-            # Frame counter (bottom-right)
-            frame_text = f"Frame: {self.frame_count}"
-            frame_bbox = draw.textbbox((0, 0), frame_text, font=font_small)
-            frame_width = frame_bbox[2] - frame_bbox[0]
-            frame_x = frame_image.width - frame_width - 15
-            frame_y = frame_image.height - 35
-            self.draw_text_with_background(draw, frame_text, (frame_x, frame_y), font_small, (255, 255, 255), (0, 0, 0, 120))
-            
-            self.frames.append(np.array(frame_image))
-            self.frame_count += 1
+        """Queue a frame for encoding with enhanced overlay information"""
+        if not self.recording:
+            return
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.frame_step:
+            return  # Decimated at capture time, never copied
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            return
+        
+        self.writer.append(surface, self.overlays(surface, state_info, action_info, self.frame_count))
+        self.frame_count += 1
     
-    def draw_text_with_background(self, draw, text, position, font, text_color, bg_color):
-        """Draw text with background rectangle"""
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
+    def overlays(self, surface, state_info, action_info, frame_number):
+        """The overlays for one frame as (sprite, x, y), blended on the encoder thread"""
+        width, height = surface.get_size()
+        overlays = []
         
-        # Background rectangle
-        bg_rect = [position[0] - 5, position[1] - 2, 
-                  position[0] + text_width + 10, position[1] + text_height + 4]
-        draw.rectangle(bg_rect, fill=bg_color)
+        # Main state info (top-left)
+        if state_info:
+            overlays.append((self.sprites.get(state_info, 34, (255, 255, 255), (0, 0, 0, 180)), 10, 13))
         
-        # Text
-        draw.text(position, text, fill=text_color, font=font)
+        # Action info (top-right)
+        if action_info:
+            sprite = self.sprites.get(action_info, 26, (255, 255, 0), (0, 0, 0, 180))
+            overlays.append((sprite, width - sprite.width - 15, 13))
+        
+        # Frame counter (bottom-right), composed from cached digit sprites
+        pieces, counter_width = self.sprites.counter("Frame: ", frame_number, 26, (255, 255, 255), (0, 0, 0, 120))
+        x = width - counter_width - 10
+        for sprite, dx in pieces:
+            overlays.append((sprite, x + dx, height - 37))
+        return overlays
     
-    def start_recording(self):
+    def start_recording(self, filename="enhanced_gameplay.gif", fps=20):
+        """Start streaming to a GIF or MP4 file at `fps`"""
+        self.frame_step = max(1, round(self.capture_fps / fps))
+        self.writer = StreamingFrameWriter(filename, fps, decorate=blend_overlays)
         self.recording = True
-        self.frames = []
+        self.frames_seen = 0
         self.frame_count = 0
-        print("🎬 Enhanced recording started!")
+        print(f"🎬 Enhanced recording started: {filename} at {fps} FPS")
     
     def stop_recording(self):
-        self.recording = False
-        print(f"🎬 Enhanced recording stopped! Captured {len(self.frames)} frames")
-    
-    def save_gif(self, filename="enhanced_gameplay.gif", fps=20):
-        if not self.frames:
-            print("❌ No frames to save!")
+        if self.writer is None:
             return
-        
-        print(f"💾 Creating enhanced GIF with {len(self.frames)} frames...")
-        
-        # Select frames for optimal GIF size
-        skip_factor = max(1, 60 // fps)
-        selected_frames = self.frames[::skip_factor]
-        
-        # Save as GIF with optimization
-        imageio.mimsave(filename, selected_frames, fps=fps, loop=0, optimize=True)
-        print(f"✅ Enhanced GIF saved as: {filename}")
-        print(f"📊 Final GIF: {len(selected_frames)} frames at {fps} FPS")
+        self.recording = False
+        written = self.writer.close()
+        print(f"🎬 Enhanced recording stopped! Captured {self.frame_count} of {self.frames_seen} frames")
+        print(f"✅ Enhanced recording saved as: {self.writer.filename} ({written} frames at {self.writer.fps} FPS)")
+        self.writer = None
 
 class ComprehensiveFireworksDemo(VoiceControlledFireworks):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         self.recorder = EnhancedGameplayRecorder()
         self.demo_phase = 0
         self.phase_timer = 0
-        self.last_update_time = time.time()
         
         # Comprehensive demo phases
         self.demo_phases = [
@@ -129,18 +109,17 @@ class ComprehensiveFireworksDemo(VoiceControlledFireworks):
         self.current_action = ""
         self.firework_spawn_timer = 0
         
-    def run_comprehensive_demo(self):
-        """Run comprehensive gameplay demonstration"""
-        self.recorder.start_recording()
-        
+    def run_comprehensive_demo(self, log_path="comprehensive_fireworks_demo.fwlog",
+                               gif_path="comprehensive_fireworks_demo.gif"):
+        """Run comprehensive gameplay demonstration, logging inputs for a replayed GIF export"""
         try:
             running = True
             print("🎮 Starting comprehensive demo...")
+            self.apply_input("phase", 0)
             
             while running and self.demo_phase < len(self.demo_phases):
-                current_time = time.time()
-                dt = current_time - self.last_update_time
-                self.last_update_time = current_time
+                # Demo timing follows simulation time, one tick per frame
+                dt = SIM_DT
                 
                 # Handle events
                 for event in pygame.event.get():
@@ -154,10 +133,9 @@ class ComprehensiveFireworksDemo(VoiceControlledFireworks):
                 # Execute current phase
                 if self.phase_timer <= current_phase["duration"]:
                     self.execute_phase_action(current_phase["action"], dt)
-                    self.current_action = f"Phase: {current_phase['name']}"
                 else:
-                    # Move to next phase
-                    self.demo_phase += 1
+                    # Move to next phase (logged so the replay shows the same overlay)
+                    self.apply_input("phase", self.demo_phase + 1)
                     self.phase_timer = 0
                     if self.demo_phase < len(self.demo_phases):
                         print(f"🎬 Phase {self.demo_phase + 1}: {self.demo_phases[self.demo_phase]['name']}")
@@ -165,49 +143,72 @@ class ComprehensiveFireworksDemo(VoiceControlledFireworks):
                 # Update game
                 self.update_game_state()
                 
-                # Get state info
-                state_info = self.get_detailed_state_info()
-                
-                # Record frame with enhanced overlay
-                self.recorder.add_frame_with_overlay(self.screen, state_info, self.current_action)
-                
                 pygame.display.flip()
                 self.clock.tick(60)
                 
         except KeyboardInterrupt:
             print("\n🎬 Demo interrupted!")
         finally:
-            self.recorder.stop_recording()
-            self.recorder.save_gif("comprehensive_fireworks_demo.gif", fps=20)
+            self.save_session(log_path)
             
             # Cleanup
             self.stream.stop_stream()
             self.stream.close()
             self.audio.terminate()
             pygame.quit()
+        
+        if gif_path:
+            type(self).export_gif(log_path, gif_path, fps=20)
+    
+    @classmethod
+    def export_gif(cls, log_path, gif_path, fps=20):
+        """Replay a session log headless and stream it to a GIF (or .mp4) with overlays"""
+        log = SessionLog.load(log_path)
+        game = cls(width=log.width, height=log.height, audio_device=NullAudio(), seed=log.seed)
+        # Decimate in the replay itself so skipped ticks are never even drawn
+        frame_step = max(1, round(game.recorder.capture_fps / fps))
+        game.recorder.capture_fps = fps
+        game.recorder.start_recording(gif_path, fps=fps)
+        try:
+            digest = game.replay(log, frame_step=frame_step, on_frame=lambda: game.recorder.add_frame_with_overlay(
+                game.screen, game.get_detailed_state_info(), game.current_action))
+            if digest != log.digest:
+                print("⚠️ Replay diverged from the recorded session!")
+        finally:
+            game.recorder.stop_recording()
+            game.audio.terminate()
+            pygame.quit()
+    
+    def apply_input(self, kind, value=0.0):
+        """Demo phases only change the overlay label, but are logged like any other input"""
+        if kind == "phase":
+            self.demo_phase = int(value)
+            if self.demo_phase < len(self.demo_phases):
+                self.current_action = f"Phase: {self.demo_phases[self.demo_phase]['name']}"
+        super().apply_input(kind, value)
     
     def execute_phase_action(self, action, dt):
         """Execute specific phase actions"""
         if action == "show_intro":
-            self.game_mode = "normal"
+            self.apply_input("mode", "normal")
             
         elif action == "normal_mode_demo":
-            self.game_mode = "normal"
+            self.apply_input("mode", "normal")
             # Create beautiful fireworks display
             if random.random() < 0.1:  # 10% chance per frame
                 volume = 0.3 + random.random() * 0.5
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "switch_mode":
             if self.phase_timer > 1.0:  # Switch after 1 second
-                self.game_mode = "monster_hunt"
-                self.reset_game()
+                self.apply_input("mode", "monster_hunt")
+                self.apply_input("reset")
                 
         elif action == "voice_simulation":
             # Simulate voice input with varying volumes
             if random.random() < 0.15:
                 volume = 0.2 + random.random() * 0.6
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "monster_spawn":
             # Let monsters spawn naturally
@@ -217,83 +218,55 @@ class ComprehensiveFireworksDemo(VoiceControlledFireworks):
             # Regular combat with moderate fireworks
             if random.random() < 0.12:
                 volume = 0.4 + random.random() * 0.4
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "interception_demo":
             # Focus on showing fireball interception
             if len(self.fireballs) > 0 and random.random() < 0.3:
                 # Target fireballs with larger explosions
                 volume = 0.6 + random.random() * 0.3
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "intense_combat":
             # Rapid-fire combat
             if random.random() < 0.25:
                 volume = 0.5 + random.random() * 0.4
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "take_damage":
             # Simulate taking damage
             if self.phase_timer > 1.5 and self.current_health > 20:
-                self.take_damage(10)
+                self.apply_input("damage", 10)
                 
         elif action == "critical_health":
             # Desperate defense at low health
             if random.random() < 0.2:
                 volume = 0.7 + random.random() * 0.3
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "game_over":
             # Take final damage
             if self.phase_timer > 1.0 and not self.game_over:
-                self.take_damage(20)
+                self.apply_input("damage", 20)
                 
         elif action == "restart":
             # Restart the game
             if self.phase_timer > 1.5:
-                self.reset_game()
+                self.apply_input("reset")
                 
         elif action == "final_showcase":
             # Final fireworks display
             if random.random() < 0.18:
                 volume = 0.4 + random.random() * 0.5
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
     
     def update_game_state(self):
         """Update all game systems"""
-        # Update fireworks
-        for firework in self.fireworks[:]:
-            firework.update()
-            if firework.is_finished():
-                self.fireworks.remove(firework)
-        
-        # Monster hunt updates
-        if self.game_mode == "monster_hunt" and not self.game_over:
-            self.spawn_monster()
-            self.update_monsters()
-            self.update_fireballs()
-            self.check_monster_collisions()
-            self.check_firework_interceptions()
+        # One fixed simulation tick per recorded frame
+        self.step_simulation(voice_input=False)
         
         # Draw everything
-        self.update_background()
-        
-        if self.game_mode == "monster_hunt":
-            self.draw_monsters()
-            self.draw_fireballs()
-        
-        for firework in self.fireworks:
-            firework.draw(self.screen)
-        
-        self.draw_volume_indicator()
-        self.draw_instructions()
-        self.draw_statistics()
-        
-        if self.game_mode == "monster_hunt":
-            self.draw_health_bar()
-        
-        if self.game_over:
-            self.draw_game_over()
+        self.render()
     
     def get_detailed_state_info(self):
         """Get detailed state information for overlay"""
@@ -304,7 +277,7 @@ class ComprehensiveFireworksDemo(VoiceControlledFireworks):
                 return f"💀 GAME OVER | Final Score: {self.score}"
             else:
                 monsters_alive = sum(1 for m in self.monsters if m.alive)
-                fireballs_active = len([f for f in self.fireballs if f.alive])
+                fireballs_active = len(self.fireballs)
                 health_status = "🟢" if self.current_health > 20 else "🟡" if self.current_health > 10 else "🔴"
                 return f"⚔️ MONSTER HUNT {health_status} | HP: {self.current_health}/30 | Score: {self.score} | Monsters: {monsters_alive} | Fireballs: {fireballs_active}"
 
@@ -315,7 +288,7 @@ if __name__ == "__main__":
         print("📺 Demo will showcase: Normal mode, Monster hunt, Combat, Interception, Damage, Game over")
         
         demo = ComprehensiveFireworksDemo()
-        demo.run_comprehensive_demo()
+        demo.run_comprehensive_demo(gif_path=None if "--no-gif" in sys.argv else "comprehensive_fireworks_demo.gif")
         
         print("✅ Comprehensive demo completed!")
         print("📁 Check 'comprehensive_fireworks_demo.gif' for the complete demonstration")
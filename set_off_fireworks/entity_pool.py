@@ -0,0 +1,61 @@
+class EntityPool:
+    """Reusable game objects: a live list plus a free list of released ones
+
+    acquire(*args) pops a released object and calls its reset(*args), or
+    constructs a new one when the free list is empty. Removal swaps the last
+    live object into the hole, so it is O(1) and never shifts the list; the
+    order of live objects is therefore not preserved. With reuse=False every
+    acquire allocates and released objects are dropped, as before pooling.
+    """
+
+    def __init__(self, cls, reuse=True):
+        self.cls = cls
+        self.reuse = reuse
+        self.live = []
+        self.free = []
+        self.allocated = 0  # Objects constructed over the pool's lifetime
+
+    def __len__(self):
+        return len(self.live)
+
+    def __iter__(self):
+        return iter(self.live)
+
+    def acquire(self, *args):
+        """Get a live object initialized with *args"""
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+        else:
+            entity = self.cls(*args)
+            self.allocated += 1
+        self.live.append(entity)
+        return entity
+
+    def release_at(self, index):
+        """Remove the live object at `index` by swapping the last one into its place"""
+        live = self.live
+        entity = live[index]
+        last = live.pop()
+        if index < len(live):
+            live[index] = last
+        if self.reuse:
+            self.free.append(entity)
+
+    def release_where(self, predicate):
+        """Release every live object for which predicate(obj) is true; returns how many"""
+        released = 0
+        index = 0
+        while index < len(self.live):
+            if predicate(self.live[index]):
+                self.release_at(index)
+                released += 1
+            else:
+                index += 1
+        return released
+
+    def clear(self):
+        """Release every live object"""
+        if self.reuse:
+            self.free.extend(self.live)
+        self.live.clear()
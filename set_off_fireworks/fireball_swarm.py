@@ -0,0 +1,176 @@
+import math
+
+import numpy as np
+import pygame
+
+TRAIL_LENGTH = 10  # Past positions kept per fireball
+
+
+class FireballSwarm:
+    """Every monster fireball in structure-of-arrays form
+
+    Live fireballs occupy the first `count` slots in spawn order. Trails
+    share one circular buffer: all fireballs advance together, so a single
+    head index says where this tick's positions go and each fireball only
+    tracks how many of the slots behind the head are its own. Moving,
+    culling off-screen fireballs and the player hit test are one NumPy pass.
+    """
+
+    def __init__(self, capacity=256, speed=3.0, size=8, margin=50):
+        self.speed = speed
+        self.size = size  # Collision and body radius, the same for every fireball
+        self.margin = margin  # How far off screen a fireball may fly before it is culled
+        self.count = 0
+        self.head = 0  # Trail slot written by the next update
+        self.capacity = 0
+        self.allocate(capacity)
+
+        # Sprites indexed by length * TRAIL_LENGTH + slot (None if too small to draw), then the body
+        self.trail_radius = np.zeros((TRAIL_LENGTH + 1, TRAIL_LENGTH), dtype=np.int64)
+        self.sprites = []
+        for length in range(TRAIL_LENGTH + 1):
+            for slot in range(TRAIL_LENGTH):
+                fade = (slot + 1) / length if length else 0.0
+                radius = int(size * fade * 0.7)
+                self.trail_radius[length, slot] = radius
+                sprite = None
+                if radius > 0 and slot < length:
+                    sprite = pygame.Surface((radius * 2, radius * 2))
+                    sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)  # Trail colors are never black
+                    pygame.draw.circle(sprite, (int(255 * fade), int(100 * fade), 0), (radius, radius), radius)
+                self.sprites.append(sprite)
+        body = pygame.Surface((size * 2, size * 2))
+        body.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        pygame.draw.circle(body, (255, 100, 0), (size, size), size)  # Orange-red fireball
+        pygame.draw.circle(body, (255, 255, 100), (size, size), size // 2)  # Inner glow
+        self.body_index = len(self.sprites)
+        self.sprites.append(body)
+        sprites = np.empty(len(self.sprites), dtype=object)  # Object array so a whole selection is one take
+        sprites[:] = self.sprites
+        self.sprites = sprites
+
+    def allocate(self, capacity):
+        """(Re)size the arrays to `capacity`, keeping live fireballs"""
+        shapes = dict.fromkeys(("x", "y", "prev_x", "prev_y", "vel_x", "vel_y"), (capacity,))
+        shapes["trail_x"] = shapes["trail_y"] = (capacity, TRAIL_LENGTH)
+        shapes["trail_count"] = (capacity,)  # How many trail slots behind the head are this fireball's
+        for name, shape in shapes.items():
+            array = np.zeros(shape, dtype=np.int64 if name == "trail_count" else np.float64)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, target_x, target_y):
+        """Launch a fireball from (x, y) towards the target"""
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        dx = target_x - x
+        dy = target_y - y
+        distance = math.sqrt(dx*dx + dy*dy)
+        if distance > 0:
+            self.vel_x[i] = (dx / distance) * self.speed
+            self.vel_y[i] = (dy / distance) * self.speed
+        else:
+            self.vel_x[i] = self.vel_y[i] = 0.0
+        self.trail_count[i] = 0
+        self.count += 1
+
+    def keep(self, mask):
+        """Compact the live slots down to those where mask is true, preserving order"""
+        n = self.count
+        kept = int(np.count_nonzero(mask))
+        if kept == n:
+            return
+        for array in (self.x, self.y, self.prev_x, self.prev_y, self.vel_x, self.vel_y,
+                      self.trail_x, self.trail_y, self.trail_count):
+            array[:kept] = array[:n][mask]
+        self.count = kept
+
+    def update(self, width, height, player_x, player_y, player_radius=30):
+        """Advance all fireballs one tick; culls the off-screen ones and returns how many hit the player"""
+        n = self.count
+        if n == 0:
+            return 0
+        x, y = self.x[:n], self.y[:n]
+
+        # Current position joins the trail, then move
+        self.trail_x[:n, self.head] = x
+        self.trail_y[:n, self.head] = y
+        self.head = (self.head + 1) % TRAIL_LENGTH
+        np.minimum(self.trail_count[:n] + 1, TRAIL_LENGTH, out=self.trail_count[:n])
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vel_x[:n]
+        y += self.vel_y[:n]
+
+        margin = self.margin
+        on_screen = (x >= -margin) & (x <= width + margin) & (y >= -margin) & (y <= height + margin)
+        hit = on_screen & self.within(player_x, player_y, player_radius)
+        self.keep(on_screen & ~hit)
+        return int(np.count_nonzero(hit))
+
+    def within(self, x, y, radius, inclusive=False):
+        """Mask of live fireballs whose circle overlaps the circle of `radius` around (x, y)"""
+        n = self.count
+        reach = radius + self.size
+        distance_sq = (self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2
+        if inclusive:
+            return distance_sq <= reach * reach
+        return distance_sq < reach * reach
+
+    def intercept(self, x, y, radius):
+        """Destroy fireballs touching the circle of `radius` around (x, y); returns their positions"""
+        n = self.count
+        if n == 0:
+            return []
+        hit = self.within(x, y, radius, inclusive=True)
+        if not hit.any():
+            return []
+        positions = list(zip(self.x[:n][hit].tolist(), self.y[:n][hit].tolist()))
+        self.keep(~hit)
+        return positions
+
+    def clear(self):
+        self.count = 0
+
+    def blit_sequence(self, alpha=1.0, trail_slots=TRAIL_LENGTH):
+        """(sprite, position) pairs drawing each fireball's trail, oldest first, then its body
+
+        Positions are interpolated `alpha` of the way from the previous tick;
+        only the newest `trail_slots` trail positions are drawn.
+        """
+        n = self.count
+        if n == 0:
+            return []
+
+        # Trail slot k (0 = oldest) of a fireball with L positions lies L - k slots behind the head
+        length = self.trail_count[:n, None]
+        slot = np.arange(TRAIL_LENGTH)
+        ring = (self.head - length + slot) % TRAIL_LENGTH
+        rows = np.arange(n)[:, None]
+        radius = self.trail_radius[length, slot]
+
+        # One column per trail slot plus a last one for the body
+        sprite = np.empty((n, TRAIL_LENGTH + 1), dtype=np.int64)
+        sprite[:, :TRAIL_LENGTH] = length * TRAIL_LENGTH + slot
+        sprite[:, TRAIL_LENGTH] = self.body_index
+        drawn = np.ones((n, TRAIL_LENGTH + 1), dtype=bool)
+        drawn[:, :TRAIL_LENGTH] = (slot < length) & (slot >= length - trail_slots) & (radius > 0)
+        x = np.empty((n, TRAIL_LENGTH + 1), dtype=np.int64)
+        y = np.empty((n, TRAIL_LENGTH + 1), dtype=np.int64)
+        x[:, :TRAIL_LENGTH] = self.trail_x[rows, ring].astype(np.int64) - radius
+        y[:, :TRAIL_LENGTH] = self.trail_y[rows, ring].astype(np.int64) - radius
+        x[:, TRAIL_LENGTH] = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha).astype(np.int64) - self.size
+        y[:, TRAIL_LENGTH] = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha).astype(np.int64) - self.size
+
+        return list(zip(self.sprites[sprite[drawn]].tolist(), zip(x[drawn].tolist(), y[drawn].tolist())))
+
+    def draw(self, screen, alpha=1.0, trail_slots=TRAIL_LENGTH):
+        screen.blits(self.blit_sequence(alpha, trail_slots), doreturn=False)
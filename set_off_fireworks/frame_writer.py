@@ -0,0 +1,246 @@
+import sys
+import threading
+import queue
+from collections import OrderedDict
+
+import pygame
+import numpy as np
+import imageio
+
+from hud import TextCache
+
+# Per-frame palettes, so ffmpeg never has to buffer the whole clip
+GIF_FILTER = "split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1"
+
+
+class GifPipeWriter:
+    """Appending GIF writer that pipes frames straight to ffmpeg (via imageio-ffmpeg)
+
+    imageio's Pillow GIF writer keeps every frame until close(); this one
+    writes each frame to disk as it arrives.
+    """
+
+    def __init__(self, filename, fps, size):
+        import imageio_ffmpeg
+        self.frames = imageio_ffmpeg.write_frames(
+            filename, size, fps=fps, codec="gif", pix_fmt_out="pal8", macro_block_size=1,
+            ffmpeg_log_level="error",  # "-loglevel error": the palette filter warns on every duplicated frame
+            output_params=["-loop", "0", "-filter_complex", GIF_FILTER]
+        )
+        self.frames.send(None)  # Start ffmpeg
+
+    def append_data(self, frame):
+        self.frames.send(np.ascontiguousarray(frame))
+
+    def close(self):
+        self.frames.close()
+
+
+def copy_surface_rgb(surface, out):
+    """Copy a surface's pixels into `out` (height x width x 3, RGB) straight from its pixel buffer
+
+    32-bit surfaces are read through a view of their raw pixel rows, one
+    channel at a time, so no intermediate frame is ever built; other
+    depths go through a pixels3d view.
+    """
+    width, height = surface.get_size()
+    if surface.get_bytesize() == 4 and sys.byteorder == "little":
+        raw = np.frombuffer(surface.get_view("0"), dtype=np.uint8).reshape(height, surface.get_pitch())
+        raw = raw[:, :width * 4].reshape(height, width, 4)
+        for channel, shift in enumerate(surface.get_shifts()[:3]):
+            out[..., channel] = raw[..., shift // 8]
+    else:
+        pixels = pygame.surfarray.pixels3d(surface)
+        np.copyto(out, pixels.transpose(1, 0, 2))
+        del pixels  # Unlocks the surface
+    return out
+
+
+class TextSprite:
+    """An RGBA overlay kept as premultiplied uint16 arrays, ready to blend into RGB frames"""
+
+    def __init__(self, surface):
+        alpha = pygame.surfarray.array_alpha(surface).T[..., None].astype(np.uint16)
+        self.color = pygame.surfarray.array3d(surface).transpose(1, 0, 2) * alpha  # rgb * alpha
+        self.inverse_alpha = 255 - alpha
+        self.height, self.width = alpha.shape[:2]
+
+    def blend(self, frame, x, y):
+        """Alpha-blend onto `frame` (rows first, RGB) in place with the top-left at (x, y)"""
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + self.width, frame_width), min(y + self.height, frame_height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        sprite = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        region = frame[y0:y1, x0:x1]
+        blended = region * self.inverse_alpha[sprite]
+        blended += self.color[sprite]
+        blended += 127  # Round to nearest
+        blended //= 255
+        region[...] = blended
+
+
+class TextSpriteCache:
+    """Text on a translucent box as TextSprites, rendered once per distinct content
+
+    Sprites are built on the game thread (pygame fonts are not
+    thread-safe) and only blended on the encoder thread.
+    """
+
+    def __init__(self, max_sprites=256):
+        self.max_sprites = max_sprites
+        self.text = TextCache(max_sprites)
+        self.sprites = OrderedDict()
+
+    def get(self, text, size, color, background, padding=(5, 3)):
+        """Sprite of `text` in a box filled with the RGBA `background`
+
+        `padding` is (x, y), or (left, top, right, bottom) for a piece of
+        a longer box.
+        """
+        key = (text, size, color, background, padding)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+
+        text_surface = self.text.render(text, size, color)
+        if len(padding) == 2:
+            padding = (padding[0], padding[1], padding[0], padding[1])
+        left, top, right, bottom = padding
+        surface = pygame.Surface((text_surface.get_width() + left + right, text_surface.get_height() + top + bottom),
+                                 pygame.SRCALPHA)
+        surface.fill(background)
+        surface.blit(text_surface, (left, top))
+        sprite = TextSprite(surface)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def counter(self, label, number, size, color, background, padding=(5, 3)):
+        """`label` followed by `number` in one box, as ([(sprite, dx)], width)
+
+        The label and each digit are separate cached sprites laid side by
+        side, so a counter changing every frame reuses at most 20 digit
+        sprites instead of adding a cache entry per value.
+        """
+        pad_x, pad_y = padding
+        pieces = [self.get(label, size, color, background, (pad_x, pad_y, 0, pad_y))]
+        digits = str(number)
+        for digit in digits[:-1]:
+            pieces.append(self.get(digit, size, color, background, (0, pad_y, 0, pad_y)))
+        pieces.append(self.get(digits[-1], size, color, background, (0, pad_y, pad_x, pad_y)))
+        placed = []
+        width = 0
+        for sprite in pieces:
+            placed.append((sprite, width))
+            width += sprite.width
+        return placed, width
+
+
+def blend_overlays(frame, overlays):
+    """StreamingFrameWriter decorator: blend (sprite, x, y) overlays into the frame in place"""
+    for sprite, x, y in overlays:
+        sprite.blend(frame, x, y)
+    return frame
+
+
+class StreamingFrameWriter:
+    """Encode frames to a GIF or MP4 incrementally on a background thread
+
+    The game thread only copies the screen pixels, once, into a frame buffer
+    from a small preallocated pool and hands it over through a bounded
+    queue; the worker applies the optional `decorate(frame, *args)` overlay
+    in place, appends the frame to an ffmpeg-backed writer (opened once the
+    first frame's size is known) and returns the buffer to the pool.
+    Nothing is kept in memory, so recording length is limited by disk
+    rather than RAM. When every buffer is in use, `append` blocks until the
+    encoder catches up.
+    """
+
+    def __init__(self, filename, fps=30, decorate=None, queue_size=8):
+        self.filename = filename
+        self.fps = fps
+        self.decorate = decorate
+        self.frames_written = 0
+        self.error = None
+        self.writer = None
+
+        # Frame buffers: one per queue slot, plus the frame being encoded and the one being captured
+        self.max_buffers = queue_size + 2
+        self.buffers_allocated = 0
+        self.free_buffers = queue.Queue()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            buffer, args = item
+            if self.error is not None:
+                # Keep draining and recycling buffers; append() reports the error
+                self.free_buffers.put(buffer)
+                continue
+            try:
+                frame = buffer
+                if self.decorate is not None:
+                    frame = self.decorate(frame, *args)
+                if self.writer is None:
+                    self.writer = self.open_writer(frame)
+                self.writer.append_data(frame)
+                self.frames_written += 1
+            except Exception as e:
+                self.error = e
+                print(f"❌ Frame encoding failed: {e}")
+            finally:
+                self.free_buffers.put(buffer)
+
+    def open_writer(self, frame):
+        height, width = frame.shape[:2]
+        if self.filename.lower().endswith(".gif"):
+            return GifPipeWriter(self.filename, self.fps, (width, height))
+        # MP4 and other video formats
+        return imageio.get_writer(self.filename, fps=self.fps, macro_block_size=1)
+
+    def take_buffer(self, shape):
+        """A free frame buffer, allocating up to max_buffers of them, else waiting for one"""
+        while True:
+            try:
+                buffer = self.free_buffers.get_nowait()
+            except queue.Empty:
+                if self.buffers_allocated < self.max_buffers:
+                    self.buffers_allocated += 1
+                    return np.empty(shape, dtype=np.uint8)
+                try:
+                    buffer = self.free_buffers.get(timeout=0.1)
+                except queue.Empty:
+                    if self.error is not None:
+                        raise self.error
+                    continue
+            if buffer.shape == shape:
+                return buffer
+            self.buffers_allocated -= 1  # Surface size changed; drop the old buffer
+
+    def append(self, surface, *args):
+        """Copy a pygame surface into a pooled frame (rows first, RGB) and queue it for encoding
+
+        Raises the encoder's error once encoding has failed.
+        """
+        if self.error is not None:
+            raise self.error
+        buffer = self.take_buffer((surface.get_height(), surface.get_width(), 3))
+        copy_surface_rgb(surface, buffer)
+        self.queue.put((buffer, args))
+
+    def close(self):
+        """Wait for queued frames to be encoded, then finish the file"""
+        self.queue.put(None)
+        self.thread.join()
+        if self.writer is not None:
+            self.writer.close()
+        return self.frames_written
@@ -0,0 +1,38 @@
+import pygame
+
+
+class GlowSpriteCache:
+    """Pre-rendered glow discs keyed by (radius, color, alpha bucket)"""
+
+    def __init__(self, alpha_step=4, max_sprites=4096):
+        self.alpha_step = alpha_step
+        self.max_sprites = max_sprites
+        self.sprites = {}
+
+    def alpha_bucket(self, alpha):
+        """Quantize an alpha value so nearby alphas share one sprite"""
+        return min(255, int(alpha) // self.alpha_step * self.alpha_step)
+
+    def get(self, radius, color, alpha, core=False):
+        """Get (or build once) a glow disc; core=True adds an opaque center of half the radius"""
+        key = (radius, color, self.alpha_bucket(alpha), core)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.build(*key)
+            if len(self.sprites) >= self.max_sprites:
+                self.sprites.clear()
+            self.sprites[key] = sprite
+        return sprite
+
+    def build(self, radius, color, alpha, core):
+        """Render a glow disc onto its own alpha surface"""
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+        if core:
+            # Main particle body drawn over its own glow
+            pygame.draw.circle(sprite, (*color, 255), (radius, radius), radius // 2)
+        return sprite
+
+    def clear(self):
+        """Drop every cached sprite"""
+        self.sprites.clear()
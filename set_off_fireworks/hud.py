@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """Rendered text surfaces keyed by content, with one Font per size
+
+    HUD text rarely changes between frames, so each (text, size, color) is
+    rendered once and blitted from the cache until it is evicted.
+    """
+
+    def __init__(self, max_surfaces=256):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+    def font(self, size):
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+        return self.fonts[size]
+
+    def render(self, text, size, color):
+        """Antialiased text surface, rendered only on a cache miss"""
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = self.font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class HudLayer:
+    """Remembers what each HUD widget showed and where, to find the screen areas that changed"""
+
+    def __init__(self):
+        self.widgets = {}  # name -> (content key, rect)
+        self.dirty = []
+
+    def place(self, name, key, rect):
+        """Record a widget drawn this frame; marks it dirty if its content or rect changed"""
+        rect = pygame.Rect(rect)
+        previous = self.widgets.get(name)
+        if previous == (key, rect):
+            return
+        # Cover the old rect too, so a shrinking widget leaves nothing behind
+        self.dirty.append(rect if previous is None else rect.union(previous[1]))
+        self.widgets[name] = (key, rect)
+
+    def mark(self, rect):
+        self.dirty.append(pygame.Rect(rect))
+
+    def take_dirty(self):
+        """Rects changed since the last call"""
+        dirty, self.dirty = self.dirty, []
+        return dirty
+
+    def clear(self):
+        self.widgets.clear()
+        self.dirty = []
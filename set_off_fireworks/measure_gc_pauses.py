@@ -0,0 +1,113 @@
+"""
+Measure garbage-collector pauses during a sustained headless monster hunt,
+with entity pooling on and off. Every collection is timed through
+gc.callbacks, per generation, alongside the tick times.
+Pause times vary from run to run by more than pooling changes them, so
+each configuration runs --runs times (alternating, so drift affects both
+alike) and every column but "allocated" is the median over the runs.
+Only the entity count is deterministic.
+Run: python measure_gc_pauses.py [--ticks 3600] [--runs 5] [--freeze]
+"""
+import os
+import sys
+import gc
+import io
+import time
+import argparse
+import contextlib
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks
+from audio_capture import NullAudio
+from benchmark_game import setup_monster_swarm, SCENARIOS
+
+
+class GCPauseMonitor:
+    """Times every garbage collection while installed in gc.callbacks"""
+
+    def __init__(self):
+        self.pauses = {0: [], 1: [], 2: []}  # generation -> seconds
+        self.started = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            self.pauses[info["generation"]].append(time.perf_counter() - self.started)
+            self.started = None
+
+    def __enter__(self):
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        gc.callbacks.remove(self)
+
+
+def run_session(pool_entities, ticks, seed, freeze):
+    """Sustained monster swarm, one rendered frame per tick"""
+    game = VoiceControlledFireworks(audio_device=NullAudio(), seed=seed, pool_entities=pool_entities)
+    volume_at = SCENARIOS["monster_swarm"][1]
+    tick_times = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup_monster_swarm(game)
+            gc.collect()
+            if freeze:
+                gc.freeze()  # Startup objects (fonts, caches, modules) are never scanned again
+            with GCPauseMonitor() as monitor:
+                for tick in range(ticks):
+                    start = time.perf_counter()
+                    game.step_simulation(volume=volume_at(tick, game))
+                    game.render()
+                    game.present()
+                    tick_times.append(time.perf_counter() - start)
+    finally:
+        if freeze:
+            gc.unfreeze()
+        game.audio.terminate()
+        pygame.quit()
+
+    allocated = game.monster_pool.allocated + game.firework_pool.allocated
+    return monitor.pauses, np.array(tick_times) * 1000, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GC pauses during a monster hunt, pooled vs unpooled entities")
+    parser.add_argument("--ticks", type=int, default=3600, help="simulated ticks per run (60 per second)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--freeze", action="store_true", help="gc.freeze() after setup, before measuring")
+    parser.add_argument("--runs", type=int, default=5, help="runs per configuration; medians are reported")
+    args = parser.parse_args()
+
+    results = {False: [], True: []}
+    for run in range(args.runs):
+        for pool_entities in (False, True):
+            pauses, tick_ms, allocated = run_session(pool_entities, args.ticks, args.seed, args.freeze)
+            all_pauses = [pause for generation in pauses.values() for pause in generation]
+            results[pool_entities].append([
+                allocated, len(pauses[0]), len(pauses[1]), len(pauses[2]),
+                sum(all_pauses) * 1000, max(all_pauses, default=0.0) * 1000,
+                np.percentile(tick_ms, 50), np.percentile(tick_ms, 99),
+            ])
+
+    print(f"🗑️ GC pauses over {args.ticks} ticks of monster hunt (ms, median of {args.runs} runs)")
+    print(f"{'entities':>9} {'allocated':>9} {'gen0':>6} {'gen1':>6} {'gen2':>6} "
+          f"{'total':>8} {'max':>7} {'tick p50':>9} {'tick p99':>9}")
+    for pool_entities in (False, True):
+        allocated, gen0, gen1, gen2, total_ms, max_ms, p50, p99 = np.median(results[pool_entities], axis=0)
+        print(f"{'pooled' if pool_entities else 'new':>9} {allocated:>9.0f} "
+              f"{gen0:>6.0f} {gen1:>6.0f} {gen2:>6.0f} "
+              f"{total_ms:>8.2f} {max_ms:>7.3f} {p50:>9.2f} {p99:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Measure voice input -> firework launch latency without a microphone.
+A synthetic WAV of hand claps (with room noise and a swelling hum that
+should not trigger anything) is fed to the onset detector chunk by chunk,
+next to the previous smoothed-RMS trigger, and then played through the
+file-driven stand-in input device while the game loop runs headless.
+Reports detection delay and false triggers per minute.
+Run: python measure_launch_latency.py [--claps 40] [--no-live]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks
+from audio_capture import WavFileAudio, save_wav_mono, load_wav_mono
+from onset_detector import OnsetDetector
+
+RATE = 44100
+CHUNK = 1024
+MATCH_WINDOW = 0.1  # A trigger up to this long after a clap counts as detecting it
+
+
+def make_clap_wav(path, clap_count, seed=0):
+    """Room noise, a slow 110 Hz hum swell and claps of varied loudness; returns clap onset times"""
+    rng = np.random.default_rng(seed)
+    gaps = rng.uniform(0.4, 1.2, clap_count)
+    onsets = 0.5 + np.concatenate(([0.0], np.cumsum(gaps[:-1])))
+    total = onsets[-1] + 1.0
+    t = np.arange(int(total * RATE)) / RATE
+
+    samples = rng.normal(0, 0.002, len(t))  # Room noise
+    samples += 0.05 * np.sin(2 * np.pi * 110 * t) * (0.5 - 0.5 * np.cos(2 * np.pi * t / total))  # Hum swell
+    for onset in onsets:
+        length = int(0.15 * RATE)
+        start = int(onset * RATE)
+        envelope = np.exp(-np.arange(length) / (0.012 * RATE))  # Sharp attack, fast decay
+        clap = rng.normal(0, 1, length) * envelope * rng.uniform(0.05, 0.6)
+        samples[start:start + length] += clap[:len(samples) - start]
+    save_wav_mono(path, samples, RATE)
+    return onsets, total
+
+
+def score_triggers(trigger_times, onsets, duration):
+    """Match triggers to claps: (delays in ms, claps detected, false triggers per minute)"""
+    delays, false_triggers, detected = [], 0, set()
+    for trigger in trigger_times:
+        index = np.searchsorted(onsets, trigger) - 1
+        if index >= 0 and trigger - onsets[index] <= MATCH_WINDOW:
+            if index not in detected:
+                detected.add(index)
+                delays.append((trigger - onsets[index]) * 1000)
+        else:
+            false_triggers += 1
+    return np.array(delays), len(detected), false_triggers / (duration / 60)
+
+
+def onset_triggers(samples):
+    """Run the onset detector over the file as the capture thread would
+
+    Returns the times the events were emitted (end of the chunk holding
+    the onset) and the event timestamps, both in file seconds.
+    """
+    detector = OnsetDetector(RATE)
+    emitted, stamped = [], []
+    for start in range(0, len(samples) - CHUNK + 1, CHUNK):
+        chunk_end = (start + CHUNK) / RATE  # A chunk arrives once its last sample has
+        for event in detector.process(samples[start:start + CHUNK], chunk_end):
+            emitted.append(chunk_end)
+            stamped.append(event.timestamp)
+    return emitted, stamped
+
+
+def rms_triggers(samples, seed=0):
+    """The previous trigger: smoothed chunk RMS over a threshold, then a random draw, 0.15 s cooldown"""
+    rng = random.Random(seed)
+    history, triggers, last = [], [], -np.inf
+    for start in range(0, len(samples) - CHUNK + 1, CHUNK):
+        chunk = samples[start:start + CHUNK]
+        volume = float(np.sqrt(np.mean(chunk * chunk))) * 3.0
+        if history:
+            volume = 0.7 * volume + 0.3 * (np.mean(history[-5:]) if len(history) >= 5 else 0)
+        volume = min(volume, 0.2)
+        history.append(volume)
+        now = (start + CHUNK) / RATE
+        if now - last >= 0.15 and volume >= 0.002 and rng.random() < min(1.0, 0.8 + volume / 0.002 * 0.2):
+            triggers.append(now)
+            last = now
+    return triggers
+
+
+class LatencyProbeFireworks(VoiceControlledFireworks):
+    def __init__(self, audio_device):
+        super().__init__(audio_device=audio_device)
+        self.game_mode = "normal"
+        self.launch_times = []
+
+    def create_firework(self, volume):
+        self.launch_times.append(time.perf_counter())
+        super().create_firework(volume)
+
+
+def live_launches(wav_path):
+    """Play the WAV in real time through the game; returns launch times in file seconds"""
+    game = LatencyProbeFireworks(WavFileAudio(wav_path, realtime=True))
+    stream = game.stream
+    while stream.start_time is None:
+        time.sleep(0.001)
+
+    while stream.is_active():
+        pygame.event.pump()
+        game.step_simulation()
+        game.clock.tick(60)
+
+    report = game.latency_report()
+    game.stream.stop_stream()
+    game.stream.close()
+    game.audio.terminate()
+    pygame.quit()
+    return np.array(game.launch_times) - stream.start_time, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clap detection delay and false triggers, onset detector vs RMS")
+    parser.add_argument("--claps", type=int, default=40)
+    parser.add_argument("--no-live", action="store_true", help="skip the real-time run through the game")
+    args = parser.parse_args()
+
+    wav_path = os.path.join(tempfile.gettempdir(), "firework_claps.wav")
+    onsets, duration = make_clap_wav(wav_path, args.claps)
+    samples, _ = load_wav_mono(wav_path)
+    print(f"👏 {args.claps} claps over {duration:.1f}s in {wav_path}")
+
+    emitted, stamped = onset_triggers(samples)
+    rows = [("rms + random", rms_triggers(samples)), ("spectral flux", emitted)]
+    if not args.no_live:
+        launches, report = live_launches(wav_path)
+        rows.append(("game (live)", launches))
+
+    print(f"{'trigger':>14} {'detected':>9} {'median ms':>10} {'p95 ms':>7} {'false/min':>10}")
+    for name, triggers in rows:
+        delays, detected, false_rate = score_triggers(triggers, onsets, duration)
+        median = f"{np.median(delays):.1f}" if len(delays) else "-"
+        p95 = f"{np.percentile(delays, 95):.1f}" if len(delays) else "-"
+        print(f"{name:>14} {detected:>4}/{args.claps:<4} {median:>10} {p95:>7} {false_rate:>10.1f}")
+    stamp_errors, _, _ = score_triggers(stamped, onsets, duration)
+    print(f"🕒 Onset event timestamps: median {np.median(stamp_errors):.1f} ms after the clap")
+    if not args.no_live:
+        print(f"📊 {report}")
+
+
+if __name__ == "__main__":
+    main()
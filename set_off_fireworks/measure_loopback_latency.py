@@ -0,0 +1,145 @@
+"""
+Measure loopback latency and glitches without a sound card.
+A WAV of clicks over noise is played in real time through the simulated
+WAV device (WavLoopbackAudio) by the previous asyncio design (callbacks
+put into asyncio.Queue objects, a task polling with asyncio.sleep(0.01),
+or 0.1 as in week06's 4a_asyncio_loopback.py) and by DuplexLoopback in
+duplex and ring mode. The recorded output is
+cross-correlated with the input to find how far it trails, over the first
+and the last second, so latency that builds up shows as growth. Then the
+ring runs against an input clock a little fast or slow, as with two
+separate devices, to show the over/underrun counters and that its
+buffering stays bounded.
+Run: python measure_loopback_latency.py [--seconds 5]
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+
+import pyaudio
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Shared modules (duplex_loopback.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
+from duplex_loopback import DuplexLoopback, WavLoopbackAudio, measure_lag, save_wav_int16, RATE, CHUNK
+
+DRIFTS = [0.005, -0.005]
+DRIFT_SECONDS = 60  # Simulated, not real time
+
+
+def make_click_wav(path, seconds, seed=0):
+    """Noise with a click every 0.25 s, int16"""
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 0.02, int(seconds * RATE))
+    for start in range(int(0.1 * RATE), len(samples) - 200, int(0.25 * RATE)):
+        samples[start:start + 200] += rng.normal(0, 0.5, 200) * np.exp(-np.arange(200) / 40)
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    save_wav_int16(path, pcm, RATE)
+    return pcm
+
+
+class AsyncioLoopback:
+    """The previous loopback: queues filled from the audio threads, a task polling them"""
+
+    def __init__(self, audio, poll):
+        self.poll = poll
+        self.input_queue = asyncio.Queue()
+        self.output_queue = asyncio.Queue()
+        self.silent_blocks = 0
+        self.started = False
+        args = dict(format=pyaudio.paInt16, channels=1, rate=RATE, frames_per_buffer=CHUNK)
+        self.streams = [audio.open(input=True, stream_callback=self.input_callback, **args),
+                        audio.open(output=True, stream_callback=self.output_callback, **args)]
+
+    def input_callback(self, in_data, frame_count, time_info, status):
+        self.input_queue.put_nowait(in_data)
+        return (None, pyaudio.paContinue)
+
+    def output_callback(self, in_data, frame_count, time_info, status):
+        try:
+            data = self.output_queue.get_nowait()
+            self.started = True
+        except asyncio.QueueEmpty:
+            data = b'\x00' * CHUNK * 2
+            self.silent_blocks += self.started  # Gaps once audio has started flowing
+        return (data, pyaudio.paContinue)
+
+    async def process(self, device):
+        while not device.finished.is_set():
+            if not self.input_queue.empty():
+                await self.output_queue.put(await self.input_queue.get())
+            else:
+                await asyncio.sleep(self.poll)
+
+
+def lags_ms(reference, recorded):
+    """Output delay behind the input over the first and the last second, in ms"""
+    window = RATE
+    first = measure_lag(reference[:window], recorded, RATE // 2)
+    tail = len(reference) - window
+    last = measure_lag(reference[tail:], recorded[tail:], RATE // 2)
+    return first / RATE * 1000, last / RATE * 1000
+
+
+def run_old(wav_path, reference, poll):
+    device = WavLoopbackAudio(wav_path)
+    loopback = AsyncioLoopback(device, poll)
+    for stream in loopback.streams:
+        stream.start_stream()
+    asyncio.run(loopback.process(device))
+    first, last = lags_ms(reference, device.output_samples())
+    return first, last, loopback.silent_blocks, 0
+
+
+def run_new(wav_path, reference, mode):
+    device = WavLoopbackAudio(wav_path)
+    loopback = DuplexLoopback(device, mode=mode)
+    loopback.start()
+    device.wait()
+    first, last = lags_ms(reference, device.output_samples())
+    loopback.close()
+    return first, last, loopback.underruns, loopback.overruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback latency and glitches through a simulated WAV device")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each real-time run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "clicks.wav")
+        reference = make_click_wav(wav_path, args.seconds)
+
+        print(f"🔁 Loopback latency ({args.seconds:.0f}s real time each, {CHUNK}-sample blocks, "
+              f"device latency not included)")
+        print(f"{'loopback':>16} {'first s ms':>11} {'last s ms':>10} {'underruns':>10} {'overruns':>9}")
+        runs = [("asyncio 10 ms", lambda: run_old(wav_path, reference, 0.01)),
+                ("asyncio 100 ms", lambda: run_old(wav_path, reference, 0.1)),
+                ("duplex", lambda: run_new(wav_path, reference, "duplex")),
+                ("ring", lambda: run_new(wav_path, reference, "ring"))]
+        for name, run in runs:
+            first, last, underruns, overruns = run()
+            print(f"{name:>16} {first:>11.1f} {last:>10.1f} {underruns:>10} {overruns:>9}")
+
+        long_path = os.path.join(tmp, "long.wav")
+        make_click_wav(long_path, DRIFT_SECONDS, seed=1)
+        print(f"\n🔁 Ring with drifting input clock ({DRIFT_SECONDS}s simulated)")
+        print(f"{'input clock':>12} {'buffered ms':>12} {'underruns':>10} {'overruns':>9}")
+        for drift in DRIFTS:
+            device = WavLoopbackAudio(long_path, realtime=False, input_drift=drift)
+            loopback = DuplexLoopback(device, mode="ring")
+            loopback.start()
+            device.wait()
+            stats = loopback.stats()
+            print(f"{drift:>+11.1%} {stats['buffered_latency_ms']:>12.1f} {stats['underruns']:>10} "
+                  f"{stats['overruns']:>9}")
+            loopback.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from collections import deque, namedtuple
+
+import numpy as np
+
+# size: launch volume for create_firework; timestamp: perf_counter time the onset frame ended;
+# sample: index of the onset frame's first sample in the input stream
+LaunchEvent = namedtuple("LaunchEvent", ["size", "timestamp", "sample"])
+
+
+class OnsetDetector:
+    """Streaming spectral-flux onset detector for the audio capture thread
+
+    Audio is cut into short overlapping Hann-windowed frames. For each
+    frame the log-compressed magnitude spectrum is compared with the one
+    `lag` frames earlier and the positive differences are summed (spectral
+    flux; a lag of a few frames also catches softer, spoken attacks),
+    so a clap or a syllable attack stands out even on top of a steady
+    hum. A frame is an onset when its flux rises above an adaptive
+    threshold (a multiple of the median flux over the last half second
+    plus a floor), the frame is louder than `min_level` and the previous
+    onset is at least `min_interval` seconds old.
+    """
+
+    def __init__(self, sample_rate=44100, fft_size=512, hop_size=256, threshold_seconds=0.5,
+                 lag=3, multiplier=1.5, delta=10.0, min_level=0.01, min_interval=0.1,
+                 size_scale=3.0, max_size=0.2):
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.hop_size = hop_size
+        self.multiplier = multiplier
+        self.delta = delta
+        self.min_level = min_level
+        self.min_interval = int(min_interval * sample_rate)
+        self.size_scale = size_scale  # Frame RMS -> launch size, like the game's volume boost
+        self.max_size = max_size
+        self.window = np.hanning(fft_size).astype(np.float32)
+
+        self.pending = np.zeros(0, dtype=np.float32)  # Samples not yet consumed by a full frame
+        self.pending_start = 0  # Stream index of pending[0]
+        self.previous_spectra = deque(maxlen=lag)
+        self.flux_history = np.zeros(max(1, int(threshold_seconds * sample_rate / hop_size)))
+        self.flux_count = 0
+        self.above = False  # Previous frame was over the threshold
+        self.last_onset = -self.min_interval
+
+    def reset(self):
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.pending_start = 0
+        self.previous_spectra.clear()
+        self.flux_history[:] = 0
+        self.flux_count = 0
+        self.above = False
+        self.last_onset = -self.min_interval
+
+    def process(self, samples, timestamp):
+        """Feed one chunk received at perf_counter `timestamp`; returns the LaunchEvents it completes"""
+        pending = np.concatenate((self.pending, samples))
+        frame_count = (len(pending) - self.fft_size) // self.hop_size + 1
+        if frame_count <= 0:
+            self.pending = pending
+            return []
+
+        # All complete frames of this chunk go through one FFT call
+        frames = np.lib.stride_tricks.sliding_window_view(pending, self.fft_size)[::self.hop_size][:frame_count]
+        spectra = np.log1p(100.0 * np.abs(np.fft.rfft(frames * self.window, axis=1)))
+        levels = np.sqrt(np.mean(frames * frames, axis=1))
+        stream_end = self.pending_start + len(pending)  # Stream index just past this chunk
+
+        events = []
+        for i in range(frame_count):
+            spectrum = spectra[i]
+            previous = self.previous_spectra
+            if len(previous) < previous.maxlen:
+                flux = 0.0
+            else:
+                flux = float(np.maximum(spectrum - previous[0], 0.0).sum())
+            previous.append(spectrum)
+
+            history = self.flux_history[:min(self.flux_count, len(self.flux_history))]
+            threshold = self.delta + self.multiplier * (float(np.median(history)) if len(history) else 0.0)
+            self.flux_history[self.flux_count % len(self.flux_history)] = flux
+            self.flux_count += 1
+
+            start = self.pending_start + i * self.hop_size
+            above = flux > threshold
+            if (above and not self.above and levels[i] >= self.min_level
+                    and start - self.last_onset >= self.min_interval):
+                self.last_onset = start
+                frame_end = start + self.fft_size
+                events.append(LaunchEvent(
+                    size=min(float(levels[i]) * self.size_scale, self.max_size),
+                    timestamp=timestamp - (stream_end - frame_end) / self.sample_rate,
+                    sample=start))
+            self.above = above
+
+        consumed = frame_count * self.hop_size
+        self.pending = pending[consumed:].copy()
+        self.pending_start += consumed
+        return events
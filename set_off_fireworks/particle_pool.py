@@ -0,0 +1,139 @@
+import numpy as np
+
+
+class ParticlePool:
+    """Fixed-capacity structure-of-arrays particle storage shared by all fireworks"""
+
+    def __init__(self, capacity=20000, gravity=0.2, shrink=0.98, min_size=1.0, seed=None):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.shrink = shrink
+        self.min_size = min_size
+        self.rng = np.random.default_rng(seed)
+
+        # One array per particle attribute, indexed by slot
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.prev_x = np.zeros(capacity, dtype=np.float32)  # Previous tick, for interpolation
+        self.prev_y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.owner = np.full(capacity, -1, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Slots at or above the high-water mark are guaranteed dead
+        self.top = 0
+        self.live_owners = set()
+
+    def spawn(self, x, y, vx, vy, color, life, size, owner=-1):
+        """Spawn particles into free slots; returns how many were actually placed"""
+        vx = np.atleast_1d(vx)
+        count = len(vx)
+        free = np.flatnonzero(~self.alive)[:count]
+        placed = len(free)
+        if placed == 0:
+            return 0
+
+        self.x[free] = np.broadcast_to(x, count)[:placed]
+        self.y[free] = np.broadcast_to(y, count)[:placed]
+        self.prev_x[free] = self.x[free]
+        self.prev_y[free] = self.y[free]
+        self.vx[free] = vx[:placed]
+        self.vy[free] = np.broadcast_to(vy, count)[:placed]
+        self.color[free] = np.broadcast_to(color, (count, 3))[:placed]
+        self.life[free] = np.broadcast_to(life, count)[:placed]
+        self.size[free] = np.broadcast_to(size, count)[:placed]
+        self.owner[free] = owner
+        self.alive[free] = True
+
+        self.top = max(self.top, int(free[-1]) + 1)
+        self.live_owners.add(owner)
+        return placed
+
+    def update(self):
+        """Advance every live particle one tick: move, gravity, age, shrink and cull"""
+        n = self.top
+        if n == 0:
+            return
+
+        # Dead slots below the high-water mark are updated too; spawn overwrites them
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.gravity
+        self.life[:n] -= 1
+        self.size[:n] *= self.shrink
+
+        alive = self.alive[:n]
+        alive &= (self.life[:n] > 0) & (self.size[:n] >= self.min_size)
+
+        live = np.flatnonzero(alive)
+        self.top = int(live[-1]) + 1 if len(live) else 0
+        self.live_owners = set(np.unique(self.owner[live]).tolist())
+
+    def has_particles(self, owner):
+        """Check whether any particle spawned by this owner is still alive"""
+        return owner in self.live_owners
+
+    def live_count(self):
+        """Number of live particles"""
+        return int(np.count_nonzero(self.alive[:self.top]))
+
+    def clear(self):
+        """Kill every particle"""
+        self.alive[:] = False
+        self.top = 0
+        self.live_owners = set()
+
+    def blit_sequence(self, sprites, alpha=1.0, glow=True, max_particles=None, downscale=1):
+        """Build (sprite, position) pairs for every live particle from a GlowSpriteCache
+
+        Positions are interpolated `alpha` of the way from the previous tick.
+        glow=False draws only each particle's opaque core, max_particles
+        draws an evenly spaced sample of the live particles and downscale
+        shrinks positions and sizes for a reduced-resolution target.
+        """
+        live = np.flatnonzero(self.alive[:self.top])
+        if max_particles is not None and len(live) > max_particles:
+            live = live[::-(-len(live) // max_particles)]
+        if len(live) == 0:
+            return []
+
+        if glow:
+            # Glow is twice the particle size; its alpha fades with remaining life
+            radius = (self.size[live] * 2).astype(np.int64)
+            glow_alpha = np.maximum(10, self.life[live].astype(np.int64) * 2) // 3
+            bucket = np.minimum(255, glow_alpha // sprites.alpha_step * sprites.alpha_step)
+        else:
+            # Just the core the glow sprite would have drawn: half its radius, opaque
+            radius = (self.size[live] * 2).astype(np.int64) // 2
+            bucket = np.full(len(live), 255, dtype=np.int64)
+        if downscale > 1:
+            radius = np.maximum(1, radius // downscale)
+        color = self.color[live].astype(np.int64)
+        packed = (radius << 32) | (color[:, 0] << 24) | (color[:, 1] << 16) | (color[:, 2] << 8) | bucket
+
+        # Look up each distinct sprite once, then fan out to the particles using it
+        keys, inverse = np.unique(packed, return_inverse=True)
+        unique_sprites = [
+            sprites.get(key >> 32, ((key >> 24) & 255, (key >> 16) & 255, (key >> 8) & 255),
+                        key & 255, core=glow)
+            for key in keys.tolist()
+        ]
+
+        x = self.prev_x[live] + (self.x[live] - self.prev_x[live]) * alpha
+        y = self.prev_y[live] + (self.y[live] - self.prev_y[live]) * alpha
+        if downscale > 1:
+            x = x / downscale
+            y = y / downscale
+        xs = (x.astype(np.int64) - radius).tolist()
+        ys = (y.astype(np.int64) - radius).tolist()
+        return [(unique_sprites[i], (x, y)) for i, x, y in zip(inverse.tolist(), xs, ys)]
+
+    def draw(self, screen, sprites, alpha=1.0):
+        """Draw all live particles with their glow in a single batched blit"""
+        screen.blits(self.blit_sequence(sprites, alpha), doreturn=False)
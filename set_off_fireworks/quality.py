@@ -0,0 +1,185 @@
+"""
+Render quality tiers for the fireworks game, stepped down automatically
+when frames run over budget and back up when there is headroom.
+
+Tiers only change how effects are drawn, never what is simulated: particle
+counts, spawn randomness and state digests stay the same on every machine,
+so recorded sessions replay exactly whatever tier they were played at.
+
+    quality = QualityManager(telemetry_path="quality.jsonl")
+    while running:
+        frame_start = time.perf_counter()
+        ...  # simulate, render with quality.tier, present
+        quality.record_frame((time.perf_counter() - frame_start) * 1000, particles)
+    print(quality.report())
+"""
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class QualityTier:
+    """How the effects are drawn at one quality level"""
+
+    def __init__(self, name, glow=True, trail_length=20, fireball_trail=10, max_particles=None, downscale=1):
+        self.name = name
+        self.glow = glow  # False draws particles as their opaque core only
+        self.trail_length = trail_length  # Rocket trail segments
+        self.fireball_trail = fireball_trail  # Newest fireball trail slots drawn
+        self.max_particles = max_particles  # Particles drawn per frame (None = all), an even sample of the live ones
+        self.downscale = downscale  # 2 = effects drawn on a half-resolution surface and scaled up
+
+
+# Best first; each tier keeps the savings of the ones before it
+QUALITY_TIERS = [
+    QualityTier("high"),
+    QualityTier("no glow", glow=False),
+    QualityTier("short trails", glow=False, trail_length=6, fireball_trail=4),
+    QualityTier("particle cap", glow=False, trail_length=6, fireball_trail=4, max_particles=2000),
+    QualityTier("half-res effects", glow=False, trail_length=6, fireball_trail=4, max_particles=1000, downscale=2),
+]
+
+
+def tier_index(name, tiers=QUALITY_TIERS):
+    """Index of the tier called `name`; raises ValueError listing the valid names"""
+    for index, tier in enumerate(tiers):
+        if tier.name == name:
+            return index
+    raise ValueError(f"unknown quality tier {name!r} (choose from {', '.join(t.name for t in tiers)})")
+
+
+class QualityManager:
+    """Watches rolling frame times and picks the quality tier
+
+    A full window of frames averaging over the budget steps down one tier;
+    a full window under `headroom` of the budget steps back up. The window
+    restarts after every change so each decision is based only on frames
+    drawn at the current tier.
+
+    Going back up has to be earned: when a tier runs over budget the
+    manager estimates the load (live particles) it could have afforded,
+    assuming cost grows with load, and steps back up at once only while
+    the load is comfortably below that. Otherwise it waits
+    `upgrade_wait` windows of headroom, and an upgrade that is undone soon
+    after doubles that wait, so a machine sitting between two tiers does
+    not flip-flop.
+
+    Every change is printed and, with `telemetry_path`, appended there as
+    a JSON line; report() sums up the time spent in each tier.
+    """
+
+    def __init__(self, tiers=QUALITY_TIERS, budget_ms=1000 / 60, window=90, headroom=0.6,
+                 auto=True, tier=0, telemetry_path=None, upgrade_wait=4, max_upgrade_wait=32):
+        self.tiers = tiers
+        self.budget_ms = budget_ms
+        self.window = window
+        self.headroom = headroom
+        self.auto = auto  # False pins the tier
+        self.index = tier
+        self.telemetry_path = telemetry_path
+        self.frame_times = deque(maxlen=window)  # Milliseconds of work per frame, this tier only
+        self.upgrade_wait = [upgrade_wait] * len(tiers)  # Windows of headroom before trying each tier again
+        self.max_upgrade_wait = max_upgrade_wait
+        self.affordable_load = [None] * len(tiers)  # Estimated from when each tier last ran over budget
+        self.headroom_windows = 0
+        self.last_upgrade_frame = None
+        self.frame_count = 0
+        self.start_time = time.perf_counter()
+        self.tier_started = self.start_time
+        self.tier_seconds = [0.0] * len(tiers)
+        self.changes = []  # Telemetry records, oldest first
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def record_frame(self, work_ms, particles=0):
+        """Add one frame's work time (excluding the frame-cap sleep); returns True if the tier changed
+
+        `particles` is the current load, used to judge when a better tier
+        can be afforded again and reported in the telemetry.
+        """
+        self.frame_count += 1
+        self.frame_times.append(work_ms)
+        if not self.auto or len(self.frame_times) < self.window:
+            return False
+
+        average = sum(self.frame_times) / self.window
+        if average > self.budget_ms and self.index < len(self.tiers) - 1:
+            self.affordable_load[self.index] = particles * self.budget_ms / average
+            if (self.last_upgrade_frame is not None
+                    and self.frame_count - self.last_upgrade_frame <= self.window * self.upgrade_wait[self.index]):
+                # The last upgrade did not hold; wait longer before trying it again
+                self.upgrade_wait[self.index] = min(self.max_upgrade_wait, self.upgrade_wait[self.index] * 2)
+            self.set_tier(self.index + 1, "over budget", particles)
+            return True
+        if average < self.budget_ms * self.headroom and self.index > 0:
+            self.headroom_windows += 1
+            affordable = self.affordable_load[self.index - 1]
+            if (affordable is None or particles < affordable * 0.8
+                    or self.headroom_windows >= self.upgrade_wait[self.index - 1]):
+                self.set_tier(self.index - 1, "headroom", particles)
+                self.last_upgrade_frame = self.frame_count
+                return True
+            self.frame_times.clear()  # Count whole windows of headroom
+        else:
+            self.headroom_windows = 0
+        return False
+
+    def set_tier(self, index, reason="manual", particles=0):
+        """Switch to tier `index`, recording why and the frame times that led to it"""
+        now = time.perf_counter()
+        times = np.array(self.frame_times) if self.frame_times else np.zeros(1)
+        change = {
+            "time": round(now - self.start_time, 3),
+            "from": self.tier.name,
+            "to": self.tiers[index].name,
+            "reason": reason,
+            "avg_ms": round(float(times.mean()), 2),
+            "p95_ms": round(float(np.percentile(times, 95)), 2),
+            "budget_ms": round(self.budget_ms, 2),
+            "particles": int(particles),
+        }
+        self.tier_seconds[self.index] += now - self.tier_started
+        self.tier_started = now
+        self.index = index
+        self.frame_times.clear()
+        self.headroom_windows = 0
+        self.changes.append(change)
+        print(f"🎚️ Quality {change['from']} → {change['to']} ({reason}: {change['avg_ms']:.1f} ms avg, "
+              f"{change['p95_ms']:.1f} ms p95, {change['particles']} particles)")
+        self.write_telemetry(change)
+
+    def write_telemetry(self, record):
+        if not self.telemetry_path:
+            return
+        try:
+            with open(self.telemetry_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            print(f"❌ Could not write quality telemetry: {e}")
+            self.telemetry_path = None
+
+    def time_in_tiers(self):
+        """Seconds spent in each tier so far, by name"""
+        seconds = list(self.tier_seconds)
+        seconds[self.index] += time.perf_counter() - self.tier_started
+        return {tier.name: seconds[i] for i, tier in enumerate(self.tiers)}
+
+    def close(self):
+        """Append the per-tier time summary to the telemetry log"""
+        seconds = self.time_in_tiers()
+        self.write_telemetry({"time": round(time.perf_counter() - self.start_time, 3), "summary": True,
+                              "tier_seconds": {name: round(s, 2) for name, s in seconds.items()},
+                              "final": self.tier.name, "frames": self.frame_count})
+
+    def report(self):
+        """One-line summary for the end of a session"""
+        seconds = self.time_in_tiers()
+        total = sum(seconds.values()) or 1.0
+        spent = ", ".join(f"{name} {s / total:.0%}" for name, s in seconds.items() if s > 0)
+        lowest = max([self.index] + [tier_index(c["to"], self.tiers) for c in self.changes])
+        return (f"Quality: {spent}; lowest tier {self.tiers[lowest].name}, "
+                f"{len(self.changes)} changes")
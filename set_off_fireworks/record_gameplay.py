@@ -8,87 +8,70 @@ import random
 import time
 from collections import deque
 import os
-from PIL import Image, ImageDraw, ImageFont
+import sys
 import imageio
 
 # Import the main game class
-from voice_fireworks import VoiceControlledFireworks
+from voice_fireworks import VoiceControlledFireworks, SIM_DT
+from audio_capture import NullAudio
+from session_log import SessionLog
+from frame_writer import StreamingFrameWriter, TextSpriteCache, blend_overlays
 
 class GameplayRecorder:
-    def __init__(self):
+    def __init__(self, capture_fps=60):
         self.recording = False
-        self.frames = []
+        self.writer = None
+        self.capture_fps = capture_fps  # Rate add_frame() is called at
+        self.frame_step = 1
+        self.frames_seen = 0
         self.frame_count = 0
-        self.max_frames = 600  # 10 seconds at 60 FPS
-        self.recording_states = []
+        self.max_frames = None  # Optional cap; otherwise only disk space limits a recording
+        
+        # State text is rendered once per distinct string and blended into captured frames
+        self.sprites = TextSpriteCache()
         
     def add_frame(self, surface, state_info=""):
-        """Add a frame to the recording with state information"""
-        if self.recording and self.frame_count < self.max_frames:
-            # Convert pygame surface to numpy array
-            frame_array = pygame.surfarray.array3d(surface)
-            frame_array = np.transpose(frame_array, (1, 0, 2))
-            
-            # Convert to PIL Image for text overlay
-            frame_image = Image.fromarray(frame_array)
-            
-            # Add state information overlay
-            if state_info:
-                draw = ImageDraw.Draw(frame_image)
-                try:
-                    # Try to use a system font
-                    font = ImageFont.truetype("arial.ttf", 24)
-                except:
-                    # Fallback to default font
-                    font = ImageFont.load_default()
-                
-                # Add text with background
-                text_bbox = draw.textbbox((0, 0), state_info, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                text_height = text_bbox[3] - text_bbox[1]
-                
-                # Background rectangle
-                draw.rectangle([10, 10, 20 + text_width, 20 + text_height], 
-                             fill=(0, 0, 0, 128))
-                draw.text((15, 15), state_info, fill=(255, 255, 255), font=font)
-            
-            self.frames.append(np.array(frame_image))
-            self.recording_states.append(state_info)
-            self.frame_count += 1
+        """Queue a frame for encoding, keeping only every frame_step-th call"""
+        if not self.recording:
+            return
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.frame_step:
+            return  # Decimated at capture time, never copied
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            return
+        
+        self.writer.append(surface, self.state_overlays(state_info))
+        self.frame_count += 1
+    
+    def state_overlays(self, state_info):
+        """State information overlay as (sprite, x, y), blended on the encoder thread"""
+        if not state_info:
+            return []
+        # White text on a half-transparent black box
+        return [(self.sprites.get(state_info, 28, (255, 255, 255), (0, 0, 0, 128)), 10, 10)]
             
-    def start_recording(self):
-        """Start recording gameplay"""
+    def start_recording(self, filename="gameplay_demo.gif", fps=30):
+        """Start streaming gameplay to a GIF or MP4 file at `fps`"""
+        self.frame_step = max(1, round(self.capture_fps / fps))  # e.g. 60 Hz game -> 15 FPS GIF keeps every 4th frame
+        self.writer = StreamingFrameWriter(filename, fps, decorate=blend_overlays)
         self.recording = True
-        self.frames = []
+        self.frames_seen = 0
         self.frame_count = 0
-        self.recording_states = []
-        print("🎬 Recording started!")
+        print(f"🎬 Recording started: {filename} at {fps} FPS")
         
     def stop_recording(self):
-        """Stop recording gameplay"""
-        self.recording = False
-        print(f"🎬 Recording stopped! Captured {len(self.frames)} frames")
-        
-    def save_gif(self, filename="gameplay_demo.gif", fps=30):
-        """Save recorded frames as GIF"""
-        if not self.frames:
-            print("❌ No frames to save!")
+        """Stop recording and finish writing the file"""
+        if self.writer is None:
             return
-            
-        print(f"💾 Saving GIF with {len(self.frames)} frames...")
-        
-        # Reduce frame rate by skipping frames
-        skip_factor = 60 // fps  # Convert from 60 FPS to desired FPS
-        selected_frames = self.frames[::skip_factor]
-        
-        # Save as GIF
-        imageio.mimsave(filename, selected_frames, fps=fps, loop=0)
-        print(f"✅ GIF saved as: {filename}")
-        print(f"📊 Final GIF: {len(selected_frames)} frames at {fps} FPS")
+        self.recording = False
+        written = self.writer.close()
+        print(f"🎬 Recording stopped! Captured {self.frame_count} of {self.frames_seen} frames")
+        print(f"✅ Saved as: {self.writer.filename} ({written} frames at {self.writer.fps} FPS)")
+        self.writer = None
 
 class RecordableFireworks(VoiceControlledFireworks):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         self.recorder = GameplayRecorder()
         self.demo_sequence = [
             {"action": "start_recording", "delay": 1.0},
@@ -105,18 +88,18 @@ class RecordableFireworks(VoiceControlledFireworks):
         self.demo_step = 0
         self.demo_timer = 0
         self.auto_demo = True
-        self.last_demo_time = time.time()
-        
-    def run_demo(self):
-        """Run automated demo sequence"""
-        self.recorder.start_recording()
         
+    def run_demo(self, log_path="voice_fireworks_demo.fwlog", gif_path="voice_fireworks_demo.gif"):
+        """Run automated demo sequence in the window, logging inputs
+
+        Every tick is still rendered and shown live; nothing is captured
+        here. The GIF is made afterwards by export_gif() replaying the log.
+        """
         try:
             running = True
             while running and self.demo_step < len(self.demo_sequence):
-                current_time = time.time()
-                dt = current_time - self.last_demo_time
-                self.last_demo_time = current_time
+                # Demo timing follows simulation time, one tick per frame
+                dt = SIM_DT
                 
                 # Handle events
                 for event in pygame.event.get():
@@ -136,12 +119,6 @@ class RecordableFireworks(VoiceControlledFireworks):
                 # Update game logic
                 self.update_game_logic()
                 
-                # Get current state for overlay
-                state_info = self.get_current_state_info()
-                
-                # Record frame
-                self.recorder.add_frame(self.screen, state_info)
-                
                 # Draw and update
                 pygame.display.flip()
                 self.clock.tick(60)
@@ -149,14 +126,35 @@ class RecordableFireworks(VoiceControlledFireworks):
         except KeyboardInterrupt:
             print("\n🎬 Demo interrupted!")
         finally:
-            self.recorder.stop_recording()
-            self.recorder.save_gif("voice_fireworks_demo.gif", fps=15)
+            self.save_session(log_path)
             
             # Cleanup
             self.stream.stop_stream()
             self.stream.close()
             self.audio.terminate()
             pygame.quit()
+        
+        if gif_path:
+            type(self).export_gif(log_path, gif_path, fps=15)
+    
+    @classmethod
+    def export_gif(cls, log_path, gif_path, fps=15):
+        """Replay a session log headless and stream it to a GIF (or .mp4)"""
+        log = SessionLog.load(log_path)
+        game = cls(width=log.width, height=log.height, audio_device=NullAudio(), seed=log.seed)
+        # Decimate in the replay itself so skipped ticks are never even drawn
+        frame_step = max(1, round(game.recorder.capture_fps / fps))
+        game.recorder.capture_fps = fps
+        game.recorder.start_recording(gif_path, fps=fps)
+        try:
+            digest = game.replay(log, frame_step=frame_step, on_frame=lambda: game.recorder.add_frame(
+                game.screen, game.get_current_state_info()))
+            if digest != log.digest:
+                print("⚠️ Replay diverged from the recorded session!")
+        finally:
+            game.recorder.stop_recording()
+            game.audio.terminate()
+            pygame.quit()
     
     def execute_demo_action(self, action):
         """Execute a demo action"""
@@ -165,22 +163,22 @@ class RecordableFireworks(VoiceControlledFireworks):
             
         elif action == "show_normal_mode":
             print("🎆 Demo: Showing normal mode")
-            self.game_mode = "normal"
+            self.apply_input("mode", "normal")
             # Create some manual fireworks
             for i in range(3):
-                self.create_firework(0.3 + i * 0.2)
+                self.apply_input("firework", 0.3 + i * 0.2)
                 
         elif action == "switch_to_monster_hunt":
             print("👹 Demo: Switching to monster hunt mode")
-            self.game_mode = "monster_hunt"
-            self.reset_game()
+            self.apply_input("mode", "monster_hunt")
+            self.apply_input("reset")
             
         elif action == "simulate_voice_input":
             print("🎤 Demo: Simulating voice input")
             # Simulate voice-controlled fireworks
             for i in range(5):
                 volume = 0.2 + random.random() * 0.4
-                self.create_firework(volume)
+                self.apply_input("firework", volume)
                 
         elif action == "wait_for_monsters":
             print("⏳ Demo: Waiting for monsters to spawn")
@@ -192,65 +190,32 @@ class RecordableFireworks(VoiceControlledFireworks):
             for i in range(10):
                 if random.random() < 0.7:  # 70% chance to create firework
                     volume = 0.4 + random.random() * 0.4
-                    self.create_firework(volume)
+                    self.apply_input("firework", volume)
                     
         elif action == "simulate_damage":
             print("💔 Demo: Simulating player damage")
             # Take some damage
-            self.take_damage(20)  # Take 2/3 health damage
+            self.apply_input("damage", 20)  # Take 2/3 health damage
             
         elif action == "game_over_sequence":
             print("💀 Demo: Game over sequence")
             # Take final damage
-            self.take_damage(10)
+            self.apply_input("damage", 10)
             
         elif action == "restart_game":
             print("🔄 Demo: Restarting game")
-            self.reset_game()
+            self.apply_input("reset")
             
         elif action == "stop_recording":
             print("🛑 Demo: Stopping recording")
     
     def update_game_logic(self):
         """Update game logic without voice input"""
-        # Update fireworks
-        for firework in self.fireworks[:]:
-            firework.update()
-            if firework.is_finished():
-                self.fireworks.remove(firework)
-        
-        # Monster hunt mode updates
-        if self.game_mode == "monster_hunt" and not self.game_over:
-            self.spawn_monster()
-            self.update_monsters()
-            self.update_fireballs()
-            self.check_monster_collisions()
-            self.check_firework_interceptions()
+        # One fixed simulation tick per recorded frame
+        self.step_simulation(voice_input=False)
         
         # Draw everything
-        self.update_background()
-        
-        # Draw monsters and fireballs (in monster hunt mode)
-        if self.game_mode == "monster_hunt":
-            self.draw_monsters()
-            self.draw_fireballs()
-        
-        # Draw fireworks
-        for firework in self.fireworks:
-            firework.draw(self.screen)
-        
-        # Draw UI
-        self.draw_volume_indicator()
-        self.draw_instructions()
-        self.draw_statistics()
-        
-        # Draw health bar (in monster hunt mode)
-        if self.game_mode == "monster_hunt":
-            self.draw_health_bar()
-        
-        # Draw game over screen if needed
-        if self.game_over:
-            self.draw_game_over()
+        self.render()
     
     def get_current_state_info(self):
         """Get current game state for overlay"""
@@ -261,7 +226,7 @@ class RecordableFireworks(VoiceControlledFireworks):
                 return f"Game Over | Score: {self.score} | Health: 0/30"
             else:
                 monsters_alive = sum(1 for m in self.monsters if m.alive)
-                fireballs_count = len([f for f in self.fireballs if f.alive])
+                fireballs_count = len(self.fireballs)
                 return f"Monster Hunt | Health: {self.current_health}/30 | Score: {self.score} | Monsters: {monsters_alive} | Fireballs: {fireballs_count}"
 
 if __name__ == "__main__":
@@ -270,7 +235,7 @@ if __name__ == "__main__":
         print("🎬 This will create an automated gameplay demonstration")
         
         demo_game = RecordableFireworks()
-        demo_game.run_demo()
+        demo_game.run_demo(gif_path=None if "--no-gif" in sys.argv else "voice_fireworks_demo.gif")
         
         print("✅ Demo recording completed!")
         print("📁 Check 'voice_fireworks_demo.gif' for the gameplay demonstration")
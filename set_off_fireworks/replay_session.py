@@ -0,0 +1,64 @@
+"""
+Replay a recorded fireworks session log headless and check it reproduces exactly.
+Record: python voice_fireworks.py --record session.fwlog
+Run:    python replay_session.py session.fwlog [--gif out.gif] [--fps 15]
+"""
+import os
+import sys
+import time
+import argparse
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks, SIM_DT
+from audio_capture import NullAudio
+from session_log import SessionLog
+
+
+def replay(path):
+    """Re-simulate a log without drawing; returns True if the final state matches"""
+    log = SessionLog.load(path)
+    game = VoiceControlledFireworks(width=log.width, height=log.height, audio_device=NullAudio(), seed=log.seed)
+    try:
+        start = time.perf_counter()
+        digest = game.replay(log)
+        elapsed = time.perf_counter() - start
+    finally:
+        game.audio.terminate()
+        pygame.quit()
+
+    recorded_seconds = log.tick_count * SIM_DT
+    print(f"📼 {path}: seed {log.seed}, {log.tick_count} ticks ({recorded_seconds:.1f}s), {len(log.events)} events")
+    print(f"⏱️ Replayed in {elapsed:.2f}s ({log.tick_count / max(elapsed, 1e-9):.0f} ticks/s, "
+          f"{recorded_seconds / max(elapsed, 1e-9):.0f}x real time)")
+    if digest == log.digest:
+        print(f"✅ Final state matches: {digest.hex()}")
+        return True
+    print(f"❌ Replay diverged: recorded {log.digest.hex()}, replayed {digest.hex()}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a fireworks session log")
+    parser.add_argument("log", help="session log written with --record")
+    parser.add_argument("--gif", help="also render the replay to this GIF (or .mp4)")
+    parser.add_argument("--fps", type=int, default=15, help="GIF frame rate")
+    args = parser.parse_args()
+
+    matched = replay(args.log)
+    if args.gif:
+        # Frames are only rendered when exporting
+        from record_gameplay import RecordableFireworks
+        RecordableFireworks.export_gif(args.log, args.gif, fps=args.fps)
+    sys.exit(0 if matched else 1)
+
+
+if __name__ == "__main__":
+    main()
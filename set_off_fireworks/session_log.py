@@ -0,0 +1,89 @@
+import struct
+
+import numpy as np
+
+MAGIC = b"FWLOG"
+# Bump whenever replaying the same log would simulate differently; older logs are rejected.
+# 2: pooled entities, the vectorized fireball swarm and onset-detected launches changed replay semantics
+VERSION = 2
+# magic, version, seed, width, height, tick count, event count, final state digest
+HEADER = struct.Struct("<5sHQHHII20s")
+EVENT_DTYPE = np.dtype([("tick", "<u4"), ("kind", "u1"), ("value", "<f8")])
+
+# Input kinds that change the simulation; value meaning depends on the kind
+EVENT_KINDS = ["key", "firework", "damage", "mode", "reset", "phase"]
+GAME_MODES = ["normal", "monster_hunt"]
+
+
+class SessionLog:
+    """Compact log of everything needed to replay a fireworks session exactly
+
+    Stores the RNG seed, the volume fed to each simulation tick (NaN when
+    voice input was off) and discrete input events stamped with the tick
+    they were applied before. Frames are never stored.
+    """
+
+    def __init__(self, seed, width, height):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.volumes = []
+        self.events = []  # (tick, kind index, value)
+        self.digest = b"\0" * 20  # State digest after the last tick, filled in on save
+
+    @property
+    def tick_count(self):
+        return len(self.volumes)
+
+    def record_tick(self, volume):
+        self.volumes.append(volume)
+
+    def record_event(self, kind, value=0.0):
+        """Log an input applied before the next tick"""
+        if kind == "mode":
+            value = GAME_MODES.index(value)
+        self.events.append((self.tick_count, EVENT_KINDS.index(kind), float(value)))
+
+    def events_by_tick(self):
+        """Map tick -> [(kind, value), ...] in the order they were applied"""
+        grouped = {}
+        for tick, kind_index, value in self.events:
+            kind = EVENT_KINDS[kind_index]
+            if kind == "mode":
+                value = GAME_MODES[int(value)]
+            elif kind == "key":
+                value = int(value)
+            grouped.setdefault(tick, []).append((kind, value))
+        return grouped
+
+    def save(self, path, digest=None):
+        """Write the log as a small binary file"""
+        if digest is not None:
+            self.digest = digest
+        events = np.array(self.events, dtype=EVENT_DTYPE)
+        with open(path, "wb") as log_file:
+            log_file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height,
+                                       self.tick_count, len(events), self.digest))
+            log_file.write(np.asarray(self.volumes, dtype="<f8").tobytes())
+            log_file.write(events.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as log_file:
+            data = log_file.read()
+
+        magic, version, seed, width, height, ticks, event_count, digest = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a fireworks session log")
+        if version != VERSION:
+            raise ValueError(f"{path} is a version {version} session log; this game replays version {VERSION} "
+                             f"logs only (older logs no longer replay exactly, record the session again)")
+
+        log = cls(seed, width, height)
+        offset = HEADER.size
+        log.volumes = np.frombuffer(data, dtype="<f8", count=ticks, offset=offset).tolist()
+        offset += ticks * 8
+        events = np.frombuffer(data, dtype=EVENT_DTYPE, count=event_count, offset=offset)
+        log.events = [(int(e["tick"]), int(e["kind"]), float(e["value"])) for e in events]
+        log.digest = digest
+        return log
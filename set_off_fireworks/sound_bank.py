@@ -0,0 +1,212 @@
+import os
+from collections import OrderedDict
+
+import pygame
+import numpy as np
+
+SAMPLE_RATE = 22050
+SYNTH_VERSION = 1  # Bump when the synthesis changes so stale disk caches are ignored
+
+
+def synthesize_launch_wave(size_multiplier, rng):
+    """Synthesize a launch/whoosh sound as a stereo int16 array"""
+    duration = 0.8 + size_multiplier * 0.4  # Launch sound duration
+
+    # Create time array
+    t = np.linspace(0, duration, int(SAMPLE_RATE * duration))
+
+    # Generate launch sound components based on size
+    if size_multiplier < 0.5:
+        # Small firework launch
+        base_freq = 80 + rng.integers(0, 41)
+        sweep_range = 60
+        noise_intensity = 0.2
+    elif size_multiplier < 1.0:
+        # Medium firework launch
+        base_freq = 60 + rng.integers(0, 31)
+        sweep_range = 80
+        noise_intensity = 0.3
+    else:
+        # Large firework launch
+        base_freq = 40 + rng.integers(0, 21)
+        sweep_range = 100
+        noise_intensity = 0.4
+
+    # Create frequency sweep (whoosh effect)
+    frequency_sweep = base_freq + sweep_range * np.exp(-3 * t)
+
+    # Generate whoosh sound with frequency sweep
+    whoosh_wave = np.sin(2 * np.pi * frequency_sweep * t)
+
+    # Add pink noise for realistic launch texture
+    noise = rng.normal(0, noise_intensity, len(t))
+
+    # Combine whoosh and noise
+    launch_wave = 0.7 * whoosh_wave + 0.3 * noise
+
+    # Apply launch envelope (quick attack, gradual decay)
+    attack_time = 0.1
+    attack_samples = int(SAMPLE_RATE * attack_time)
+
+    envelope = np.ones_like(t)
+    # Quick attack
+    envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
+    # Gradual decay
+    envelope[attack_samples:] = np.exp(-2 * (t[attack_samples:] - attack_time))
+
+    launch_wave *= envelope
+
+    # Add subtle crackle for larger launches
+    if size_multiplier > 0.6:
+        crackle_freq = 400 + rng.integers(0, 201)
+        crackle = 0.15 * np.sin(2 * np.pi * crackle_freq * t) * rng.choice([0, 1], len(t), p=[0.8, 0.2])
+        launch_wave += crackle * envelope
+
+    return to_stereo_int16(launch_wave)
+
+
+def synthesize_explosion_wave(size_multiplier, rng):
+    """Synthesize an explosion sound as a stereo int16 array"""
+    duration = 0.5 + size_multiplier * 0.3  # Bigger fireworks = longer sound
+
+    # Create time array
+    t = np.linspace(0, duration, int(SAMPLE_RATE * duration))
+
+    # Generate explosion sound components
+    if size_multiplier < 0.5:
+        # Small firework - higher pitch, shorter
+        frequency = 150 + rng.integers(0, 101)
+        noise_intensity = 0.3
+        fade_speed = 8
+    elif size_multiplier < 1.0:
+        # Medium firework
+        frequency = 100 + rng.integers(0, 81)
+        noise_intensity = 0.5
+        fade_speed = 6
+    else:
+        # Large firework - lower pitch, longer, more intense
+        frequency = 60 + rng.integers(0, 61)
+        noise_intensity = 0.7
+        fade_speed = 4
+
+    # Create explosion sound with multiple components
+    # Base explosion (sine wave with rapid decay)
+    base_wave = np.sin(2 * np.pi * frequency * t)
+
+    # Add harmonics for richness
+    harmonic1 = 0.5 * np.sin(2 * np.pi * frequency * 2 * t)
+    harmonic2 = 0.3 * np.sin(2 * np.pi * frequency * 3 * t)
+
+    # Add noise for realistic explosion texture
+    noise = rng.normal(0, noise_intensity, len(t))
+
+    # Combine components
+    sound_wave = base_wave + harmonic1 + harmonic2 + noise
+
+    # Apply exponential decay envelope
+    envelope = np.exp(-fade_speed * t)
+    sound_wave *= envelope
+
+    # Add crackle effect for larger fireworks
+    if size_multiplier > 0.7:
+        crackle_frequency = 800 + rng.integers(0, 401)
+        crackle = 0.2 * np.sin(2 * np.pi * crackle_frequency * t) * rng.choice([0, 1], len(t), p=[0.7, 0.3])
+        crackle *= envelope * 2  # Faster decay for crackle
+        sound_wave += crackle
+
+    return to_stereo_int16(sound_wave)
+
+
+def to_stereo_int16(wave):
+    """Clip a float wave to [-1, 1] and convert to a pygame-ready stereo int16 array"""
+    wave = (np.clip(wave, -1, 1) * 32767).astype(np.int16)
+    return np.column_stack((wave, wave))
+
+
+class SoundBank:
+    """Pre-generated firework sounds, quantized by size bucket and handed out in O(1)"""
+
+    SYNTHESIZERS = {
+        "launch": synthesize_launch_wave,
+        "explosion": synthesize_explosion_wave
+    }
+
+    def __init__(self, bucket_step=0.25, max_size=2.5, variants=3, max_sounds=64,
+                 cache_dir=None, seed=0):
+        self.bucket_step = bucket_step
+        self.bucket_count = int(np.ceil(max_size / bucket_step))
+        self.variants = variants
+        self.max_sounds = max_sounds  # LRU cap for lazily generated sounds
+        self.cache_dir = cache_dir
+        self.seed = seed
+        self.rng = np.random.default_rng()  # Variant picking only; never touches game randomness
+        self.sounds = OrderedDict()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def bucket(self, size_multiplier):
+        """Map a size multiplier onto its bucket index"""
+        return min(self.bucket_count - 1, max(0, int(size_multiplier / self.bucket_step)))
+
+    def bucket_size(self, bucket):
+        """Representative size multiplier (bucket center) used for synthesis"""
+        return (bucket + 0.5) * self.bucket_step
+
+    def preload(self):
+        """Generate every variant of every bucket up front (lifts the LRU cap)"""
+        self.max_sounds = max(self.max_sounds, len(self.SYNTHESIZERS) * self.bucket_count * self.variants)
+        for kind in self.SYNTHESIZERS:
+            for bucket in range(self.bucket_count):
+                for variant in range(self.variants):
+                    self.get_variant(kind, bucket, variant)
+
+    def get(self, kind, size_multiplier):
+        """Get a ready pygame Sound for this kind and size, picking a random variant"""
+        variant = int(self.rng.integers(0, self.variants))
+        return self.get_variant(kind, self.bucket(size_multiplier), variant)
+
+    def get_variant(self, kind, bucket, variant):
+        """Get one specific variant, synthesizing (or loading from disk) on first use"""
+        key = (kind, bucket, variant)
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.sounds.move_to_end(key)
+            return sound
+
+        sound = pygame.sndarray.make_sound(self.load_wave(kind, bucket, variant))
+        self.sounds[key] = sound
+        if len(self.sounds) > self.max_sounds:
+            self.sounds.popitem(last=False)
+        return sound
+
+    def load_wave(self, kind, bucket, variant):
+        """Read a wave from the disk cache, or synthesize (and store) it"""
+        path = None
+        if self.cache_dir:
+            name = f"{kind}_s{self.seed}_b{self.bucket_step}_{bucket}_{variant}_v{SYNTH_VERSION}.npy"
+            path = os.path.join(self.cache_dir, name)
+            if os.path.exists(path):
+                try:
+                    return np.load(path)
+                except Exception as e:
+                    print(f"Sound cache read error ({name}): {e}")
+
+        # Each variant has its own fixed seed so cached files are reproducible
+        kind_index = list(self.SYNTHESIZERS).index(kind)
+        rng = np.random.default_rng([self.seed, kind_index, bucket, variant])
+        wave = self.SYNTHESIZERS[kind](self.bucket_size(bucket), rng)
+
+        if path:
+            try:
+                np.save(path, wave)
+            except Exception as e:
+                print(f"Sound cache write error: {e}")
+        return wave
+
+    def play(self, kind, size_multiplier, volume):
+        """Play a cached sound; volume is applied per channel so shared Sounds stay untouched"""
+        channel = self.get(kind, size_multiplier).play()
+        if channel is not None:
+            channel.set_volume(volume)
+        return channel
@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+
+class SpatialHash:
+    """Uniform grid for "entities within radius r of point p" queries
+
+    Entities are bucketed by the cell containing their center. Queries scan
+    only the cells that can hold a hit and compare squared distances, so no
+    square roots are taken.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.max_radius = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.max_radius = 0
+
+    def insert(self, entity, x, y, radius=0):
+        """Add an entity centered at (x, y) with its own collision radius"""
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        self.cells[cell].append((entity, x, y, radius))
+        self.max_radius = max(self.max_radius, radius)
+
+    def rebuild(self, entities):
+        """Re-bucket live entities (anything with x, y, size and alive)"""
+        self.clear()
+        for entity in entities:
+            if entity.alive:
+                self.insert(entity, entity.x, entity.y, entity.size)
+
+    def query(self, x, y, radius, inclusive=False):
+        """Entities whose circle touches the circle of `radius` around (x, y)"""
+        reach = radius + self.max_radius
+        min_cx = int((x - reach) // self.cell_size)
+        max_cx = int((x + reach) // self.cell_size)
+        min_cy = int((y - reach) // self.cell_size)
+        max_cy = int((y + reach) // self.cell_size)
+
+        hits = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for entity, ex, ey, entity_radius in bucket:
+                    dx = ex - x
+                    dy = ey - y
+                    limit = radius + entity_radius
+                    distance_sq = dx * dx + dy * dy
+                    if distance_sq < limit * limit or (inclusive and distance_sq == limit * limit):
+                        hits.append(entity)
+        return hits
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.cells.values())
@@ -0,0 +1,384 @@
+"""
+Split mode: simulation and audio analysis in a worker process, rendering in the main one.
+The worker publishes entity state through a multiprocessing.shared_memory double buffer;
+the main process copies the newest complete frame into its own entities and only draws.
+Run: python split_fireworks.py [--seed 1] [--record session.fwlog]
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import VoiceControlledFireworks, SIM_DT, MAX_FRAME_TIME
+from fireball_swarm import TRAIL_LENGTH
+from audio_capture import NullAudio
+from quality import QUALITY_TIERS, tier_index
+
+# Per-frame scalars, stored as float64
+SCALARS = ["sequence", "published_at", "sim_time", "tick_count", "score", "current_health", "max_health",
+           "game_over", "game_mode", "total_fireworks", "current_volume", "damage_flash_timer",
+           "last_damage_amount", "particle_top", "firework_count", "monster_count", "fireball_count",
+           "fireball_head"]
+GAME_MODES = ["normal", "monster_hunt"]
+MONSTER_FIELDS = ["x", "y", "prev_x", "prev_y", "size", "red", "green", "blue", "blink_timer", "alive"]
+FIREWORK_FIELDS = ["rocket_x", "rocket_y", "prev_rocket_x", "prev_rocket_y", "exploded"]
+
+
+class FrameBuffer:
+    """Two frame slots in one shared-memory block, written by one process and read by another
+
+    The writer always fills the slot the reader is not pointed at, then
+    flips `front` to it. Each slot has its own sequence counter that is odd
+    while the slot is being written (a seqlock), so a reader that raced a
+    write can tell and copy again instead of showing a torn frame. Entity
+    counts beyond the capacities are truncated.
+    """
+
+    def __init__(self, name=None, particles=20000, fireworks=512, monsters=256, fireballs=2048):
+        self.capacities = {"particles": particles, "fireworks": fireworks, "monsters": monsters,
+                           "fireballs": fireballs}
+        fields = [
+            ("scalars", np.float64, (len(SCALARS),)),
+            ("particle_x", np.float32, (particles,)),
+            ("particle_y", np.float32, (particles,)),
+            ("particle_prev_x", np.float32, (particles,)),
+            ("particle_prev_y", np.float32, (particles,)),
+            ("particle_life", np.float32, (particles,)),
+            ("particle_size", np.float32, (particles,)),
+            ("particle_color", np.uint8, (particles, 3)),
+            ("particle_alive", np.bool_, (particles,)),
+            ("fireworks", np.float64, (fireworks, len(FIREWORK_FIELDS))),
+            ("monsters", np.float64, (monsters, len(MONSTER_FIELDS))),
+            ("fireball_x", np.float64, (fireballs,)),
+            ("fireball_y", np.float64, (fireballs,)),
+            ("fireball_prev_x", np.float64, (fireballs,)),
+            ("fireball_prev_y", np.float64, (fireballs,)),
+            ("fireball_trail_count", np.int64, (fireballs,)),
+            ("fireball_trail_x", np.float64, (fireballs, TRAIL_LENGTH)),
+            ("fireball_trail_y", np.float64, (fireballs, TRAIL_LENGTH)),
+        ]
+        layout, slot_size = [], 0
+        for field, dtype, shape in fields:
+            slot_size = -(-slot_size // 8) * 8  # Keep every array 8-byte aligned
+            layout.append((field, dtype, shape, slot_size))
+            slot_size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        slot_size = -(-slot_size // 8) * 8
+        header_size = 8 * 3  # front slot index, then each slot's sequence counter
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_size + 2 * slot_size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.header = np.ndarray((3,), dtype=np.int64, buffer=self.shm.buf)
+        self.slots = [
+            {field: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=header_size + i * slot_size + offset)
+             for field, dtype, shape, offset in layout}
+            for i in range(2)
+        ]
+        if self.owner:
+            self.header[:] = 0
+        self.published = 0
+        self.last_read = -1
+
+    def publish(self, game):
+        """Write the game's renderable state into the back slot, then make it the front"""
+        index = 1 - int(self.header[0])
+        slot = self.slots[index]
+        self.header[1 + index] += 1  # Odd: being written
+        caps = self.capacities
+
+        pool = game.particle_pool
+        top = min(pool.top, caps["particles"])
+        slot["particle_x"][:top] = pool.x[:top]
+        slot["particle_y"][:top] = pool.y[:top]
+        slot["particle_prev_x"][:top] = pool.prev_x[:top]
+        slot["particle_prev_y"][:top] = pool.prev_y[:top]
+        slot["particle_life"][:top] = pool.life[:top]
+        slot["particle_size"][:top] = pool.size[:top]
+        slot["particle_color"][:top] = pool.color[:top]
+        slot["particle_alive"][:top] = pool.alive[:top]
+
+        fireworks = game.fireworks[:caps["fireworks"]]
+        if fireworks:
+            slot["fireworks"][:len(fireworks)] = [
+                (f.rocket_x, f.rocket_y, f.prev_rocket_x, f.prev_rocket_y, f.exploded) for f in fireworks]
+        monsters = game.monsters[:caps["monsters"]]
+        if monsters:
+            slot["monsters"][:len(monsters)] = [
+                (m.x, m.y, m.prev_x, m.prev_y, m.size, *m.color, m.blink_timer, m.alive) for m in monsters]
+
+        swarm = game.fireballs
+        count = min(len(swarm), caps["fireballs"])
+        slot["fireball_x"][:count] = swarm.x[:count]
+        slot["fireball_y"][:count] = swarm.y[:count]
+        slot["fireball_prev_x"][:count] = swarm.prev_x[:count]
+        slot["fireball_prev_y"][:count] = swarm.prev_y[:count]
+        slot["fireball_trail_count"][:count] = swarm.trail_count[:count]
+        slot["fireball_trail_x"][:count] = swarm.trail_x[:count]
+        slot["fireball_trail_y"][:count] = swarm.trail_y[:count]
+
+        self.published += 1
+        slot["scalars"][:] = [
+            self.published, time.perf_counter(), game.sim_time, game.tick_count, game.score,
+            game.current_health, game.max_health, game.game_over, GAME_MODES.index(game.game_mode),
+            game.total_fireworks, game.current_volume, game.damage_flash_timer, game.last_damage_amount,
+            top, len(fireworks), len(monsters), count, swarm.head]
+
+        self.header[1 + index] += 1  # Even: complete
+        self.header[0] = index
+
+    def read_into(self, game, attempts=4):
+        """Copy the newest complete frame into the game's entities
+
+        Returns the frame's scalars as a dict, or None if nothing new was
+        published (or every attempt raced the writer).
+        """
+        for _ in range(attempts):
+            index = int(self.header[0])
+            sequence = int(self.header[1 + index])
+            if sequence % 2:
+                continue
+            slot = self.slots[index]
+            scalars = dict(zip(SCALARS, slot["scalars"].tolist()))
+            if scalars["sequence"] == self.last_read:
+                return None
+            self.copy_slot(slot, scalars, game)
+            if int(self.header[1 + index]) == sequence:
+                self.last_read = scalars["sequence"]
+                return scalars
+        return None
+
+    def copy_slot(self, slot, scalars, game):
+        pool = game.particle_pool
+        top = int(scalars["particle_top"])
+        pool.x[:top] = slot["particle_x"][:top]
+        pool.y[:top] = slot["particle_y"][:top]
+        pool.prev_x[:top] = slot["particle_prev_x"][:top]
+        pool.prev_y[:top] = slot["particle_prev_y"][:top]
+        pool.life[:top] = slot["particle_life"][:top]
+        pool.size[:top] = slot["particle_size"][:top]
+        pool.color[:top] = slot["particle_color"][:top]
+        pool.alive[:top] = slot["particle_alive"][:top]
+        pool.top = top
+
+        rows = slot["fireworks"][:int(scalars["firework_count"])].tolist()
+        for firework, (x, y, prev_x, prev_y, exploded) in zip(mirror_entities(game.firework_pool, len(rows)), rows):
+            firework.rocket_x, firework.rocket_y = x, y
+            firework.prev_rocket_x, firework.prev_rocket_y = prev_x, prev_y
+            firework.exploded = bool(exploded)
+            firework.rocket_color = (255, 255, 255)
+
+        rows = slot["monsters"][:int(scalars["monster_count"])].tolist()
+        for monster, (x, y, prev_x, prev_y, size, red, green, blue, blink_timer, alive) in zip(
+                mirror_entities(game.monster_pool, len(rows)), rows):
+            monster.x, monster.y, monster.prev_x, monster.prev_y = x, y, prev_x, prev_y
+            monster.size = int(size)
+            monster.color = (int(red), int(green), int(blue))
+            monster.blink_timer = int(blink_timer)
+            monster.alive = bool(alive)
+
+        swarm = game.fireballs
+        count = int(scalars["fireball_count"])
+        if count > swarm.capacity:
+            swarm.allocate(count)
+        swarm.x[:count] = slot["fireball_x"][:count]
+        swarm.y[:count] = slot["fireball_y"][:count]
+        swarm.prev_x[:count] = slot["fireball_prev_x"][:count]
+        swarm.prev_y[:count] = slot["fireball_prev_y"][:count]
+        swarm.trail_count[:count] = slot["fireball_trail_count"][:count]
+        swarm.trail_x[:count] = slot["fireball_trail_x"][:count]
+        swarm.trail_y[:count] = slot["fireball_trail_y"][:count]
+        swarm.count = count
+        swarm.head = int(scalars["fireball_head"])
+
+        game.sim_time = scalars["sim_time"]
+        game.tick_count = int(scalars["tick_count"])
+        game.score = int(scalars["score"])
+        game.current_health = int(scalars["current_health"])
+        game.max_health = int(scalars["max_health"])
+        game.game_over = bool(scalars["game_over"])
+        game.game_mode = GAME_MODES[int(scalars["game_mode"])]
+        game.total_fireworks = int(scalars["total_fireworks"])
+        game.current_volume = scalars["current_volume"]
+        game.damage_flash_timer = int(scalars["damage_flash_timer"])
+        game.last_damage_amount = int(scalars["last_damage_amount"])
+
+    def close(self):
+        # Drop the array views first; the block can't be closed while they exist
+        self.header = None
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def mirror_entities(pool, count):
+    """Resize an EntityPool's live list to `count` bare objects for the renderer to fill in
+
+    Objects are created without __init__, so mirrors never touch the
+    simulation RNG or play sounds.
+    """
+    live = pool.live
+    while len(live) < count:
+        live.append(pool.free.pop() if pool.free else pool.cls.__new__(pool.cls))
+    while len(live) > count:
+        pool.free.append(live.pop())
+    return live
+
+
+def run_simulation(buffer_name, inputs, stop, seed, session_path=None, driver=None, null_audio=False):
+    """Worker process: audio capture, onset detection and fixed-step simulation in real time
+
+    Inputs (kind, value) from the main process are applied before the next
+    tick; driver(game), if given, is called before every tick (benchmarks).
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"  # The worker never shows a window (read at display init)
+    game = VoiceControlledFireworks(seed=seed, session_path=session_path,
+                                    audio_device=NullAudio() if null_audio else None)
+    buffer = FrameBuffer(buffer_name)
+    try:
+        buffer.publish(game)
+        accumulator = 0.0
+        last = time.perf_counter()
+        while not stop.is_set():
+            while not inputs.empty():
+                game.apply_input(*inputs.get())
+
+            now = time.perf_counter()
+            accumulator += min(now - last, MAX_FRAME_TIME)
+            last = now
+            ticked = False
+            while accumulator >= SIM_DT:
+                if driver is not None:
+                    driver(game)
+                game.step_simulation()
+                accumulator -= SIM_DT
+                ticked = True
+            if ticked:
+                buffer.publish(game)
+            time.sleep(max(0.0, SIM_DT - accumulator - (time.perf_counter() - now)))
+    finally:
+        print(f"🎤 {game.latency_report()}")
+        game.save_session()
+        game.stream.stop_stream()
+        game.stream.close()
+        game.audio.terminate()
+        buffer.close()
+
+
+class SplitFireworks(VoiceControlledFireworks):
+    """Main-process renderer for a simulation running in a worker process
+
+    Draws with the normal game code, after copying the newest published
+    frame into its own (never simulated) entities.
+    """
+
+    def __init__(self, seed=1, session_path=None, driver=None, null_audio=False, **kwargs):
+        self.frame_buffer = FrameBuffer()
+        context = mp.get_context("spawn")
+        self.inputs = context.Queue()
+        self.stop_event = context.Event()
+        self.worker = context.Process(
+            target=run_simulation,
+            args=(self.frame_buffer.name, self.inputs, self.stop_event, seed, session_path, driver, null_audio),
+            daemon=True)
+        self.worker.start()
+        # Same seed, so the renderer builds the same starfield
+        super().__init__(audio_device=NullAudio(), seed=seed, **kwargs)
+        self.last_frame = None
+
+    def apply_input(self, kind, value=0.0):
+        """Inputs belong to the simulation; forward them to the worker"""
+        self.inputs.put((kind, value))
+
+    def sync(self):
+        """Take the newest frame if there is one; returns the interpolation alpha for rendering"""
+        frame = self.frame_buffer.read_into(self)
+        if frame is not None:
+            self.last_frame = frame
+        if self.last_frame is None:
+            return 1.0
+        return min(1.0, (time.perf_counter() - self.last_frame["published_at"]) / SIM_DT)
+
+    def run(self):
+        """Render loop: events -> worker, newest frame -> screen"""
+        print("🎆 Voice Fireworks (split mode: simulation in a worker process) | ESC → Exit")
+        running = True
+        profiler = self.profiler
+        try:
+            while running and self.worker.is_alive():
+                profiler.start_frame()
+                frame_start = time.perf_counter()
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        elif profiler.handle_key(event.key):
+                            self.full_redraw = True
+                        else:
+                            self.apply_input("key", event.key)
+                    elif event.type == pygame.WINDOWEXPOSED:
+                        self.full_redraw = True
+
+                with profiler.section("sync"):
+                    alpha = self.sync()
+                with profiler.section("render"):
+                    self.render(alpha)
+                graph_rect = profiler.draw(self.screen)
+                if graph_rect is not None and self.dirty_rects is not None:
+                    self.dirty_rects.append(graph_rect)
+                with profiler.section("present"):
+                    self.present()
+                self.quality.record_frame((time.perf_counter() - frame_start) * 1000,
+                                          self.particle_pool.live_count())
+                self.clock.tick(60)
+        except KeyboardInterrupt:
+            print("\n🎆 Fireworks show ended!")
+        finally:
+            print(f"🎚️ {self.quality.report()}")
+            self.quality.close()
+            self.shutdown()
+
+    def shutdown(self):
+        self.stop_event.set()
+        self.worker.join(timeout=5)
+        self.frame_buffer.close()
+        self.audio.terminate()
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice fireworks with simulation in a worker process")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", default=None, help="save the session log here on exit")
+    parser.add_argument("--quality", default=None, choices=[tier.name for tier in QUALITY_TIERS],
+                        help="pin this render quality tier instead of adjusting automatically")
+    parser.add_argument("--quality-log", default=None, help="append quality tier changes here as JSON lines")
+    args = parser.parse_args()
+
+    try:
+        seed = args.seed if args.seed is not None else int(time.time())
+        game = SplitFireworks(seed=seed, session_path=args.record)
+        if args.quality:
+            game.quality.index = tier_index(args.quality)
+            game.quality.auto = False
+        game.quality.telemetry_path = args.quality_log
+        game.run()
+    except Exception as e:
+        print(f"❌ Failed to start fireworks: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pygame
+
+MAX_STAR_RECTS = 32  # Beyond this many changed stars, report one bounding rect
+
+
+class StarLayer:
+    """One layer of twinkling stars held in NumPy arrays
+
+    Each frame the brightness of every star is computed in one vectorized
+    step and written through pygame.surfarray in a single assignment, so
+    there is no per-star Python work. Static layers are written straight
+    into the frame; a layer with a drift speed is baked into its own
+    surface that scrolls horizontally and wraps around, for parallax.
+    """
+
+    def __init__(self, size, x, y, brightness, twinkle_speed, drift=0.0):
+        self.width, self.height = size
+        self.x = np.asarray(x, dtype=np.int64)
+        self.y = np.asarray(y, dtype=np.int64)
+        self.brightness = np.asarray(brightness, dtype=np.float64)
+        self.twinkle_speed = np.asarray(twinkle_speed, dtype=np.float64)
+        self.drift = drift  # Pixels per second
+        self.colors = np.full((len(self.x), 3), -1, dtype=np.int64)  # Last frame's colors, -1 = never drawn
+        self.surface = None
+        if drift:
+            # Only as tall as the stars reach; black is transparent since stars are never darker than 50
+            rows = min(self.height, int(self.y.max()) + 1) if len(self.y) else 1
+            self.surface = pygame.Surface((self.width, rows))
+            self.surface.set_colorkey((0, 0, 0))
+
+        # Each star covers the 2x2 pixels pygame.draw.circle(radius=1) would
+        pixel_x = np.stack([self.x - 1, self.x, self.x - 1, self.x], axis=1).ravel()
+        pixel_y = np.stack([self.y - 1, self.y - 1, self.y, self.y], axis=1).ravel()
+        rows = self.surface.get_height() if self.surface is not None else self.height
+        self.on_screen = (pixel_x >= 0) & (pixel_x < self.width) & (pixel_y >= 0) & (pixel_y < rows)
+        self.pixel_x = pixel_x[self.on_screen]
+        self.pixel_y = pixel_y[self.on_screen]
+
+    def twinkle(self, time_seconds):
+        """Compute this frame's colors; returns the indices of stars that changed"""
+        brightness = self.brightness + 50 * np.sin(time_seconds * self.twinkle_speed)
+        brightness = np.clip(brightness, 50, 255)
+        colors = np.stack([brightness, brightness, brightness * 0.9], axis=1).astype(np.int64)
+        changed = np.flatnonzero((colors != self.colors).any(axis=1))
+        self.colors = colors
+        return changed
+
+    def write(self, surface):
+        """Write every star in order, so where stars overlap the later one wins"""
+        if surface.get_bytesize() == 3:
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[self.pixel_x, self.pixel_y] = np.repeat(self.colors, 4, axis=0)[self.on_screen]
+            del pixels  # Unlock the surface
+            return
+
+        # Pack colors into the surface's pixel format and write whole pixels at once
+        r_shift, g_shift, b_shift, _ = surface.get_shifts()
+        r_loss, g_loss, b_loss, _ = surface.get_losses()
+        mapped = (((self.colors[:, 0] >> r_loss) << r_shift) | ((self.colors[:, 1] >> g_loss) << g_shift) |
+                  ((self.colors[:, 2] >> b_loss) << b_shift))
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[self.pixel_x, self.pixel_y] = np.repeat(mapped, 4)[self.on_screen]
+        del pixels
+
+    def draw(self, screen, time_seconds):
+        changed = self.twinkle(time_seconds)
+        if not self.drift:
+            self.write(screen)
+            return changed
+
+        if len(changed):
+            self.write(self.surface)
+        offset = int(time_seconds * self.drift) % self.width
+        screen.blit(self.surface, (offset, 0))
+        if offset:
+            screen.blit(self.surface, (offset - self.width, 0))
+        return changed
+
+
+class Starfield:
+    """Layered night-sky background: a baked sky plus twinkling star layers
+
+    The sky is either a flat color or a surface baked once (e.g. a
+    gradient). Layers are composited back to front on top of it, and the
+    cost per frame grows with the number of stars only through NumPy.
+    """
+
+    def __init__(self, size, sky_color, sky=None):
+        self.size = size
+        self.sky_color = sky_color
+        self.sky = sky
+        self.layers = []
+
+    def add_layer(self, x, y, brightness, twinkle_speed, drift=0.0):
+        layer = StarLayer(self.size, x, y, brightness, twinkle_speed, drift)
+        self.layers.append(layer)
+        return layer
+
+    def add_random_layer(self, count, rng, brightness=(50, 200), twinkle_speed=(0.02, 0.05), drift=0.0):
+        """Add `count` stars scattered over the upper half of the sky"""
+        width, height = self.size
+        return self.add_layer(
+            rng.integers(0, width + 1, count), rng.integers(0, height // 2 + 1, count),
+            rng.uniform(*brightness, count), rng.uniform(*twinkle_speed, count), drift)
+
+    def draw(self, screen, time_seconds):
+        """Composite the sky and all layers
+
+        Returns the rects of static stars whose color changed, or None if a
+        drifting layer moved (so the whole background changed).
+        """
+        if self.sky is not None:
+            screen.blit(self.sky, (0, 0))
+        else:
+            screen.fill(self.sky_color)
+
+        rects = []
+        moved = False
+        for layer in self.layers:
+            changed = layer.draw(screen, time_seconds)
+            if layer.drift:
+                moved = True
+            elif len(changed) > MAX_STAR_RECTS:
+                # Many small rects cost more than one covering rect
+                x, y = layer.x[changed], layer.y[changed]
+                rects.append(pygame.Rect(int(x.min()) - 1, int(y.min()) - 1,
+                                         int(x.max() - x.min()) + 2, int(y.max() - y.min()) + 2))
+            else:
+                rects.extend(pygame.Rect(int(x) - 1, int(y) - 1, 2, 2)
+                             for x, y in zip(layer.x[changed], layer.y[changed]))
+        return None if moved else rects
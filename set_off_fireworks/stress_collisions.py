@@ -0,0 +1,113 @@
+"""
+Collision stress mode: hundreds of monsters and fireballs against many
+exploded fireworks, comparing the all-pairs loops with the spatial hash
+(monsters) and the vectorized FireballSwarm tests (fireballs).
+Run: python stress_collisions.py
+"""
+import os
+import sys
+import time
+
+# Run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_fireworks import Monster, Firework, sim_random
+from fireball_swarm import FireballSwarm
+from spatial_hash import SpatialHash
+from sound_bank import SoundBank
+
+WIDTH, HEIGHT = 1200, 800
+PLAYER_X, PLAYER_Y = WIDTH // 2, HEIGHT - 50
+SCENARIOS = [(50, 100, 10), (200, 500, 20), (500, 1500, 30), (1000, 3000, 40)]  # monsters, fireballs, fireworks
+TICKS = 20
+
+
+def build_world(monster_count, fireball_count, firework_count, sound_bank):
+    sim_random.seed(1)
+    monsters = [Monster(sim_random.uniform(0, WIDTH), sim_random.uniform(0, HEIGHT)) for _ in range(monster_count)]
+    fireballs = FireballSwarm()
+    for _ in range(fireball_count):
+        fireballs.spawn(sim_random.uniform(0, WIDTH), sim_random.uniform(0, HEIGHT), PLAYER_X, PLAYER_Y)
+    fireworks = []
+    for _ in range(firework_count):
+        firework = Firework(PLAYER_X, PLAYER_Y, sim_random.uniform(0, WIDTH), sim_random.uniform(0, HEIGHT // 2),
+                            sim_random.uniform(0.3, 2.3), sound_bank=sound_bank)
+        firework.exploded = True
+        fireworks.append(firework)
+    return monsters, fireballs, fireworks
+
+
+def circles_touch(x, y, radius, other_x, other_y, other_radius):
+    dx = x - other_x
+    dy = y - other_y
+    reach = radius + other_radius
+    return dx * dx + dy * dy < reach * reach
+
+
+def brute_force(monsters, fireballs, fireworks):
+    """The previous all-pairs loops, one fireball at a time"""
+    fireball_positions = list(zip(fireballs.x[:len(fireballs)].tolist(), fireballs.y[:len(fireballs)].tolist()))
+    hits = 0
+    for firework in fireworks:
+        for monster in monsters:
+            if monster.check_collision(firework):
+                hits += 1
+        for x, y in fireball_positions:
+            if circles_touch(x, y, fireballs.size, firework.target_x, firework.target_y, firework.explosion_size):
+                hits += 1
+    for x, y in fireball_positions:
+        if circles_touch(x, y, fireballs.size, PLAYER_X, PLAYER_Y, 30):
+            hits += 1
+    return hits
+
+
+def hashed(monsters, fireballs, fireworks, monster_grid):
+    """Rebuild the monster grid and test the fireball arrays, answering the same queries"""
+    monster_grid.rebuild(monsters)
+    hits = 0
+    for firework in fireworks:
+        hits += len(monster_grid.query(firework.target_x, firework.target_y, firework.explosion_size))
+        hits += int(np.count_nonzero(fireballs.within(firework.target_x, firework.target_y, firework.explosion_size)))
+    hits += int(np.count_nonzero(fireballs.within(PLAYER_X, PLAYER_Y, 30)))
+    return hits
+
+
+def median_ms(func):
+    samples = []
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples)), result
+
+
+def main():
+    pygame.init()
+    pygame.mixer.init()
+    sound_bank = SoundBank(max_sounds=8)
+
+    print(f"👹 Collision stress test (median of {TICKS} ticks)")
+    print(f"{'monsters':>9} {'fireballs':>10} {'fireworks':>10} {'all-pairs ms':>13} {'hash/numpy ms':>13} {'speedup':>8}")
+    for monster_count, fireball_count, firework_count in SCENARIOS:
+        monsters, fireballs, fireworks = build_world(monster_count, fireball_count, firework_count, sound_bank)
+        monster_grid = SpatialHash()
+
+        brute_ms, brute_hits = median_ms(lambda: brute_force(monsters, fireballs, fireworks))
+        hash_ms, hash_hits = median_ms(lambda: hashed(monsters, fireballs, fireworks, monster_grid))
+        assert brute_hits == hash_hits, (brute_hits, hash_hits)
+
+        print(f"{monster_count:>9} {fireball_count:>10} {firework_count:>10} "
+              f"{brute_ms:>13.2f} {hash_ms:>13.2f} {brute_ms / hash_ms:>7.1f}x")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Test that StreamingFrameWriter reports an encoding error instead of hanging
+A decorate callback that raises makes every frame fail; append() must raise
+that error within a few frames rather than block on the buffer pool.
+Run: python test_frame_writer.py
+"""
+import os
+import sys
+import tempfile
+import threading
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from frame_writer import StreamingFrameWriter
+
+FRAMES = 100  # Far more than the writer's buffer pool
+
+
+def failing_decorate(frame):
+    raise RuntimeError("decorate failed")
+
+
+def append_until_error(writer, surface, result):
+    try:
+        for i in range(FRAMES):
+            writer.append(surface)
+        result["frames"] = FRAMES
+    except RuntimeError as e:
+        result["error"] = e
+        result["frames"] = i
+
+
+if __name__ == "__main__":
+    pygame.init()
+    surface = pygame.Surface((64, 48))
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = StreamingFrameWriter(os.path.join(tmp, "out.gif"), decorate=failing_decorate, queue_size=4)
+        result = {}
+        thread = threading.Thread(target=append_until_error, args=(writer, surface, result), daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+
+        if thread.is_alive():
+            print("❌ append() hung after the encoding error")
+            sys.exit(1)
+        if "error" not in result:
+            print(f"❌ append() accepted all {FRAMES} frames without reporting the error")
+            sys.exit(1)
+        writer.close()
+    pygame.quit()
+    print(f"✅ append() raised '{result['error']}' after {result['frames']} frames")
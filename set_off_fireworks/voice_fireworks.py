@@ -5,35 +5,80 @@ import threading
 import queue
 import math
 import random
+import os
+import sys
 import time
+import hashlib
+import itertools
 from collections import deque
 
+from particle_pool import ParticlePool
+from glow_sprites import GlowSpriteCache
+from sound_bank import SoundBank
+from audio_capture import AudioCapture
+from onset_detector import OnsetDetector
+from spatial_hash import SpatialHash
+from session_log import SessionLog
+from hud import TextCache, HudLayer
+from starfield import Starfield
+from entity_pool import EntityPool
+from fireball_swarm import FireballSwarm
+from quality import QualityManager, tier_index
+
+# Shared modules (frame_profiler.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from frame_profiler import FrameProfiler
+
+# Fixed simulation step: all movement and timers advance in SIM_DT ticks
+SIM_DT = 1 / 60
+MAX_FRAME_TIME = 0.25  # Clamp long stalls so the simulation doesn't spiral
+
+# All simulation randomness comes from here, so scripts driving the game can use
+# the random module freely without disturbing a seeded (replayable) run
+sim_random = random.Random()
+
+# Particle pool and sound bank used by fireworks created without explicit ones
+default_particle_pool = ParticlePool()
+default_sound_bank = SoundBank()
+_firework_ids = itertools.count()
+
 class Monster:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "size", "color", "speed", "direction", "health", "alive",
+                 "blink_timer", "spawn_time", "last_attack_time", "attack_cooldown")
+    
+    def __init__(self, x, y, spawn_time=0.0):
+        self.reset(x, y, spawn_time)
+    
+    def reset(self, x, y, spawn_time=0.0):
+        """(Re)initialize a new or pooled monster"""
         self.x = x
         self.y = y
-        self.size = random.randint(20, 40)
-        self.color = random.choice([
+        self.prev_x = x  # Position at the previous tick, for interpolated drawing
+        self.prev_y = y
+        self.size = sim_random.randint(20, 40)
+        self.color = sim_random.choice([
             (150, 0, 0),      # Dark red
             (0, 100, 0),      # Dark green  
             (100, 0, 100),    # Purple
             (100, 100, 0),    # Dark yellow
             (0, 0, 150)       # Dark blue
         ])
-        self.speed = random.uniform(0.5, 2.0)
-        self.direction = random.uniform(0, 2 * math.pi)
+        self.speed = sim_random.uniform(0.5, 2.0)
+        self.direction = sim_random.uniform(0, 2 * math.pi)
         self.health = 1
         self.alive = True
         self.blink_timer = 0
-        self.spawn_time = time.time()
-        self.last_attack_time = 0
-        self.attack_cooldown = random.uniform(2.0, 5.0)  # Random attack interval
+        self.spawn_time = spawn_time
+        self.last_attack_time = -math.inf  # First attack comes right after spawning
+        self.attack_cooldown = sim_random.uniform(2.0, 5.0)  # Random attack interval
         
     def update(self, screen_width, screen_height):
         """Update monster position and behavior"""
         if not self.alive:
             return
             
+        self.prev_x, self.prev_y = self.x, self.y
+        
         # Move monster
         self.x += math.cos(self.direction) * self.speed
         self.y += math.sin(self.direction) * self.speed
@@ -49,22 +94,25 @@ class Monster:
         self.y = max(self.size, min(screen_height - self.size, self.y))
         
         # Occasionally change direction for unpredictable movement
-        if random.random() < 0.02:
-            self.direction += random.uniform(-0.5, 0.5)
+        if sim_random.random() < 0.02:
+            self.direction += sim_random.uniform(-0.5, 0.5)
             
         self.blink_timer += 1
         
-    def draw(self, screen):
-        """Draw the monster with evil eyes"""
+    def draw(self, screen, alpha=1.0):
+        """Draw the monster with evil eyes, interpolated `alpha` of the way from the last tick"""
         if not self.alive:
             return
             
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        
         # Main body (pulsing effect)
         pulse = 1 + 0.1 * math.sin(self.blink_timer * 0.1)
         current_size = int(self.size * pulse)
         
         # Monster body
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), current_size)
+        pygame.draw.circle(screen, self.color, (int(x), int(y)), current_size)
         
         # Evil eyes
         eye_offset = current_size // 3
@@ -72,16 +120,16 @@ class Monster:
         
         # Left eye
         pygame.draw.circle(screen, (255, 0, 0), 
-                         (int(self.x - eye_offset), int(self.y - eye_offset)), eye_size)
+                         (int(x - eye_offset), int(y - eye_offset)), eye_size)
         # Right eye  
         pygame.draw.circle(screen, (255, 0, 0),
-                         (int(self.x + eye_offset), int(self.y - eye_offset)), eye_size)
+                         (int(x + eye_offset), int(y - eye_offset)), eye_size)
         
         # Mouth (evil grin)
         mouth_points = [
-            (int(self.x - eye_offset), int(self.y + eye_offset)),
-            (int(self.x), int(self.y + eye_offset + 5)),
-            (int(self.x + eye_offset), int(self.y + eye_offset))
+            (int(x - eye_offset), int(y + eye_offset)),
+            (int(x), int(y + eye_offset + 5)),
+            (int(x + eye_offset), int(y + eye_offset))
         ]
         pygame.draw.polygon(screen, (0, 0, 0), mouth_points)
         
@@ -90,11 +138,12 @@ class Monster:
         if not self.alive or not firework.exploded:
             return False
             
-        # Check distance to explosion center
-        distance = math.sqrt((self.x - firework.target_x)**2 + (self.y - firework.target_y)**2)
-        explosion_radius = firework.explosion_size
+        # Check squared distance to explosion center
+        dx = self.x - firework.target_x
+        dy = self.y - firework.target_y
+        reach = firework.explosion_size + self.size
         
-        return distance < explosion_radius + self.size
+        return dx * dx + dy * dy < reach * reach
         
     def take_damage(self):
         """Monster takes damage and dies"""
@@ -105,103 +154,43 @@ class Monster:
         return (self.alive and 
                 current_time - self.last_attack_time > self.attack_cooldown)
     
-    def attack_player(self, player_x, player_y, current_time):
-        """Create fireball aimed at player"""
+    def attack_player(self, player_x, player_y, current_time, fireballs):
+        """Launch a fireball into the FireballSwarm, aimed at the player"""
         if self.should_attack(current_time):
             self.last_attack_time = current_time
-            self.attack_cooldown = random.uniform(3.0, 6.0)  # Reset cooldown
-            return Fireball(self.x, self.y, player_x, player_y)
-        return None
+            self.attack_cooldown = sim_random.uniform(3.0, 6.0)  # Reset cooldown
+            fireballs.spawn(self.x, self.y, player_x, player_y)
+            return True
+        return False
 
-class Fireball:
-    def __init__(self, x, y, target_x, target_y):
-        self.x = x
-        self.y = y
-        self.target_x = target_x
-        self.target_y = target_y
-        self.speed = 3.0
-        self.size = 8
-        self.color = (255, 100, 0)  # Orange-red fireball
-        self.trail = []
-        self.alive = True
-        
-        # Calculate direction
-        dx = target_x - x
-        dy = target_y - y
-        distance = math.sqrt(dx*dx + dy*dy)
-        if distance > 0:
-            self.vel_x = (dx / distance) * self.speed
-            self.vel_y = (dy / distance) * self.speed
-        else:
-            self.vel_x = 0
-            self.vel_y = 0
-    
-    def update(self, screen_width, screen_height):
-        """Update fireball position"""
-        if not self.alive:
-            return
-            
-        # Add current position to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > 10:
-            self.trail.pop(0)
-            
-        # Move fireball
-        self.x += self.vel_x
-        self.y += self.vel_y
-        
-        # Check if fireball is off screen
-        if (self.x < -50 or self.x > screen_width + 50 or 
-            self.y < -50 or self.y > screen_height + 50):
-            self.alive = False
-    
-    def draw(self, screen):
-        """Draw fireball with trail effect"""
-        if not self.alive:
-            return
-            
-        # Draw trail
-        for i, (trail_x, trail_y) in enumerate(self.trail):
-            alpha = (i + 1) / len(self.trail)
-            trail_size = int(self.size * alpha * 0.7)
-            trail_color = (int(255 * alpha), int(100 * alpha), 0)
-            if trail_size > 0:
-                pygame.draw.circle(screen, trail_color, (int(trail_x), int(trail_y)), trail_size)
-        
-        # Draw main fireball
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
-        # Inner glow
-        pygame.draw.circle(screen, (255, 255, 100), (int(self.x), int(self.y)), self.size // 2)
+class Firework:
+    __slots__ = ("x", "y", "target_x", "target_y", "size_multiplier", "exploded", "particle_pool", "id",
+                 "sound_bank", "rocket_x", "rocket_y", "prev_rocket_x", "prev_rocket_y", "rocket_speed",
+                 "rocket_color", "explosion_size", "particle_count", "colors")
     
-    def check_collision_with_firework(self, firework):
-        """Check collision with firework explosion"""
-        if not self.alive or not firework.exploded:
-            return False
-            
-        distance = math.sqrt((self.x - firework.target_x)**2 + (self.y - firework.target_y)**2)
-        return distance < firework.explosion_size + self.size
+    def __init__(self, x, y, target_x, target_y, size_multiplier=1.0, particle_pool=None,
+                 sound_bank=None):
+        self.reset(x, y, target_x, target_y, size_multiplier, particle_pool, sound_bank)
     
-    def check_collision_with_player(self, player_x, player_y, player_radius=30):
-        """Check collision with player area (bottom center)"""
-        if not self.alive:
-            return False
-            
-        distance = math.sqrt((self.x - player_x)**2 + (self.y - player_y)**2)
-        return distance < player_radius + self.size
-
-class Firework:
-    def __init__(self, x, y, target_x, target_y, size_multiplier=1.0):
+    def reset(self, x, y, target_x, target_y, size_multiplier=1.0, particle_pool=None, sound_bank=None):
+        """(Re)initialize a new or pooled firework; it gets a fresh particle owner id"""
         self.x = x
         self.y = y
         self.target_x = target_x
         self.target_y = target_y
         self.size_multiplier = size_multiplier
         self.exploded = False
-        self.particles = []
+        
+        # Explosion particles live in a shared pool, tagged with this firework's id
+        self.particle_pool = particle_pool if particle_pool is not None else default_particle_pool
+        self.id = next(_firework_ids)
+        self.sound_bank = sound_bank if sound_bank is not None else default_sound_bank
         
         # Launch rocket properties
         self.rocket_x = x
         self.rocket_y = y
+        self.prev_rocket_x = x
+        self.prev_rocket_y = y
         self.rocket_speed = 8 + size_multiplier * 2
         self.rocket_color = (255, 255, 255)
         
@@ -217,13 +206,15 @@ class Firework:
             [(255, 200, 0), (255, 150, 0), (255, 100, 0)],        # Orange variations
             [(200, 0, 255), (150, 0, 255), (255, 0, 200)]         # Purple-Pink
         ]
-        self.colors = random.choice(color_sets)
+        self.colors = sim_random.choice(color_sets)
         
         # Play launch sound when firework is created
         self.play_launch_sound()
         
     def update(self):
         if not self.exploded:
+            self.prev_rocket_x, self.prev_rocket_y = self.rocket_x, self.rocket_y
+            
             # Move rocket towards target
             dx = self.target_x - self.rocket_x
             dy = self.target_y - self.rocket_y
@@ -237,244 +228,110 @@ class Firework:
                 # Move rocket
                 self.rocket_x += (dx / distance) * self.rocket_speed
                 self.rocket_y += (dy / distance) * self.rocket_speed
-        else:
-            # Update explosion particles
-            for particle in self.particles[:]:
-                particle['x'] += particle['vx']
-                particle['y'] += particle['vy']
-                particle['vy'] += 0.2  # Gravity
-                particle['life'] -= 1
-                particle['size'] *= 0.98  # Shrink over time
-                
-                if particle['life'] <= 0 or particle['size'] < 1:
-                    self.particles.remove(particle)
+        # Explosion particles are advanced by the shared pool
     
     def create_explosion(self):
         """Create explosion particles and intercept fireballs"""
         # Generate and play explosion sound
         self.play_explosion_sound()
         
-        for _ in range(self.particle_count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 12) * self.size_multiplier
-            
-            particle = {
-                'x': self.target_x,
-                'y': self.target_y,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed - random.uniform(2, 5),
-                'color': random.choice(self.colors),
-                'life': random.randint(30, 80),
-                'size': random.uniform(3, 8) * self.size_multiplier
-            }
-            self.particles.append(particle)
+        rng = self.particle_pool.rng
+        count = self.particle_count
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(2, 12, count) * self.size_multiplier
+        
+        self.particle_pool.spawn(
+            x=self.target_x,
+            y=self.target_y,
+            vx=np.cos(angle) * speed,
+            vy=np.sin(angle) * speed - rng.uniform(2, 5, count),
+            color=np.array(self.colors)[rng.integers(0, len(self.colors), count)],
+            life=rng.integers(30, 81, count),
+            size=rng.uniform(3, 8, count) * self.size_multiplier,
+            owner=self.id
+        )
+    
+    def add_flash(self, x, y, count=10):
+        """Add a bright white flash burst owned by this firework"""
+        rng = self.particle_pool.rng
+        self.particle_pool.spawn(
+            x=x,
+            y=y,
+            vx=rng.uniform(-3, 3, count),
+            vy=rng.uniform(-3, 3, count),
+            color=(255, 255, 255),  # White flash
+            life=15,
+            size=rng.uniform(2, 5, count),
+            owner=self.id
+        )
     
     def intercept_fireballs(self, fireballs):
-        """Check if this firework explosion can intercept any fireballs"""
+        """Destroy fireballs of a FireballSwarm within the explosion (touching counts); returns their positions"""
         if not self.exploded:
             return []
-            
-        intercepted_fireballs = []
-        for fireball in fireballs:
-            if not fireball.alive:
-                continue
-                
-            # Calculate distance from explosion center to fireball
-            distance = math.sqrt((fireball.x - self.target_x)**2 + (fireball.y - self.target_y)**2)
-            
-            # If fireball is within explosion radius, intercept it
-            if distance <= self.explosion_size + fireball.size:
-                intercepted_fireballs.append(fireball)
-                fireball.alive = False
-                
-        return intercepted_fireballs
+        return fireballs.intercept(self.target_x, self.target_y, self.explosion_size)
     
     def play_launch_sound(self):
-        """Generate and play launch sound when firework is fired"""
+        """Play a cached launch sound when firework is fired"""
         try:
-            # Generate launch/whoosh sound
-            sample_rate = 22050
-            duration = 0.8 + self.size_multiplier * 0.4  # Launch sound duration
-            
-            # Create time array
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            
-            # Generate launch sound components based on size
-            if self.size_multiplier < 0.5:
-                # Small firework launch
-                base_freq = 80 + random.randint(0, 40)
-                sweep_range = 60
-                noise_intensity = 0.2
-            elif self.size_multiplier < 1.0:
-                # Medium firework launch
-                base_freq = 60 + random.randint(0, 30)
-                sweep_range = 80
-                noise_intensity = 0.3
-            else:
-                # Large firework launch
-                base_freq = 40 + random.randint(0, 20)
-                sweep_range = 100
-                noise_intensity = 0.4
-            
-            # Create frequency sweep (whoosh effect)
-            frequency_sweep = base_freq + sweep_range * np.exp(-3 * t)
-            
-            # Generate whoosh sound with frequency sweep
-            whoosh_wave = np.sin(2 * np.pi * frequency_sweep * t)
-            
-            # Add pink noise for realistic launch texture
-            noise = np.random.normal(0, noise_intensity, len(t))
-            
-            # Combine whoosh and noise
-            launch_wave = 0.7 * whoosh_wave + 0.3 * noise
-            
-            # Apply launch envelope (quick attack, gradual decay)
-            attack_time = 0.1
-            attack_samples = int(sample_rate * attack_time)
-            
-            envelope = np.ones_like(t)
-            # Quick attack
-            envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-            # Gradual decay
-            envelope[attack_samples:] = np.exp(-2 * (t[attack_samples:] - attack_time))
-            
-            launch_wave *= envelope
-            
-            # Add subtle crackle for larger launches
-            if self.size_multiplier > 0.6:
-                crackle_freq = 400 + random.randint(0, 200)
-                crackle = 0.15 * np.sin(2 * np.pi * crackle_freq * t) * np.random.choice([0, 1], len(t), p=[0.8, 0.2])
-                launch_wave += crackle * envelope
-            
-            # Normalize and convert to pygame format
-            launch_wave = np.clip(launch_wave, -1, 1)
-            launch_wave = (launch_wave * 32767).astype(np.int16)
-            
-            # Create stereo sound
-            stereo_wave = np.column_stack((launch_wave, launch_wave))
-            
-            # Play the launch sound
-            launch_sound = pygame.sndarray.make_sound(stereo_wave)
             launch_volume = min(0.6, 0.2 + self.size_multiplier * 0.4)  # Volume based on size
-            launch_sound.set_volume(launch_volume)
-            launch_sound.play()
-            
+            self.sound_bank.play("launch", self.size_multiplier, launch_volume)
         except Exception as e:
-            # If sound generation fails, continue without sound
-            print(f"Launch sound generation error: {e}")
-            pass
+            # If sound playback fails, continue without sound
+            print(f"Launch sound error: {e}")
     
     def play_explosion_sound(self):
-        """Generate and play explosion sound based on firework size"""
+        """Play a cached explosion sound based on firework size"""
         try:
-            # Generate explosion sound based on size
-            sample_rate = 22050
-            duration = 0.5 + self.size_multiplier * 0.3  # Bigger fireworks = longer sound
-            
-            # Create time array
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            
-            # Generate explosion sound components
-            if self.size_multiplier < 0.5:
-                # Small firework - higher pitch, shorter
-                frequency = 150 + random.randint(0, 100)
-                noise_intensity = 0.3
-                fade_speed = 8
-            elif self.size_multiplier < 1.0:
-                # Medium firework
-                frequency = 100 + random.randint(0, 80)
-                noise_intensity = 0.5
-                fade_speed = 6
-            else:
-                # Large firework - lower pitch, longer, more intense
-                frequency = 60 + random.randint(0, 60)
-                noise_intensity = 0.7
-                fade_speed = 4
-            
-            # Create explosion sound with multiple components
-            # Base explosion (sine wave with rapid decay)
-            base_wave = np.sin(2 * np.pi * frequency * t)
-            
-            # Add harmonics for richness
-            harmonic1 = 0.5 * np.sin(2 * np.pi * frequency * 2 * t)
-            harmonic2 = 0.3 * np.sin(2 * np.pi * frequency * 3 * t)
-            
-            # Add noise for realistic explosion texture
-            noise = np.random.normal(0, noise_intensity, len(t))
-            
-            # Combine components
-            sound_wave = base_wave + harmonic1 + harmonic2 + noise
-            
-            # Apply exponential decay envelope
-            envelope = np.exp(-fade_speed * t)
-            sound_wave *= envelope
-            
-            # Add crackle effect for larger fireworks
-            if self.size_multiplier > 0.7:
-                crackle_frequency = 800 + random.randint(0, 400)
-                crackle = 0.2 * np.sin(2 * np.pi * crackle_frequency * t) * np.random.choice([0, 1], len(t), p=[0.7, 0.3])
-                crackle *= envelope * 2  # Faster decay for crackle
-                sound_wave += crackle
-            
-            # Normalize and convert to pygame format
-            sound_wave = np.clip(sound_wave, -1, 1)
-            sound_wave = (sound_wave * 32767).astype(np.int16)
-            
-            # Create stereo sound
-            stereo_wave = np.column_stack((sound_wave, sound_wave))
-            
-            # Play the sound
-            sound = pygame.sndarray.make_sound(stereo_wave)
-            sound.set_volume(min(0.8, 0.3 + self.size_multiplier * 0.5))  # Volume based on size
-            sound.play()
-            
+            explosion_volume = min(0.8, 0.3 + self.size_multiplier * 0.5)  # Volume based on size
+            self.sound_bank.play("explosion", self.size_multiplier, explosion_volume)
         except Exception as e:
-            # If sound generation fails, continue without sound
-            print(f"Sound generation error: {e}")
-            pass
+            # If sound playback fails, continue without sound
+            print(f"Sound error: {e}")
+    
+    def rocket_position(self, alpha=1.0):
+        """Rocket position interpolated `alpha` of the way from the last tick"""
+        return (self.prev_rocket_x + (self.rocket_x - self.prev_rocket_x) * alpha,
+                self.prev_rocket_y + (self.rocket_y - self.prev_rocket_y) * alpha)
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         if not self.exploded:
             # Draw rocket
+            rocket_x, rocket_y = self.rocket_position(alpha)
             pygame.draw.circle(screen, self.rocket_color, 
-                             (int(self.rocket_x), int(self.rocket_y)), 3)
-            # Draw rocket trail
-            trail_length = 20
-            for i in range(trail_length):
-                alpha = (trail_length - i) / trail_length * 100
-                trail_y = self.rocket_y + i * 2
-                if trail_y < screen.get_height():
-                    color = (255, 255, 255, int(alpha))
-                    s = pygame.Surface((6, 6), pygame.SRCALPHA)
-                    pygame.draw.circle(s, color, (3, 3), 3)
-                    screen.blit(s, (int(self.rocket_x) - 3, int(trail_y) - 3))
-        else:
-            # Draw explosion particles
-            for particle in self.particles:
-                if particle['size'] > 0:
-                    # Create glow effect
-                    glow_size = int(particle['size'] * 2)
-                    glow_alpha = max(10, particle['life'] * 2)
-                    
-                    # Outer glow
-                    glow_surf = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-                    glow_color = (*particle['color'], glow_alpha // 3)
-                    pygame.draw.circle(glow_surf, glow_color, 
-                                     (glow_size, glow_size), glow_size)
-                    screen.blit(glow_surf, (int(particle['x']) - glow_size, 
-                                          int(particle['y']) - glow_size))
-                    
-                    # Main particle
-                    pygame.draw.circle(screen, particle['color'],
-                                     (int(particle['x']), int(particle['y'])),
-                                     int(particle['size']))
+                             (int(rocket_x), int(rocket_y)), 3)
+        # Rocket trail and explosion particles are batched by the game
+    
+    def trail_blits(self, sprites, screen_height, alpha=1.0, trail_length=20, downscale=1):
+        """Build (sprite, position) pairs for the rocket trail
+        
+        downscale shrinks positions and sizes for a reduced-resolution target.
+        """
+        if self.exploded:
+            return []
+        
+        rocket_x, rocket_y = self.rocket_position(alpha)
+        radius = max(1, 3 // downscale)
+        blits = []
+        for i in range(trail_length):
+            trail_alpha = (trail_length - i) / trail_length * 100
+            trail_y = rocket_y + i * 2
+            if trail_y < screen_height:
+                sprite = sprites.get(radius, (255, 255, 255), trail_alpha)
+                blits.append((sprite, (int(rocket_x / downscale) - radius, int(trail_y / downscale) - radius)))
+        return blits
     
     def is_finished(self):
-        return self.exploded and len(self.particles) == 0
+        return self.exploded and not self.particle_pool.has_particles(self.id)
 
 
 class VoiceControlledFireworks:
-    def __init__(self, width=1200, height=800):
+    def __init__(self, width=1200, height=800, audio_device=None, seed=None, session_path=None,
+                 pool_entities=True):
+        # Seed all game randomness so a run can be reproduced exactly
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        sim_random.seed(self.seed)
+        
         # Initialize pygame and display
         pygame.init()
         
@@ -482,6 +339,14 @@ class VoiceControlledFireworks:
         pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
         pygame.mixer.init()
         
+        # Pre-generate firework sounds (cached on disk for later launches)
+        self.sound_bank = SoundBank(
+            cache_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sound_cache"))
+        try:
+            self.sound_bank.preload()
+        except Exception as e:
+            print(f"Sound bank preload error: {e}")
+        
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Voice-Controlled Fireworks 🎆")
         self.clock = pygame.time.Clock()
@@ -493,39 +358,74 @@ class VoiceControlledFireworks:
         self.chunk_size = 1024
         self.audio_format = pyaudio.paFloat32
         
-        # Initialize audio
-        self.audio = pyaudio.PyAudio()
-        self.stream = self.audio.open(
-            format=self.audio_format,
-            channels=1,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.chunk_size
-        )
+        # Initialize audio (audio_device can stand in for PyAudio, e.g. a WavFileAudio)
+        self.audio = audio_device if audio_device is not None else pyaudio.PyAudio()
         
         # Voice analysis (Ultra sensitive settings)
         self.volume_history = deque(maxlen=20)  # Shorter history for faster response
         self.volume_threshold = 0.002  # Even lower threshold for maximum sensitivity
         self.max_volume = 0.2  # Lower max volume for easier triggering of large fireworks
         
-        # Fireworks
-        self.fireworks = []
-        self.last_firework_time = 0
+        # Frame profiler (F3 graph, F4 Chrome trace); costs nothing while off
+        self.profiler = FrameProfiler()
+        
+        # Launches come from onsets (claps, syllable attacks) detected on the capture thread
+        self.onset_detector = OnsetDetector(self.sample_rate, max_size=self.max_volume)
+        self.capture = AudioCapture(self.audio, self.sample_rate, self.chunk_size,
+                                    onset_detector=self.onset_detector, profiler=self.profiler)
+        self.stream = self.capture.stream
+        self.last_audio_chunk = 0
+        
+        # Simulation clock (advances SIM_DT per tick, independent of wall time)
+        self.sim_time = 0.0
+        self.tick_count = 0
+        
+        # Every tick's volume and every input is logged so the session can be replayed
+        self.session_log = SessionLog(self.seed, width, height)
+        self.session_path = session_path
+        
+        # Fireworks (Firework objects are recycled through a pool)
+        self.firework_pool = EntityPool(Firework, reuse=pool_entities)
+        self.particle_pool = ParticlePool(seed=self.seed)
+        self.glow_sprites = GlowSpriteCache()
+        
+        # Render quality tier, lowered automatically while frames run over budget
+        self.quality = QualityManager()
+        self.effects = None  # Reduced-resolution effects surface, made on first use
+        self.effects_scaled = None
+        self.last_firework_time = -math.inf
         self.firework_cooldown = 0.15  # Faster cooldown for more responsive firing
         
         # Background and effects
         self.background_color = [10, 10, 30]  # Dark blue night sky
         self.stars = self.create_stars()
+        self.starfield = Starfield((width, height), self.background_color)
+        self.starfield.add_layer([star['x'] for star in self.stars], [star['y'] for star in self.stars],
+                                 [star['brightness'] for star in self.stars],
+                                 [star['twinkle_speed'] for star in self.stars])
+        
+        # Retained UI: cached text, one reusable full-screen overlay, changed-area tracking
+        self.text_cache = TextCache()
+        self.hud = HudLayer()
+        self.overlay = pygame.Surface((width, height))
+        self.overlay_color = None
+        self.dirty_rects = None  # None = whole screen changed
+        self.last_frame_static = False
+        self.last_frame_state = None
+        self.full_redraw = True
         
         # Game modes and monster system
         self.game_mode = "monster_hunt"  # "normal" or "monster_hunt"
-        self.monsters = []
-        self.fireballs = []  # Monster fireballs attacking player
+        self.monster_pool = EntityPool(Monster, reuse=pool_entities)
+        self.fireballs = FireballSwarm()  # Monster fireballs attacking player
         self.score = 0
-        self.last_monster_spawn = 0
+        self.last_monster_spawn = -math.inf
         self.monster_spawn_interval = 3.0  # Spawn monster every 3 seconds
         self.max_monsters = 8  # Maximum monsters on screen
         
+        # Spatial hash of monsters rebuilt each tick for collision queries
+        self.monster_grid = SpatialHash()
+        
         # Player health system
         self.max_health = 30
         self.current_health = self.max_health
@@ -540,31 +440,42 @@ class VoiceControlledFireworks:
         # Statistics
         self.total_fireworks = 0
         self.current_volume = 0
+        self.current_volume_time = 0  # Capture time of the chunk behind current_volume
+        self.launch_latencies = deque(maxlen=500)  # Audio chunk -> firework launch (seconds)
         
+    @property
+    def fireworks(self):
+        return self.firework_pool.live
+    
+    @property
+    def monsters(self):
+        return self.monster_pool.live
+    
     def create_stars(self):
         """Create background stars"""
         stars = []
         for _ in range(100):
             star = {
-                'x': random.randint(0, self.width),
-                'y': random.randint(0, self.height // 2),
-                'brightness': random.uniform(50, 200),
-                'twinkle_speed': random.uniform(0.02, 0.05)
+                'x': sim_random.randint(0, self.width),
+                'y': sim_random.randint(0, self.height // 2),
+                'brightness': sim_random.uniform(50, 200),
+                'twinkle_speed': sim_random.uniform(0.02, 0.05)
             }
             stars.append(star)
         return stars
     
     def analyze_audio(self):
-        """Analyze audio input for volume with enhanced sensitivity"""
+        """Analyze audio input for volume with enhanced sensitivity (never blocks)"""
         try:
-            audio_data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-            audio_array = np.frombuffer(audio_data, dtype=np.float32)
+            # Latest levels published by the capture thread
+            rms, peak, chunk_time, chunk_index = self.capture.latest
+            if chunk_index == self.last_audio_chunk:
+                return self.current_volume  # No new audio since last frame
+            self.last_audio_chunk = chunk_index
+            self.current_volume_time = chunk_time
             
             # Apply audio amplification for better sensitivity
-            audio_array = audio_array * 2.0  # Amplify signal by 2x
-            
-            # Calculate volume (RMS) with enhanced processing
-            volume = np.sqrt(np.mean(audio_array**2))
+            volume = rms * 2.0  # Amplify signal by 2x
             
             # Apply additional sensitivity boost
             volume = volume * 1.5  # Additional 1.5x boost
@@ -586,47 +497,55 @@ class VoiceControlledFireworks:
             return 0
     
     def should_launch_firework(self, volume):
-        """Determine if we should launch a firework based on volume with ultra sensitivity"""
-        current_time = time.time()
-        
-        # Check cooldown
-        if current_time - self.last_firework_time < self.firework_cooldown:
+        """Launch from a scripted volume (headless runs): over the threshold and off cooldown"""
+        if self.sim_time - self.last_firework_time < self.firework_cooldown:
             return False
-        
-        # Check volume threshold (ultra sensitive)
-        if volume < self.volume_threshold:
-            return False
-        
-        # Enhanced probability calculation for better responsiveness
-        # Lower threshold needed, higher chance of firing
-        base_probability = 0.8  # High base probability
-        volume_boost = (volume / self.volume_threshold) * 0.2  # Additional boost based on volume
-        probability = min(1.0, base_probability + volume_boost)
-        
-        return random.random() < probability
+        return volume >= self.volume_threshold
+    
+    def update_voice_input(self):
+        """Read the latest voice level and launch a firework for each detected onset
+        
+        Launches are logged as "firework" inputs, so replays reproduce them
+        exactly without running detection again.
+        """
+        volume = self.analyze_audio()
+        for event in self.capture.pop_onsets():
+            if self.sim_time - self.last_firework_time < self.firework_cooldown:
+                continue
+            self.apply_input("firework", event.size)
+            self.launch_latencies.append(time.perf_counter() - event.timestamp)
+        return volume
+    
+    def latency_report(self):
+        """Summarize onset-to-launch latency in milliseconds (chunk buffering included)"""
+        if not self.launch_latencies:
+            return "No voice launches measured"
+        latencies = np.array(self.launch_latencies) * 1000
+        return (f"Voice launch latency: median {np.median(latencies):.1f} ms, "
+                f"p95 {np.percentile(latencies, 95):.1f} ms over {len(latencies)} launches")
     
     def create_firework(self, volume):
         """Create a new firework based on volume"""
         # Launch position (bottom of screen)
-        launch_x = random.randint(100, self.width - 100)
+        launch_x = sim_random.randint(100, self.width - 100)
         launch_y = self.height - 50
         
         # Target position (upper area of screen)
-        target_x = random.randint(100, self.width - 100)
-        target_y = random.randint(100, self.height // 2)
+        target_x = sim_random.randint(100, self.width - 100)
+        target_y = sim_random.randint(100, self.height // 2)
         
         # Size based on volume (logarithmic scaling for better control)
         volume_normalized = volume / self.max_volume
         size_multiplier = 0.3 + (volume_normalized ** 0.7) * 2.0
         
-        firework = Firework(launch_x, launch_y, target_x, target_y, size_multiplier)
-        self.fireworks.append(firework)
+        self.firework_pool.acquire(launch_x, launch_y, target_x, target_y, size_multiplier,
+                                   self.particle_pool, self.sound_bank)
         self.total_fireworks += 1
-        self.last_firework_time = time.time()
+        self.last_firework_time = self.sim_time
     
     def spawn_monster(self):
         """Spawn a new monster at random edge of screen"""
-        current_time = time.time()
+        current_time = self.sim_time
         
         # Check if we should spawn a monster
         if (current_time - self.last_monster_spawn < self.monster_spawn_interval or 
@@ -634,50 +553,44 @@ class VoiceControlledFireworks:
             return
             
         # Spawn at random edge
-        edge = random.choice(['top', 'bottom', 'left', 'right'])
+        edge = sim_random.choice(['top', 'bottom', 'left', 'right'])
         if edge == 'top':
-            x, y = random.randint(50, self.width - 50), 50
+            x, y = sim_random.randint(50, self.width - 50), 50
         elif edge == 'bottom':
-            x, y = random.randint(50, self.width - 50), self.height - 50
+            x, y = sim_random.randint(50, self.width - 50), self.height - 50
         elif edge == 'left':
-            x, y = 50, random.randint(50, self.height - 50)
+            x, y = 50, sim_random.randint(50, self.height - 50)
         else:  # right
-            x, y = self.width - 50, random.randint(50, self.height - 50)
+            x, y = self.width - 50, sim_random.randint(50, self.height - 50)
             
-        monster = Monster(x, y)
-        self.monsters.append(monster)
+        self.monster_pool.acquire(x, y, current_time)
         self.last_monster_spawn = current_time
     
     def update_monsters(self):
         """Update all monsters and handle their attacks"""
-        current_time = time.time()
+        current_time = self.sim_time
         
         # Update monster positions and handle attacks
-        for monster in self.monsters[:]:
+        monsters = self.monster_pool.live
+        index = 0
+        while index < len(monsters):
+            monster = monsters[index]
             if monster.alive:
                 monster.update(self.width, self.height)
                 
                 # Monster attacks player
-                fireball = monster.attack_player(self.player_x, self.player_y, current_time)
-                if fireball:
-                    self.fireballs.append(fireball)
-            else:
-                # Remove dead monsters after a short delay
-                if current_time - monster.spawn_time > 1.0:
-                    self.monsters.remove(monster)
+                monster.attack_player(self.player_x, self.player_y, current_time, self.fireballs)
+            elif current_time - monster.spawn_time > 1.0:
+                # Remove dead monsters after a short delay; the last monster takes this slot
+                self.monster_pool.release_at(index)
+                continue
+            index += 1
     
-    def update_fireballs(self):
-        """Update monster fireballs and check collisions"""
-        for fireball in self.fireballs[:]:
-            if fireball.alive:
-                fireball.update(self.width, self.height)
-                
-                # Check collision with player
-                if fireball.check_collision_with_player(self.player_x, self.player_y):
-                    fireball.alive = False
-                    self.take_damage(1)  # 1 damage per hit
-            else:
-                self.fireballs.remove(fireball)
+    def update_fireballs(self, player_radius=30):
+        """Move monster fireballs, cull off-screen ones and check hits on the player in one pass"""
+        hits = self.fireballs.update(self.width, self.height, self.player_x, self.player_y, player_radius)
+        for _ in range(hits):
+            self.take_damage(1)  # 1 damage per hit
     
     def check_firework_interceptions(self):
         """Check if any exploding fireworks can intercept fireballs"""
@@ -687,19 +600,9 @@ class VoiceControlledFireworks:
                 intercepted = firework.intercept_fireballs(self.fireballs)
                 if intercepted:
                     # Add special visual feedback for successful interception
-                    for intercepted_fireball in intercepted:
+                    for fireball_x, fireball_y in intercepted:
                         # Create bright flash particles at interception point
-                        for _ in range(10):
-                            flash_particle = {
-                                'x': intercepted_fireball.x,
-                                'y': intercepted_fireball.y,
-                                'vx': random.uniform(-3, 3),
-                                'vy': random.uniform(-3, 3),
-                                'color': (255, 255, 255),  # White flash
-                                'life': 15,
-                                'size': random.uniform(2, 5)
-                            }
-                            firework.particles.append(flash_particle)
+                        firework.add_flash(fireball_x, fireball_y)
                     
                     # Optional: Add score bonus for defensive play
                     if len(intercepted) > 0:
@@ -711,7 +614,7 @@ class VoiceControlledFireworks:
         self.current_health = max(0, self.current_health - damage)
         
         # Add visual damage indicator
-        self.damage_flash_timer = 30  # Flash for 30 frames (0.5 seconds at 60 FPS)
+        self.damage_flash_timer = 30  # Flash for 30 ticks (0.5 seconds)
         self.last_damage_amount = damage
         
         if self.current_health <= 0:
@@ -720,25 +623,262 @@ class VoiceControlledFireworks:
         # Print damage info to console for verification
         print(f"💥 DAMAGE: {damage} | {old_health} -> {self.current_health}")
     
+    def step_simulation(self, voice_input=True, volume=None):
+        """Advance the whole game by one fixed SIM_DT tick
+        
+        volume overrides the microphone (for headless runs); voice_input=False
+        skips voice-triggered launches entirely.
+        """
+        # Skip game updates if game is over
+        tick_volume = math.nan  # Logged as "no scripted volume this tick"
+        if not self.game_over:
+            if volume is not None:
+                self.current_volume = volume
+                if self.should_launch_firework(volume):
+                    self.create_firework(volume)
+                tick_volume = volume
+            elif voice_input:
+                # Launch fireworks from voice onsets (logged as inputs, not volumes)
+                self.update_voice_input()
+        self.session_log.record_tick(tick_volume)
+        
+        # Update fireworks
+        self.update_fireworks()
+        
+        # Monster hunt mode specific updates
+        if self.game_mode == "monster_hunt" and not self.game_over:
+            self.spawn_monster()
+            self.update_monsters()
+            self.update_fireballs()
+            self.check_monster_collisions()
+            self.check_firework_interceptions()  # Check firework-fireball interceptions
+        
+        if self.damage_flash_timer > 0:
+            self.damage_flash_timer -= 1
+        
+        self.sim_time += SIM_DT
+        self.tick_count += 1
+    
+    def apply_input(self, kind, value=0.0):
+        """Apply (and log) a discrete input before the next tick
+        
+        kind is one of "key", "firework" (volume), "damage" (amount),
+        "mode" (game mode name), "reset" or "phase" (subclass label only).
+        """
+        if kind == "mode" and value == self.game_mode:
+            return  # Already in this mode; nothing to log
+        self.session_log.record_event(kind, value)
+        if kind == "key":
+            self.handle_key(value)
+        elif kind == "firework":
+            self.create_firework(value)
+        elif kind == "damage":
+            self.take_damage(int(value))
+        elif kind == "mode":
+            self.game_mode = value
+        elif kind == "reset":
+            self.reset_game()
+    
+    def handle_key(self, key):
+        """Game keys (ESC is handled by the loop that owns the window)"""
+        if key == pygame.K_SPACE:
+            # Manual firework for testing
+            self.create_firework(self.max_volume * 0.5)
+        elif key == pygame.K_m:
+            # Toggle game mode
+            if self.game_mode == "normal":
+                self.game_mode = "monster_hunt"
+                self.reset_game()
+                print("🎆 Switched to New Year Monster Hunt Mode!")
+            else:
+                self.game_mode = "normal"
+                self.monster_pool.clear()  # Clear all monsters
+                self.fireballs.clear()  # Clear all fireballs
+                print("🎆 Switched to Normal Fireworks Mode!")
+        elif key == pygame.K_r:
+            # Restart game
+            if self.game_over:
+                self.reset_game()
+    
+    def replay(self, log, on_frame=None, frame_step=1):
+        """Re-run a recorded session exactly, as fast as possible
+        
+        The game must be freshly created with log.seed. Nothing is drawn
+        unless on_frame is given; then every frame_step-th tick is rendered
+        and on_frame() is called, e.g. to capture a GIF frame.
+        """
+        events = log.events_by_tick()
+        for tick, volume in enumerate(log.volumes):
+            for kind, value in events.get(tick, []):
+                self.apply_input(kind, value)
+            if math.isnan(volume):
+                self.step_simulation(voice_input=False)
+            else:
+                self.step_simulation(volume=volume)
+            if on_frame is not None and tick % frame_step == 0:
+                self.render()
+                on_frame()
+        for kind, value in events.get(log.tick_count, []):
+            self.apply_input(kind, value)
+        return self.state_digest()
+    
+    def state_digest(self):
+        """SHA-1 over the full simulation state, for checking that a replay matches"""
+        digest = hashlib.sha1()
+        digest.update(repr((self.tick_count, self.score, self.current_health, self.game_over,
+                            self.game_mode, self.total_fireworks)).encode())
+        for monster in self.monsters:
+            digest.update(repr((monster.x, monster.y, monster.direction, monster.alive)).encode())
+        fireball_count = len(self.fireballs)
+        digest.update(self.fireballs.x[:fireball_count].tobytes())
+        digest.update(self.fireballs.y[:fireball_count].tobytes())
+        for firework in self.fireworks:
+            digest.update(repr((firework.rocket_x, firework.rocket_y, firework.exploded)).encode())
+        pool = self.particle_pool
+        live = pool.alive[:pool.top]
+        for array in (pool.x, pool.y, pool.vx, pool.vy, pool.life, pool.size):
+            digest.update(array[:pool.top][live].tobytes())
+        return digest.digest()
+    
+    def save_session(self, path=None):
+        """Write the session log (with a final state digest) for later replay"""
+        path = path or self.session_path
+        if path:
+            self.session_log.save(path, self.state_digest())
+            print(f"💾 Session log saved: {path} ({self.session_log.tick_count} ticks)")
+    
+    def run_headless(self, ticks, volumes=None):
+        """Run `ticks` simulation steps as fast as possible, without drawing
+        
+        volumes is an optional per-tick sequence used instead of the microphone.
+        """
+        for tick in range(ticks):
+            volume = volumes[tick] if volumes is not None else None
+            self.step_simulation(voice_input=False, volume=volume)
+    
+    def render(self, alpha=1.0):
+        """Draw the current state, interpolated `alpha` of the way from the last tick
+        
+        Also works out what present() has to send to the display: the whole
+        screen, or only the HUD widgets and stars that changed when nothing
+        else moved this frame or the last.
+        """
+        frame_state = (self.game_mode, self.game_over)
+        static = (not self.fireworks and not self.monsters and not self.fireballs
+                  and self.particle_pool.top == 0 and self.damage_flash_timer == 0)
+        partial = (static and self.last_frame_static and not self.full_redraw
+                   and frame_state == self.last_frame_state)
+        self.last_frame_static = static
+        self.last_frame_state = frame_state
+        self.full_redraw = False
+        
+        star_rects = self.update_background()
+        if star_rects is None:
+            partial = False
+        else:
+            for rect in star_rects:
+                self.hud.mark(rect)
+        
+        # Draw monsters and fireballs (in monster hunt mode)
+        if self.game_mode == "monster_hunt":
+            self.draw_monsters(alpha)
+            self.draw_fireballs(alpha)
+        
+        # Draw fireworks
+        self.draw_fireworks(alpha)
+        
+        # Draw UI
+        self.draw_volume_indicator()
+        self.draw_instructions()
+        self.draw_statistics()
+        
+        # Draw health bar (in monster hunt mode)
+        if self.game_mode == "monster_hunt":
+            self.draw_health_bar()
+        
+        # Draw game over screen if needed
+        if self.game_over:
+            self.draw_game_over()
+        
+        dirty = self.hud.take_dirty()
+        self.dirty_rects = dirty if partial else None
+    
+    def present(self):
+        """Show the rendered frame, updating only the changed rects when possible"""
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+    
+    def draw_text(self, name, text, size, color, position):
+        """Blit cached text as a HUD widget; returns its rect"""
+        rect = self.screen.blit(self.text_cache.render(text, size, color), position)
+        self.hud.place(name, (text, size, color), rect)
+        return rect
+    
+    def blit_overlay(self, color, alpha):
+        """Tint the whole screen using the one preallocated overlay surface"""
+        if color != self.overlay_color:
+            self.overlay.fill(color)
+            self.overlay_color = color
+        self.overlay.set_alpha(alpha)
+        self.screen.blit(self.overlay, (0, 0))
+    
+    def update_fireworks(self):
+        """Advance rockets and the shared particle pool, dropping finished fireworks"""
+        for firework in self.fireworks:
+            firework.update()
+        self.particle_pool.update()
+        self.firework_pool.release_where(Firework.is_finished)
+    
+    def draw_fireworks(self, alpha=1.0):
+        """Draw rockets, then every trail segment and particle glow in one batched blit
+        
+        How the effects are drawn follows the current quality tier. At a
+        reduced resolution they go onto a small black surface that is scaled
+        up and added onto the screen, so the sky and monsters stay sharp.
+        """
+        tier = self.quality.tier
+        downscale = tier.downscale
+        blits = []
+        for firework in self.fireworks:
+            firework.draw(self.screen, alpha)
+            blits.extend(firework.trail_blits(self.glow_sprites, self.height, alpha,
+                                              tier.trail_length, downscale))
+        blits.extend(self.particle_pool.blit_sequence(self.glow_sprites, alpha, tier.glow,
+                                                      tier.max_particles, downscale))
+        if downscale == 1:
+            self.screen.blits(blits, doreturn=False)
+            return
+        
+        size = (self.width // downscale, self.height // downscale)
+        if self.effects is None or self.effects.get_size() != size:
+            self.effects = pygame.Surface(size)
+            self.effects_scaled = pygame.Surface((self.width, self.height))
+        self.effects.fill((0, 0, 0))
+        self.effects.blits(blits, doreturn=False)
+        pygame.transform.scale(self.effects, (self.width, self.height), self.effects_scaled)
+        self.screen.blit(self.effects_scaled, (0, 0), special_flags=pygame.BLEND_ADD)
+    
     def check_monster_collisions(self):
         """Check if any fireworks hit monsters"""
+        self.monster_grid.rebuild(self.monsters)
         for firework in self.fireworks:
             if firework.exploded:
-                for monster in self.monsters:
-                    if monster.alive and monster.check_collision(firework):
+                for monster in self.monster_grid.query(firework.target_x, firework.target_y, firework.explosion_size):
+                    if monster.alive:
                         monster.take_damage()
                         self.score += 1
                         # Visual feedback - could add particle effect here
     
-    def draw_monsters(self):
+    def draw_monsters(self, alpha=1.0):
         """Draw all monsters"""
         for monster in self.monsters:
-            monster.draw(self.screen)
+            monster.draw(self.screen, alpha)
     
-    def draw_fireballs(self):
+    def draw_fireballs(self, alpha=1.0):
         """Draw all monster fireballs"""
-        for fireball in self.fireballs:
-            fireball.draw(self.screen)
+        self.fireballs.draw(self.screen, alpha, self.quality.tier.fireball_trail)
     
     def draw_health_bar(self):
         """Draw player health bar at bottom of screen with damage effects"""
@@ -750,14 +890,10 @@ class VoiceControlledFireworks:
         # Apply screen flash effect when taking damage
         flash_alpha = 0
         if self.damage_flash_timer > 0:
-            flash_alpha = int((self.damage_flash_timer / 30) * 100)  # Fade out over 30 frames
-            self.damage_flash_timer -= 1
+            flash_alpha = int((self.damage_flash_timer / 30) * 100)  # Fade out over 30 ticks
             
             # Red screen flash
-            flash_surface = pygame.Surface((self.width, self.height))
-            flash_surface.set_alpha(flash_alpha)
-            flash_surface.fill((255, 0, 0))
-            self.screen.blit(flash_surface, (0, 0))
+            self.blit_overlay((255, 0, 0), flash_alpha)
         
         # Background (empty health)
         pygame.draw.rect(self.screen, (100, 0, 0), 
@@ -789,9 +925,9 @@ class VoiceControlledFireworks:
         border_width = 4 if self.damage_flash_timer > 0 else 2
         pygame.draw.rect(self.screen, (255, 255, 255),
                         (bar_x, bar_y, bar_width, bar_height), border_width)
+        self.hud.place("health_bar", (current_width, color, border_width), (bar_x, bar_y, bar_width, bar_height))
         
         # Health text with damage indicator
-        font = pygame.font.Font(None, 24)
         health_text = f"Health: {self.current_health}/{self.max_health}"
         
         # Show damage amount when flashing
@@ -799,9 +935,9 @@ class VoiceControlledFireworks:
             health_text += f" (-{self.last_damage_amount})"
             
         text_color = (255, 255, 255) if self.damage_flash_timer <= 15 else (255, 255, 0)
-        text_surface = font.render(health_text, True, text_color)
-        text_x = bar_x + (bar_width - text_surface.get_width()) // 2
-        self.screen.blit(text_surface, (text_x, bar_y - 25))
+        text_width = self.text_cache.render(health_text, 24, text_color).get_width()
+        text_x = bar_x + (bar_width - text_width) // 2
+        self.draw_text("health_text", health_text, 24, text_color, (text_x, bar_y - 25))
     
     def draw_game_over(self):
         """Draw game over screen"""
@@ -809,55 +945,45 @@ class VoiceControlledFireworks:
             return
             
         # Semi-transparent overlay
-        overlay = pygame.Surface((self.width, self.height))
-        overlay.set_alpha(128)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.blit_overlay((0, 0, 0), 128)
         
         # Game over text
-        font = pygame.font.Font(None, 72)
-        game_over_text = font.render("GAME OVER", True, (255, 0, 0))
+        game_over_text = self.text_cache.render("GAME OVER", 72, (255, 0, 0))
         text_x = (self.width - game_over_text.get_width()) // 2
         text_y = (self.height - game_over_text.get_height()) // 2 - 50
-        self.screen.blit(game_over_text, (text_x, text_y))
+        self.draw_text("game_over", "GAME OVER", 72, (255, 0, 0), (text_x, text_y))
         
         # Final score
-        score_font = pygame.font.Font(None, 36)
-        score_text = score_font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-        score_x = (self.width - score_text.get_width()) // 2
+        score_text = f"Final Score: {self.score}"
+        score_x = (self.width - self.text_cache.render(score_text, 36, (255, 255, 255)).get_width()) // 2
         score_y = text_y + 80
-        self.screen.blit(score_text, (score_x, score_y))
+        self.draw_text("final_score", score_text, 36, (255, 255, 255), (score_x, score_y))
         
         # Restart instruction
-        restart_font = pygame.font.Font(None, 28)
-        restart_text = restart_font.render("Press R to Restart or ESC to Exit", True, (200, 200, 200))
-        restart_x = (self.width - restart_text.get_width()) // 2
+        restart_text = "Press R to Restart or ESC to Exit"
+        restart_x = (self.width - self.text_cache.render(restart_text, 28, (200, 200, 200)).get_width()) // 2
         restart_y = score_y + 50
-        self.screen.blit(restart_text, (restart_x, restart_y))
+        self.draw_text("restart_hint", restart_text, 28, (200, 200, 200), (restart_x, restart_y))
     
     def reset_game(self):
         """Reset game to initial state"""
         self.current_health = self.max_health
         self.game_over = False
         self.score = 0
-        self.monsters.clear()
+        self.monster_pool.clear()
         self.fireballs.clear()
-        self.fireworks.clear()
-        self.last_monster_spawn = 0
+        self.firework_pool.clear()
+        self.particle_pool.clear()
+        self.last_monster_spawn = -math.inf
         print("🎆 Game Reset! New Year Monster Hunt Restarted!")
     
     def update_background(self):
-        """Update background with twinkling stars"""
-        # Base night sky color
-        self.screen.fill(self.background_color)
-        
-        # Draw twinkling stars
-        current_time = time.time()
-        for star in self.stars:
-            brightness = star['brightness'] + 50 * math.sin(current_time * star['twinkle_speed'])
-            brightness = max(50, min(255, brightness))
-            color = (int(brightness), int(brightness), int(brightness * 0.9))
-            pygame.draw.circle(self.screen, color, (star['x'], star['y']), 1)
+        """Draw the baked night sky with twinkling stars
+        
+        Returns the rects of stars that changed color, or None if a
+        parallax layer moved (so the whole background changed).
+        """
+        return self.starfield.draw(self.screen, self.sim_time)
     
     def draw_volume_indicator(self):
         """Draw volume level indicator"""
@@ -891,17 +1017,14 @@ class VoiceControlledFireworks:
         # Border
         pygame.draw.rect(self.screen, (255, 255, 255),
                         (bar_x, bar_y, bar_width, bar_height), 2)
+        self.hud.place("volume_bar", (volume_width, color), (bar_x, bar_y, bar_width, bar_height))
         
         # Labels
-        font = pygame.font.Font(None, 24)
         volume_text = f"Vol: {self.current_volume:.2f}"
-        text_surface = font.render(volume_text, True, (255, 255, 255))
-        self.screen.blit(text_surface, (bar_x, bar_y - 28))
+        self.draw_text("volume_text", volume_text, 24, (255, 255, 255), (bar_x, bar_y - 28))
     
     def draw_instructions(self):
         """Draw usage instructions"""
-        font = pygame.font.Font(None, 24)
-        
         if self.game_mode == "monster_hunt":
             instructions = [
                 "🎆 New Year Monster Hunt",
@@ -924,40 +1047,37 @@ class VoiceControlledFireworks:
             elif "🎤" in instruction or "📢" in instruction:
                 color = (100, 255, 100)
             
-            text_surface = font.render(instruction, True, color)
-            self.screen.blit(text_surface, (50, 120 + i * 25))
+            self.draw_text(f"instruction_{i}", instruction, 24, color, (50, 120 + i * 25))
     
     def draw_statistics(self):
         """Draw game statistics and score"""
-        font = pygame.font.Font(None, 24)
-        
         if self.game_mode == "monster_hunt":
             # Monster hunt mode - show score prominently
             score_text = f"🏆 Score: {self.score}"
-            text_surface = font.render(score_text, True, (255, 215, 0))  # Gold color
-            self.screen.blit(text_surface, (self.width - 150, 30))
+            self.draw_text("score", score_text, 24, (255, 215, 0), (self.width - 150, 30))  # Gold color
             
             # Additional stats
-            small_font = pygame.font.Font(None, 18)
             stats = [
                 f"Monsters: {len([m for m in self.monsters if m.alive])}",
                 f"Fireworks: {len(self.fireworks)}"
             ]
             
             for i, stat in enumerate(stats):
-                text_surface = small_font.render(stat, True, (200, 200, 255))
-                self.screen.blit(text_surface, (self.width - 120, 65 + i * 20))
+                self.draw_text(f"stat_{i}", stat, 18, (200, 200, 255), (self.width - 120, 65 + i * 20))
         else:
             # Normal mode - show firework stats
-            small_font = pygame.font.Font(None, 20)
             stats = [
                 f"Total: {self.total_fireworks}",
                 f"Active: {len(self.fireworks)}"
             ]
             
             for i, stat in enumerate(stats):
-                text_surface = small_font.render(stat, True, (200, 200, 255))
-                self.screen.blit(text_surface, (self.width - 120, 50 + i * 22))
+                self.draw_text(f"stat_{i}", stat, 20, (200, 200, 255), (self.width - 120, 50 + i * 22))
+        
+        # Render quality tier, right-aligned since tier names vary in length
+        quality_text = f"Quality: {self.quality.tier.name}"
+        width = self.text_cache.render(quality_text, 18, (150, 150, 200)).get_width()
+        self.draw_text("quality", quality_text, 18, (150, 150, 200), (self.width - width - 20, 110))
     
     def run(self):
         """Main game loop"""
@@ -969,84 +1089,49 @@ class VoiceControlledFireworks:
             print("🎤 Speak → Fireworks | ESC → Exit")
         
         running = True
+        accumulator = 0.0
+        profiler = self.profiler
         
         try:
             while running:
+                profiler.start_frame()
+                frame_start = time.perf_counter()
+                
                 # Handle events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
+                with profiler.section("events"):
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
                             running = False
-                        elif event.key == pygame.K_SPACE:
-                            # Manual firework for testing
-                            self.create_firework(self.max_volume * 0.5)
-                        elif event.key == pygame.K_m:
-                            # Toggle game mode
-                            if self.game_mode == "normal":
-                                self.game_mode = "monster_hunt"
-                                self.reset_game()
-                                print("🎆 Switched to New Year Monster Hunt Mode!")
+                        elif event.type == pygame.KEYDOWN:
+                            if event.key == pygame.K_ESCAPE:
+                                running = False
+                            elif profiler.handle_key(event.key):
+                                self.full_redraw = True  # Show or clear the graph everywhere
                             else:
-                                self.game_mode = "normal"
-                                self.monsters.clear()  # Clear all monsters
-                                self.fireballs.clear()  # Clear all fireballs
-                                print("🎆 Switched to Normal Fireworks Mode!")
-                        elif event.key == pygame.K_r:
-                            # Restart game
-                            if self.game_over:
-                                self.reset_game()
-                
-                # Skip game updates if game is over
-                if not self.game_over:
-                    # Analyze voice input
-                    volume = self.analyze_audio()
-                    
-                    # Launch fireworks based on voice
-                    if self.should_launch_firework(volume):
-                        self.create_firework(volume)
-                
-                # Update fireworks
-                for firework in self.fireworks[:]:
-                    firework.update()
-                    if firework.is_finished():
-                        self.fireworks.remove(firework)
-                
-                # Monster hunt mode specific updates
-                if self.game_mode == "monster_hunt" and not self.game_over:
-                    self.spawn_monster()
-                    self.update_monsters()
-                    self.update_fireballs()
-                    self.check_monster_collisions()
-                    self.check_firework_interceptions()  # Check firework-fireball interceptions
+                                self.apply_input("key", event.key)
+                        elif event.type == pygame.WINDOWEXPOSED:
+                            self.full_redraw = True
                 
-                # Draw everything
-                self.update_background()
+                # Run as many fixed ticks as real time has accumulated
+                with profiler.section("simulation"):
+                    accumulator += min(self.clock.get_time() / 1000.0, MAX_FRAME_TIME)
+                    while accumulator >= SIM_DT:
+                        self.step_simulation()
+                        accumulator -= SIM_DT
                 
-                # Draw monsters and fireballs (in monster hunt mode)
-                if self.game_mode == "monster_hunt":
-                    self.draw_monsters()
-                    self.draw_fireballs()
+                # Draw everything, interpolated between the last two ticks
+                with profiler.section("render"):
+                    self.render(accumulator / SIM_DT)
+                graph_rect = profiler.draw(self.screen)
+                if graph_rect is not None and self.dirty_rects is not None:
+                    self.dirty_rects.append(graph_rect)
                 
-                # Draw fireworks
-                for firework in self.fireworks:
-                    firework.draw(self.screen)
+                with profiler.section("present"):
+                    self.present()
                 
-                # Draw UI
-                self.draw_volume_indicator()
-                self.draw_instructions()
-                self.draw_statistics()
-                
-                # Draw health bar (in monster hunt mode)
-                if self.game_mode == "monster_hunt":
-                    self.draw_health_bar()
-                
-                # Draw game over screen if needed
-                if self.game_over:
-                    self.draw_game_over()
-                
-                pygame.display.flip()
+                # Work time only: the frame cap's sleep below is headroom, not load
+                self.quality.record_frame((time.perf_counter() - frame_start) * 1000,
+                                          self.particle_pool.live_count())
                 self.clock.tick(60)
                 
         except KeyboardInterrupt:
@@ -1054,6 +1139,13 @@ class VoiceControlledFireworks:
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
+            print(f"🎤 {self.latency_report()}")
+            print(f"🎚️ {self.quality.report()}")
+            self.quality.close()
+            self.save_session()
+            if self.profiler.trace_path:
+                self.profiler.save_trace()
+            
             # Cleanup
             self.stream.stop_stream()
             self.stream.close()
@@ -1062,7 +1154,19 @@ class VoiceControlledFireworks:
 
 if __name__ == "__main__":
     try:
-        fireworks = VoiceControlledFireworks()
+        # python voice_fireworks.py --record session.fwlog [--profile [--trace frame_trace.json]]
+        #                           [--quality "no glow"] [--quality-log quality.jsonl]
+        session_path = sys.argv[sys.argv.index("--record") + 1] if "--record" in sys.argv else None
+        fireworks = VoiceControlledFireworks(session_path=session_path)
+        if "--quality" in sys.argv:
+            # Pin a tier instead of adjusting automatically
+            fireworks.quality.index = tier_index(sys.argv[sys.argv.index("--quality") + 1])
+            fireworks.quality.auto = False
+        if "--quality-log" in sys.argv:
+            fireworks.quality.telemetry_path = sys.argv[sys.argv.index("--quality-log") + 1]
+        fireworks.profiler.enabled = "--profile" in sys.argv or "--trace" in sys.argv
+        if "--trace" in sys.argv:
+            fireworks.profiler.trace_path = sys.argv[sys.argv.index("--trace") + 1]
         fireworks.run()
     except Exception as e:
         print(f"❌ Failed to start fireworks: {e}")
@@ -6,6 +6,12 @@ from scipy import signal
 import threading
 import queue
 import time
+import os
+import sys
+
+# Shared modules (frame_profiler.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from frame_profiler import FrameProfiler
 
 class PygameSpectrogram:
     def __init__(self, width=1200, height=800):
@@ -35,6 +41,9 @@ class PygameSpectrogram:
         pygame.display.set_caption("Real-time Spectrogram & Waveform - Press ESC to quit")
         self.clock = pygame.time.Clock()
         
+        # Frame profiler: F3 toggles the frame-time graph, F4 saves a Chrome trace
+        self.profiler = FrameProfiler(budget_ms=1000 / 30)
+        
         # Colors
         self.BLACK = (0, 0, 0)
         self.WHITE = (255, 255, 255)
@@ -97,14 +106,15 @@ class PygameSpectrogram:
         if status:
             print(f"Audio status: {status}")
         
-        # Convert audio data to numpy array
-        audio_data = np.frombuffer(in_data, dtype=np.float32)
-        
-        # Add to queue for main thread processing
-        try:
-            self.audio_queue.put(audio_data, block=False)
-        except queue.Full:
-            pass  # Drop data if queue is full
+        with self.profiler.section("audio callback"):
+            # Convert audio data to numpy array
+            audio_data = np.frombuffer(in_data, dtype=np.float32)
+            
+            # Add to queue for main thread processing
+            try:
+                self.audio_queue.put(audio_data, block=False)
+            except queue.Full:
+                pass  # Drop data if queue is full
         
         return (None, pyaudio.paContinue)
     
@@ -351,7 +361,7 @@ class PygameSpectrogram:
             f"Spec Max: {spec_max:.4f}",
             f"Smoothing: {self.temporal_smoothing:.2f}",
             f"Frequency Range: 0 - {self.max_freq_display/1000:.1f} kHz",
-            "Controls: ↑/↓ adjust smoothing, R reset, ESC quit"
+            "Controls: ↑/↓ adjust smoothing, R reset, F3 profiler, F4 save trace, ESC quit"
         ]
         
         for i, line in enumerate(info_lines):
@@ -367,7 +377,11 @@ class PygameSpectrogram:
         running = True
         frame_count = 0
         
+        profiler = self.profiler
+        
         while running:
+            profiler.start_frame()
+            
             # Handle events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -375,6 +389,8 @@ class PygameSpectrogram:
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
+                    elif profiler.handle_key(event.key):
+                        pass
                     elif event.key == pygame.K_UP:
                         # Increase smoothing (less flickering, more lag)
                         self.temporal_smoothing = min(0.95, self.temporal_smoothing + 0.05)
@@ -389,23 +405,30 @@ class PygameSpectrogram:
                         print(f"Smoothing reset to: {self.temporal_smoothing:.2f}")
             
             # Update audio data
-            self.update_audio_data()
+            with profiler.section("audio"):
+                self.update_audio_data()
             
             # Compute spectrogram at a controlled rate to reduce flickering
             self.update_counter += 1
             if self.update_counter % 2 == 0:  # Every 2nd frame (15 FPS updates)
-                self.compute_spectrogram()
+                with profiler.section("spectrogram"):
+                    self.compute_spectrogram()
             
             # Clear screen
             self.screen.fill(self.BLACK)
             
             # Draw components
-            self.draw_spectrogram()
-            self.draw_waveform()
-            self.draw_info()
+            with profiler.section("draw spectrogram"):
+                self.draw_spectrogram()
+            with profiler.section("draw waveform"):
+                self.draw_waveform()
+            with profiler.section("draw info"):
+                self.draw_info()
+            profiler.draw(self.screen)
             
             # Update display
-            pygame.display.flip()
+            with profiler.section("flip"):
+                pygame.display.flip()
             
             # Control frame rate
             self.clock.tick(30)  # 30 FPS
@@ -417,6 +440,8 @@ class PygameSpectrogram:
     def cleanup(self):
         """Clean up resources"""
         print("Cleaning up...")
+        if self.profiler.trace_path:
+            self.profiler.save_trace()
         if hasattr(self, 'stream') and self.stream:
             self.stream.stop_stream()
             self.stream.close()
@@ -426,7 +451,11 @@ class PygameSpectrogram:
 
 if __name__ == "__main__":
     try:
+        # python 6a_spectrogram_pygame.py [--profile] [--trace frame_trace.json]
         app = PygameSpectrogram()
+        app.profiler.enabled = "--profile" in sys.argv or "--trace" in sys.argv
+        if "--trace" in sys.argv:
+            app.profiler.trace_path = sys.argv[sys.argv.index("--trace") + 1]
         app.run()
     except KeyboardInterrupt:
         print("Interrupted by user")
@@ -4,10 +4,15 @@ import pyaudio
 import threading
 import queue
 import math
+import os
 import sys
 from scipy.signal import find_peaks
 from collections import deque
 
+# Shared modules (frame_profiler.py) live in the repository's common/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from frame_profiler import FrameProfiler
+
 class RealTimeVoiceDancer:
     def __init__(self, x, y, size=50, style="human"):
         self.x = x
@@ -171,6 +176,9 @@ class VoiceDanceController:
         self.width = width
         self.height = height
         
+        # Frame profiler: F3 toggles the frame-time graph, F4 saves a Chrome trace
+        self.profiler = FrameProfiler()
+        
         # Audio settings
         self.sample_rate = 44100
         self.chunk_size = 4096
@@ -365,6 +373,7 @@ class VoiceDanceController:
             "🎵  HIGH PITCH voice → Dancers jump and turn GREEN", 
             "⚡  FAST SPEECH → Dancers wave and turn BLUE",
             "📏  VOLUME controls dancer size",
+            "F3: frame profiler | F4: save trace",
             "",
             "Try different voice styles and watch the dancers respond!"
         ]
@@ -406,9 +415,11 @@ class VoiceDanceController:
         print("💡 Try: shouting, high-pitch sounds, fast speech!")
         
         running = True
+        profiler = self.profiler
         
         try:
             while running:
+                profiler.start_frame()
                 self.current_time = pygame.time.get_ticks() / 1000.0
                 
                 # Handle events
@@ -418,37 +429,45 @@ class VoiceDanceController:
                     elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE:
                             running = False
+                        elif profiler.handle_key(event.key):
+                            pass
                         elif event.key == pygame.K_SPACE:
                             # Recalibrate microphone
                             print("🎤 Recalibrating microphone...")
                 
                 # Read audio
                 try:
-                    audio_data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-                    voice_features = self.analyze_audio_chunk(audio_data)
+                    with profiler.section("audio read"):
+                        audio_data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+                    with profiler.section("voice analysis"):
+                        voice_features = self.analyze_audio_chunk(audio_data)
                 except:
                     voice_features = {}
                 
-                # Update background
-                self.update_background(voice_features)
-                
-                # Update dancers
-                for dancer in self.dancers:
-                    dancer.update_from_voice(voice_features)
+                with profiler.section("update"):
+                    # Update background
+                    self.update_background(voice_features)
+                    
+                    # Update dancers
+                    for dancer in self.dancers:
+                        dancer.update_from_voice(voice_features)
                 
-                # Draw everything
-                bg_color = [int(c) for c in self.background_color]
-                self.screen.fill(bg_color)
+                with profiler.section("draw"):
+                    # Draw everything
+                    bg_color = [int(c) for c in self.background_color]
+                    self.screen.fill(bg_color)
+                    
+                    # Draw dancers
+                    for dancer in self.dancers:
+                        dancer.draw(self.screen)
+                    
+                    # Draw visualizations
+                    self.draw_voice_visualization(voice_features)
+                    self.draw_instructions()
+                profiler.draw(self.screen)
                 
-                # Draw dancers
-                for dancer in self.dancers:
-                    dancer.draw(self.screen)
-                
-                # Draw visualizations
-                self.draw_voice_visualization(voice_features)
-                self.draw_instructions()
-                
-                pygame.display.flip()
+                with profiler.section("flip"):
+                    pygame.display.flip()
                 self.clock.tick(60)
                 
         except KeyboardInterrupt:
@@ -456,6 +475,9 @@ class VoiceDanceController:
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
+            if profiler.trace_path:
+                profiler.save_trace()
+            
             # Cleanup
             self.stream.stop_stream()
             self.stream.close()
@@ -465,7 +487,11 @@ class VoiceDanceController:
 
 if __name__ == "__main__":
     try:
+        # python voice_dance_controller.py [--profile] [--trace frame_trace.json]
         controller = VoiceDanceController()
+        controller.profiler.enabled = "--profile" in sys.argv or "--trace" in sys.argv
+        if "--trace" in sys.argv:
+            controller.profiler.trace_path = sys.argv[sys.argv.index("--trace") + 1]
         controller.run()
     except Exception as e:
         print(f"❌ Failed to start voice dance controller: {e}")